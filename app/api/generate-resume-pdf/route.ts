@@ -5,6 +5,7 @@ import fs from 'fs';
 import { createServerClient } from '@supabase/ssr';
 import { cookies } from 'next/headers';
 import { writeFileSync, unlinkSync, readFileSync } from 'fs';
+import { PdfRenderError, pdfRenderServerAddress, renderPdf } from '@/lib/pdfRenderClient';
 
 interface Experience {
   company: string;
@@ -82,14 +83,6 @@ export async function POST(request: Request) {
       return new NextResponse('Unauthorized', { status: 401 });
     }
 
-    // Create a temporary HTML file
-    const tempDir = path.join(process.cwd(), 'temp');
-    if (!fs.existsSync(tempDir)) {
-      fs.mkdirSync(tempDir);
-    }
-    const htmlPath = path.join(tempDir, `${resumeId}.html`);
-    const pdfPath = path.join(tempDir, `${resumeId}.pdf`);
-
     // Generate HTML content
     const htmlContent = `
       <!DOCTYPE html>
@@ -249,6 +242,35 @@ export async function POST(request: Request) {
       </html>
     `;
 
+    // Prefer the warm render server; the weasyprint CLI is the fallback
+    if (pdfRenderServerAddress()) {
+      try {
+        const pdfBuffer = await renderPdf({ html: htmlContent });
+        return pdfResponse(pdfBuffer);
+      } catch (error) {
+        // Overload and timeouts are answered as such; a bad document would fail
+        // the CLI too. Anything else (server down, crashed or not answering in
+        // time, a render process dying) falls back to the CLI.
+        if (error instanceof PdfRenderError) {
+          if (error.status === 429 || error.status === 504) {
+            return new NextResponse(error.message, { status: error.status === 429 ? 503 : 504 });
+          }
+          if (error.status === 400) {
+            throw error;
+          }
+        }
+        console.warn('PDF render server failed, falling back to the weasyprint CLI:', error);
+      }
+    }
+
+    // Create a temporary HTML file
+    const tempDir = path.join(process.cwd(), 'temp');
+    if (!fs.existsSync(tempDir)) {
+      fs.mkdirSync(tempDir);
+    }
+    const htmlPath = path.join(tempDir, `${resumeId}.html`);
+    const pdfPath = path.join(tempDir, `${resumeId}.pdf`);
+
     // Write HTML to file
     writeFileSync(htmlPath, htmlContent);
 
@@ -277,14 +299,18 @@ export async function POST(request: Request) {
     unlinkSync(pdfPath);
 
     // Return the PDF
-    return new NextResponse(pdfBuffer, {
-      headers: {
-        'Content-Type': 'application/pdf',
-        'Content-Disposition': `attachment; filename="resume.pdf"`,
-      },
-    });
+    return pdfResponse(pdfBuffer);
   } catch (error) {
     console.error('Error generating PDF:', error);
     return new NextResponse('Error generating PDF', { status: 500 });
   }
+}
+
+function pdfResponse(pdfBuffer: Buffer) {
+  return new NextResponse(pdfBuffer, {
+    headers: {
+      'Content-Type': 'application/pdf',
+      'Content-Disposition': `attachment; filename="resume.pdf"`,
+    },
+  });
 } 
\ No newline at end of file
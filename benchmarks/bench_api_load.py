@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Load test for the FastAPI service: throughput and latency vs concurrent clients.
+
+Against a running server:
+    python3 benchmarks/bench_api_load.py --url http://localhost:8000 --route generate-summary
+
+In-process with the LLM replaced by a fixed delay, so the numbers measure the
+service itself rather than Groq (no API key needed):
+    python3 benchmarks/bench_api_load.py --simulate-latency 0.5 --clients 1 4 16 64
+
+With working concurrency, throughput grows with the client count until the
+route's limit is reached; past that, extra requests are rejected with 429/503
+instead of queueing forever.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+sys.path.append(os.path.join(ROOT, 'huggingface_api'))
+
+PAYLOADS = {
+    'generate-summary': {'portfolio_data': {
+        'name': 'Jane Doe',
+        'skills': ['python', 'sql', 'airflow'],
+        'experience': [{'company': 'Acme', 'designation': 'Data Engineer', 'description': 'Built pipelines.'}],
+    }},
+    'generate-cover-letter': {
+        'resume_text': 'Jane Doe\nData Engineer at Acme. Python, SQL, Airflow.',
+        'job_description': 'Senior data engineer, Python and Airflow.',
+        'full_name': 'Jane Doe',
+    },
+}
+
+
+def simulate_llm(latency):
+    """Replace the Groq calls with a fixed delay, in this process only."""
+    import llm_client
+
+    def complete(messages, model=None, api_key=None, cache=None, **overrides):
+        time.sleep(latency)
+        return 'Simulated completion.'
+
+    async def acomplete(messages, model=None, api_key=None, cache=None, **overrides):
+        await asyncio.sleep(latency)
+        return 'Simulated completion.'
+
+    llm_client.complete = complete
+    llm_client.acomplete = acomplete
+    os.environ.setdefault('GROQ_API_KEY', 'simulated')
+
+
+async def run_level(client, route, clients, requests_per_client):
+    latencies = []
+    statuses = Counter()
+
+    async def worker():
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            try:
+                response = await client.post(f'/{route}', json=PAYLOADS[route])
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    return {
+        'clients': clients,
+        'ok': statuses[200],
+        'statuses': dict(statuses),
+        'seconds': elapsed,
+        'throughput_rps': statuses[200] / elapsed if elapsed else 0.0,
+        'p50_s': statistics.median(latencies) if latencies else None,
+        'max_s': max(latencies) if latencies else None,
+    }
+
+
+async def run(args):
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        simulate_llm(args.simulate_latency)
+        from app import app
+        transport, base_url = httpx.ASGITransport(app=app), 'http://bench'
+
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        for clients in args.clients:
+            result = await run_level(client, args.route, clients, args.requests)
+            results.append(result)
+            p50 = f"{result['p50_s']:.3f}s" if result['p50_s'] is not None else '-'
+            print(f"{clients:>4} clients  {result['throughput_rps']:7.2f} req/s  p50 {p50:>8}  "
+                  f"statuses {result['statuses']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the PortfolioAI API.")
+    parser.add_argument('--url', help='Base URL of a running server (default: in-process with simulated LLM)')
+    parser.add_argument('--route', default='generate-summary', choices=sorted(PAYLOADS), help='Route to load')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16, 64], help='Concurrent client counts')
+    parser.add_argument('--requests', type=int, default=4, help='Requests per client')
+    parser.add_argument('--simulate-latency', type=float, default=0.5, help='Simulated LLM latency in seconds')
+    parser.add_argument('--timeout', type=float, default=120.0, help='Per-request timeout in seconds')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Serial vs page-parallel PDF extraction on synthetic resumes.
+
+Usage:
+    python3 benchmarks/bench_extraction.py
+    python3 benchmarks/bench_extraction.py --pages 1 10 50 200 --tiers fast layout --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import document_extraction
+from fixtures import resume_pdf
+
+
+def best_of(repeat, fn):
+    fn()  # warm-up: imports and first-use setup
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(page_counts, tiers, repeat):
+    results = []
+    # Start the pool up front so its startup cost is not billed to the first run.
+    document_extraction._get_executor().submit(int).result()
+    for pages in page_counts:
+        data = resume_pdf(pages)
+        for tier in tiers:
+            serial = best_of(repeat, lambda: document_extraction.extract_pdf_pages(data, tier, parallel=False))
+            parallel = best_of(repeat, lambda: document_extraction.extract_pdf_pages(data, tier, parallel=True))
+            results.append({
+                'pages': pages,
+                'tier': tier,
+                'serial_s': serial,
+                'parallel_s': parallel,
+                'speedup': serial / parallel if parallel else None,
+            })
+            print(f"{pages:>5} pages  {tier:<7} serial {serial:8.3f}s  parallel {parallel:8.3f}s  "
+                  f"speedup {serial / parallel:5.2f}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs page-parallel PDF extraction.")
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 50, 200], help='Page counts to generate')
+    parser.add_argument('--tiers', nargs='+', default=[document_extraction.FAST, document_extraction.LAYOUT],
+                        choices=[document_extraction.FAST, document_extraction.LAYOUT], help='Extraction tiers')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    print(f"workers={document_extraction.PARALLEL_WORKERS} "
+          f"thresholds={document_extraction.PARALLEL_PAGE_THRESHOLDS}")
+    run(args.pages, args.tiers, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
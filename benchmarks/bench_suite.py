@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""Benchmark suite: extraction, prompt construction, JSON parsing and rendering.
+
+Every case runs on generated fixtures (see ``fixtures.py``) with the
+extraction, completion, analysis and render caches and the ATS corpus
+disabled, so the numbers measure the work itself and do not depend on local
+state. The LLM is replaced by canned replies, in this process only.
+
+Usage:
+    python3 benchmarks/bench_suite.py
+    python3 benchmarks/bench_suite.py --suites parsing rendering --quick
+    python3 benchmarks/bench_suite.py --compare benchmarks/results/<earlier run>.json
+
+Results are written as JSON (default ``benchmarks/results/<UTC time>.json``):
+run metadata (git commit, Python, platform, CPUs, settings) plus one entry
+per case with its ``id`` (``suite/name[params]``), per-call ``min_s``,
+``median_s``, ``mean_s`` and ``stdev_s``, or the ``error``/``skipped``
+reason. ``--compare`` matches cases by ``id`` and reports the change in
+median time.
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Measure the work, not the caches in front of it, and keep results
+# independent of (and out of) the developer's local stores such as the JD corpus.
+for _name in ('EXTRACTION_CACHE_DISABLED', 'LLM_CACHE_DISABLED', 'RENDER_CACHE_DISABLED',
+              'ANALYSIS_CACHE_DISABLED', 'ATS_CORPUS_DISABLED'):
+    os.environ.setdefault(_name, '1')
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(ROOT, 'scripts'))
+
+import fixtures
+
+SUITES = ('extraction', 'prompting', 'parsing', 'rendering')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+JOB_DESCRIPTION = (
+    'Senior Backend Engineer. We need strong Python, PostgreSQL and AWS experience, '
+    'Docker and Kubernetes in production, CI/CD ownership and clear communication. '
+    'Experience with Airflow or Spark data pipelines is a plus.'
+)
+ANALYSIS_REPLY = json.dumps({
+    'score': 72,
+    'suggestions': ['Quantify the impact of the pipeline migration.', 'Lead with Kubernetes experience.'],
+    'keyword_gaps': ['CI/CD', 'PostgreSQL'],
+})
+
+
+class Runner:
+    """Times cases and collects their results."""
+
+    def __init__(self, repeat, min_run_s):
+        self.repeat = repeat
+        self.min_run_s = min_run_s
+        self.cases = []
+
+    def _record(self, suite, name, params, **fields):
+        label = ','.join(f'{key}={params[key]}' for key in sorted(params))
+        case = {'id': f'{suite}/{name}' + (f'[{label}]' if label else ''), 'suite': suite, 'name': name,
+                'params': params, **fields}
+        self.cases.append(case)
+        return case
+
+    def time(self, suite, name, fn, **params):
+        """Time ``fn()``: one warm-up call, then ``repeat`` runs of enough calls to last ``min_run_s``."""
+        try:
+            fn()
+            number = 1
+            while True:
+                start = time.perf_counter()
+                for _ in range(number):
+                    fn()
+                elapsed = time.perf_counter() - start
+                if elapsed >= self.min_run_s or number >= 1_000_000:
+                    break
+                number *= 10 if elapsed < self.min_run_s / 10 else 2
+            per_call = [elapsed / number]
+            for _ in range(self.repeat - 1):
+                start = time.perf_counter()
+                for _ in range(number):
+                    fn()
+                per_call.append((time.perf_counter() - start) / number)
+        except Exception as e:
+            case = self._record(suite, name, params, error=f'{type(e).__name__}: {e}')
+            print(f"  {case['id']:<72} error: {case['error']}")
+            return case
+        case = self._record(
+            suite, name, params,
+            runs=len(per_call), calls_per_run=number,
+            min_s=min(per_call), median_s=statistics.median(per_call), mean_s=statistics.mean(per_call),
+            stdev_s=statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        )
+        print(f"  {case['id']:<72} {_format_seconds(case['median_s'])}")
+        return case
+
+    def skip(self, suite, name, reason, **params):
+        case = self._record(suite, name, params, skipped=reason)
+        print(f"  {case['id']:<72} skipped: {reason}")
+        return case
+
+    def fail(self, suite, name, reason, **params):
+        """Record a case whose result was wrong, not just slow."""
+        case = self._record(suite, name, params, error=reason)
+        print(f"  {case['id']:<72} error: {reason}")
+        return case
+
+
+def _format_seconds(seconds):
+    if seconds >= 1:
+        return f'{seconds:8.3f} s'
+    if seconds >= 1e-3:
+        return f'{seconds * 1e3:8.3f} ms'
+    return f'{seconds * 1e6:8.3f} us'
+
+
+@contextlib.contextmanager
+def canned_llm(reply):
+    """Answer every completion with ``reply`` instead of calling Groq."""
+    import llm_client
+    original = llm_client.complete
+    llm_client.complete = lambda messages, model=None, api_key=None, cache=None, **overrides: reply
+    # Some entry points refuse to start without a key, even though it is never used here.
+    had_key = 'GROQ_API_KEY' in os.environ
+    os.environ.setdefault('GROQ_API_KEY', 'benchmark')
+    try:
+        yield
+    finally:
+        llm_client.complete = original
+        if not had_key:
+            del os.environ['GROQ_API_KEY']
+
+
+# --- Suites -----------------------------------------------------------------
+
+def bench_extraction(runner, page_counts, seed):
+    try:
+        import document_extraction
+    except ImportError as e:
+        runner.skip('extraction', 'all', str(e))
+        return
+    from optimize_resume import MAX_RESUME_CHARS
+
+    # Start the pool up front so its startup cost is not billed to the first case.
+    document_extraction._get_executor().submit(int).result()
+    for pages in page_counts:
+        pdf = fixtures.resume_pdf(pages, seed)
+        docx = fixtures.resume_docx(pages, seed)
+        for tier in (document_extraction.FAST, document_extraction.LAYOUT):
+            for parallel in (False, True):
+                runner.time('extraction', f'pdf_{tier}', lambda: document_extraction.extract_pdf_pages(
+                    pdf, tier, parallel=parallel), pages=pages, parallel=parallel)
+        runner.time('extraction', 'pdf_auto', lambda: document_extraction.extract_text(
+            'bench.pdf', loader=lambda source: pdf), pages=pages)
+        runner.time('extraction', 'pdf_prefix', lambda: document_extraction.extract_text(
+            'bench.pdf', loader=lambda source: pdf, max_chars=MAX_RESUME_CHARS), pages=pages)
+        runner.time('extraction', 'docx', lambda: document_extraction.extract_text(
+            'bench.docx', loader=lambda source: docx), pages=pages)
+
+
+def bench_prompting(runner, seed):
+    try:
+        import ats_scoring
+        import generate_resume_from_file
+        import optimize_resume
+        import resume_parser
+        import resume_schema
+        import rewrite_resume
+        from generate_cover_letter import build_cover_letter_prompt
+        from generate_summary import build_summary_messages
+    except ImportError as e:
+        runner.skip('prompting', 'all', str(e))
+        return
+
+    resume_text = '\n'.join(fixtures.resume_lines(2, seed))
+    long_resume = '\n'.join(fixtures.resume_lines(40, seed))
+    content = fixtures.resume_content(seed)
+    portfolio = fixtures.portfolio_row(seed)
+    # As the rewrite CLI receives them: bullet-point text and a comma-separated list.
+    suggestions = '- Quantify impact in every bullet.\n- Move skills above experience.'
+    gaps = 'CI/CD, PostgreSQL'
+
+    for size, text in (('2_pages', resume_text), ('40_pages', long_resume)):
+        runner.time('prompting', 'cover_letter_prompt',
+                    lambda: build_cover_letter_prompt(text, JOB_DESCRIPTION, full_name='Bench'), resume=size)
+        runner.time('prompting', 'fused_rewrite_prompt',
+                    lambda: rewrite_resume.build_fused_prompt(text, suggestions, gaps), resume=size)
+        runner.time('prompting', 'parse_resume', lambda: resume_parser.parse_resume(text), resume=size)
+        runner.time('prompting', 'ats_score', lambda: ats_scoring.score(text, JOB_DESCRIPTION), resume=size)
+    runner.time('prompting', 'revision_prompt', lambda: rewrite_resume.build_revision_prompt(content, suggestions, gaps))
+    runner.time('prompting', 'summary_messages', lambda: build_summary_messages(portfolio))
+    runner.time('prompting', 'schema_skeleton', lambda: resume_schema.skeleton(resume_schema.GeneratedResume))
+
+    # Whole request paths with the model answering instantly: prompt building,
+    # local parsing and scoring, and validating the reply.
+    with canned_llm(ANALYSIS_REPLY):
+        runner.time('prompting', 'analyze_resume_no_llm', lambda: optimize_resume.analyze_resume(
+            resume_text, JOB_DESCRIPTION, 'bench-key', use_cache=False))
+    with canned_llm(fixtures.llm_outputs(seed)['valid']):
+        runner.time('prompting', 'generate_resume_no_llm',
+                    lambda: generate_resume_from_file.call_groq_api(resume_text, job_title='Backend Engineer'))
+
+
+def bench_parsing(runner, seed):
+    try:
+        import json_repair
+        from generate_resume_from_file import validate_resume_json
+    except ImportError as e:
+        runner.skip('parsing', 'all', str(e))
+        return
+
+    expected = fixtures.resume_content(seed)
+    for kind, text in fixtures.llm_outputs(seed).items():
+        runner.time('parsing', 'json_repair_parse', lambda: json_repair.parse(text), output=kind)
+
+        def streamed(text=text):
+            parser = json_repair.StreamingJSONParser()
+            for i in range(0, len(text), 64):
+                parser.feed(text[i:i + 64])
+            return parser.value()
+        runner.time('parsing', 'json_repair_streamed', streamed, output=kind)
+
+        try:
+            value, _ = json_repair.parse(text)
+        except json_repair.JSONRepairError as e:
+            runner.skip('parsing', 'validate_resume_json', f'unparseable: {e}', output=kind)
+            continue
+        if kind in fixtures.LOSSLESS_OUTPUTS and value != expected:
+            runner.fail('parsing', 'json_repair_result', 'repaired value differs from the original resume', output=kind)
+        runner.time('parsing', 'validate_resume_json', lambda: validate_resume_json(value), output=kind)
+
+
+def bench_rendering(runner, seed):
+    content = fixtures.resume_content(seed)
+    resume_templates = sorted(
+        name[:-len('.html')] for name in os.listdir(os.path.join(ROOT, 'resume-templates')) if name.endswith('.html')
+    )
+
+    try:
+        import render_engine
+        from generate_resume_pdf import generate_pdf
+    except (ImportError, OSError) as e:
+        # WeasyPrint needs pango and friends; without them only HTML is timed.
+        for template_id in resume_templates:
+            runner.skip('rendering', 'generate_pdf', f'WeasyPrint unavailable: {type(e).__name__}', template=template_id)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_file = os.path.join(tmp, 'resume.json')
+            with open(data_file, 'w') as f:
+                json.dump({'content': content}, f)
+            for template_id in resume_templates:
+                def render(template_id=template_id):
+                    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()) as err:
+                        if not generate_pdf(template_id, data_file, os.path.join(tmp, f'{template_id}.pdf')):
+                            raise RuntimeError(err.getvalue().strip())
+                runner.time('rendering', 'generate_pdf', render, template=template_id)
+                runner.time('rendering', 'render_html',
+                            lambda: render_engine.engine().render_html(template_id, content), template=template_id)
+
+    try:
+        import resume_preview
+    except ImportError as e:
+        runner.skip('rendering', 'preview', str(e))
+    else:
+        edited = json.loads(json.dumps(content))
+        for template_id in resume_templates:
+            renderer = resume_preview.PreviewRenderer()
+            runner.time('rendering', 'preview_full', lambda: renderer.render(template_id, content), template=template_id)
+            known = renderer.render(template_id, content)['hashes']
+            counter = iter(range(10 ** 9))
+
+            def edit_one_bullet():
+                edited['experience'][0]['description'] = f'Edited bullet {next(counter)}'
+                return renderer.render(template_id, edited, known)
+            runner.time('rendering', 'preview_edit', edit_one_bullet, template=template_id)
+
+    import portfolio_builder
+    row = fixtures.portfolio_row(seed)
+    context = portfolio_builder.portfolio_context(row)
+    for template_id in portfolio_builder.TEMPLATES:
+        template = portfolio_builder.PortfolioTemplate(template_id)
+        runner.time('rendering', 'portfolio_page',
+                    lambda: portfolio_builder.minify_html(template.render(context)), template=template_id)
+    rows = [fixtures.portfolio_row(i, portfolio_builder.TEMPLATES[i % len(portfolio_builder.TEMPLATES)])
+            for i in range(200)]
+    with tempfile.TemporaryDirectory() as tmp:
+        runner.time('rendering', 'portfolio_build', lambda: portfolio_builder.build_portfolios(
+            rows, tmp, force=True), portfolios=len(rows), workers=portfolio_builder.WORKERS)
+
+
+# --- Results ----------------------------------------------------------------
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def metadata(args):
+    return {
+        'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': _git('rev-parse', 'HEAD'),
+        'git_dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {'suites': args.suites, 'pages': args.pages, 'repeat': args.repeat,
+                     'min_run_s': args.min_run_s, 'seed': args.seed},
+    }
+
+
+def compare(previous, current, threshold):
+    """Print the median change per case; return the ids that got slower than ``threshold``."""
+    before = {case['id']: case for case in previous['cases'] if 'median_s' in case}
+    regressions = []
+    print(f"\nCompared with {previous['meta'].get('git_commit') or 'previous run'} "
+          f"({previous['meta'].get('started_at')}):")
+    for case in current['cases']:
+        old = before.get(case['id'])
+        if old is None or 'median_s' not in case:
+            continue
+        change = case['median_s'] / old['median_s'] - 1 if old['median_s'] else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  SLOWER'
+            regressions.append(case['id'])
+        elif change < -threshold:
+            flag = '  faster'
+        print(f"  {case['id']:<72} {_format_seconds(old['median_s'])} -> "
+              f"{_format_seconds(case['median_s'])}  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite and save the results as JSON.')
+    parser.add_argument('--suites', nargs='+', default=list(SUITES), choices=SUITES, help='Suites to run')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 50, 200],
+                        help='Page counts for the extraction fixtures')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (statistics are per call)')
+    parser.add_argument('--min-run-s', type=float, default=0.05,
+                        help='Fast cases are called repeatedly until one run lasts this long')
+    parser.add_argument('--seed', type=int, default=0, help='Fixture seed')
+    parser.add_argument('--quick', action='store_true', help='Small fixtures and fewer runs, for a smoke test')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<UTC time>.json)')
+    parser.add_argument('--compare', metavar='RESULTS', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative median change reported as slower/faster in --compare')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 if --compare finds a slower case')
+    args = parser.parse_args()
+    if args.quick:
+        args.pages = [1, 10]
+        args.repeat = min(args.repeat, 3)
+        args.min_run_s = min(args.min_run_s, 0.02)
+
+    # Validation failures are expected (malformed fixtures); keep the output readable.
+    logging.disable(logging.CRITICAL)
+    runner = Runner(args.repeat, args.min_run_s)
+    meta = metadata(args)
+    start = time.perf_counter()
+    for suite in args.suites:
+        print(f"{suite}:")
+        if suite == 'extraction':
+            bench_extraction(runner, args.pages, args.seed)
+        elif suite == 'prompting':
+            bench_prompting(runner, args.seed)
+        elif suite == 'parsing':
+            bench_parsing(runner, args.seed)
+        elif suite == 'rendering':
+            bench_rendering(runner, args.seed)
+    meta['seconds'] = round(time.perf_counter() - start, 3)
+    results = {'schema': 1, 'meta': meta, 'cases': runner.cases}
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n{len(runner.cases)} cases in {meta['seconds']:.1f}s, results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
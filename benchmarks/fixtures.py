@@ -0,0 +1,263 @@
+"""Synthetic fixtures for the benchmarks.
+
+Everything is generated deterministically from a seed, so runs on different
+machines parse exactly the same documents. PDFs are written by hand (standard
+Type1 Helvetica, one content stream per page) and DOCX files are assembled as
+a minimal WordprocessingML zip, so no document library is needed to build
+them. :func:`llm_outputs` gives canned model replies, well-formed and broken
+in the ways models actually break JSON.
+"""
+
+import io
+import json
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+FIRST_NAMES = ['Asha', 'Ben', 'Chen', 'Diego', 'Elif', 'Farah', 'Gabe', 'Hana', 'Ivan', 'Jaya']
+LAST_NAMES = ['Patel', 'Okafor', 'Nguyen', 'Schmidt', 'Garcia', 'Kowalski', 'Sato', 'Haddad']
+COMPANIES = ['Acme Analytics', 'Northwind Labs', 'Globex', 'Initech', 'Umbrella Health', 'Stark Cloud']
+TITLES = ['Software Engineer', 'Data Scientist', 'Backend Developer', 'ML Engineer', 'Product Analyst']
+SKILLS = ['Python', 'SQL', 'React', 'TypeScript', 'Docker', 'Kubernetes', 'AWS', 'PyTorch', 'Pandas',
+          'FastAPI', 'PostgreSQL', 'Spark', 'Airflow', 'Git', 'Terraform', 'Communication', 'Leadership']
+VERBS = ['Built', 'Designed', 'Led', 'Optimized', 'Migrated', 'Automated', 'Shipped', 'Scaled']
+OBJECTS = ['a data pipeline', 'the billing service', 'an internal dashboard', 'model training jobs',
+           'the search API', 'CI/CD workflows', 'a recommendation engine', 'the onboarding flow']
+RESULTS = ['cutting latency by 40%', 'saving $120k per year', 'serving 2M users', 'reducing errors by 65%',
+           'halving build times', 'improving conversion by 12%']
+
+LINES_PER_PAGE = 52
+
+
+def resume_lines(pages, seed=0):
+    """Plain-text resume long enough to fill roughly ``pages`` pages."""
+    rng = random.Random(seed)
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+    lines = [
+        name,
+        f'{name.lower().replace(" ", ".")}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}',
+        'linkedin.com/in/' + name.lower().replace(' ', '-'),
+        '',
+        'SUMMARY',
+        f'{rng.choice(TITLES)} with {rng.randint(2, 15)} years of experience building reliable products.',
+        '',
+        'SKILLS',
+        ', '.join(rng.sample(SKILLS, 10)),
+        '',
+        'EXPERIENCE',
+    ]
+    year = 2024
+    while len(lines) < pages * LINES_PER_PAGE - 6:
+        start = year - rng.randint(1, 3)
+        lines.append(f'{rng.choice(TITLES)} - {rng.choice(COMPANIES)}    {start} - {year}')
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f'- {rng.choice(VERBS)} {rng.choice(OBJECTS)}, {rng.choice(RESULTS)}.')
+        lines.append('')
+        year = start
+    lines += ['EDUCATION', f'B.S. Computer Science - State University    {year - 4} - {year}']
+    return lines
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(lines, lines_per_page=LINES_PER_PAGE):
+    """Build a text PDF from ``lines`` and return its bytes."""
+    chunks = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = []  # object bodies, object number = index + 1
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    pages_obj = add(None)
+    font = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+    page_ids = []
+    for chunk in chunks:
+        ops = ['BT', '/F1 10 Tf', '13 TL', '50 760 Td']
+        for line in chunk:
+            ops.append(f'({_pdf_escape(line)}) Tj T*')
+        ops.append('ET')
+        stream = '\n'.join(ops).encode('latin-1', 'replace')
+        content = add(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        page_ids.append(add(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>' % (pages_obj, font, content)
+        ))
+    objects[catalog - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages_obj
+    kids = b' '.join(b'%d 0 R' % pid for pid in page_ids)
+    objects[pages_obj - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_ids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+def resume_pdf(pages, seed=0):
+    """Synthetic resume PDF with exactly ``pages`` pages."""
+    lines = resume_lines(pages, seed)[:pages * LINES_PER_PAGE]
+    lines += [''] * (pages * LINES_PER_PAGE - len(lines))
+    return make_pdf(lines)
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def make_docx(lines, lines_per_page=LINES_PER_PAGE):
+    """Build a DOCX with one paragraph per line and a page break every ``lines_per_page``."""
+    paragraphs = []
+    for number, line in enumerate(lines):
+        page_break = '<w:r><w:br w:type="page"/></w:r>' if number and number % lines_per_page == 0 else ''
+        paragraphs.append(f'<w:p>{page_break}<w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>')
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(paragraphs)}</w:body></w:document>'
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr('[Content_Types].xml', _DOCX_CONTENT_TYPES)
+        docx.writestr('_rels/.rels', _DOCX_RELS)
+        docx.writestr('word/document.xml', document)
+    return out.getvalue()
+
+
+def resume_docx(pages, seed=0):
+    """Synthetic resume DOCX spanning ``pages`` pages."""
+    return make_docx(resume_lines(pages, seed)[:pages * LINES_PER_PAGE])
+
+
+def resume_content(seed=0, jobs=4):
+    """A resume's ``content`` object, as stored with resumes and rendered by the templates."""
+    rng = random.Random(seed)
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+    year = 2024
+    experience = []
+    for _ in range(jobs):
+        start = year - rng.randint(1, 3)
+        experience.append({
+            'company': rng.choice(COMPANIES),
+            'position': rng.choice(TITLES),
+            'startDate': str(start),
+            'endDate': str(year),
+            'description': ' '.join(
+                f'{rng.choice(VERBS)} {rng.choice(OBJECTS)}, {rng.choice(RESULTS)}.' for _ in range(4)
+            ),
+        })
+        year = start
+    return {
+        'personal': {
+            'name': name,
+            'title': rng.choice(TITLES),
+            'email': f'{name.lower().replace(" ", ".")}@example.com',
+            'phone': f'+1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}',
+            'location': 'Austin, TX',
+            # Apostrophes keep the single-quote repair honest (``'team's'``).
+            'summary': (f"{rng.choice(TITLES)} with {rng.randint(2, 15)} years of experience building reliable "
+                        f"products; {rng.choice(COMPANIES)}'s go-to for systems that don't page anyone at night."),
+        },
+        'experience': experience,
+        'education': [{
+            'school': 'State University',
+            'degree': 'B.S.',
+            'field': 'Computer Science',
+            'startDate': str(year - 4),
+            'endDate': str(year),
+        }],
+        'skills': rng.sample(SKILLS, 10),
+        'projects': [{
+            'title': f'{rng.choice(OBJECTS).split()[-1].title()} rewrite',
+            'description': f'{rng.choice(VERBS)} {rng.choice(OBJECTS)}, {rng.choice(RESULTS)}.',
+            'startDate': '2023',
+            'endDate': '2024',
+        }],
+        'certifications': [{'name': 'AWS Certified Developer', 'issuer': 'Amazon', 'date': '2022'}],
+        'awards': [{'award': 'Engineering Excellence', 'date': '2023', 'description': 'Company-wide award.'}],
+    }
+
+
+def portfolio_row(seed=0, template_id=None):
+    """A ``portfolios`` table row for the static-site builder."""
+    content = resume_content(seed)
+    personal = content['personal']
+    return {
+        'user_id': f'user-{seed}',
+        'template_id': template_id,
+        'title': f"{personal['name']}'s portfolio",
+        'description': personal['summary'],
+        'theme': 'dark',
+        'basic_info': {
+            'name': personal['name'],
+            'email': personal['email'],
+            'phone': personal['phone'],
+            'country': 'United States',
+            'current_designation': personal['title'],
+        },
+        'skills': {'technical_skills': content['skills'][:7], 'soft_skills': content['skills'][7:], 'languages': ['English']},
+        'experience': [
+            {'company': e['company'], 'position': e['position'], 'start_date': e['startDate'],
+             'end_date': e['endDate'], 'description': e['description']}
+            for e in content['experience']
+        ],
+        'education': [{'institution': 'State University', 'degree': 'B.S.', 'field_of_study': 'Computer Science',
+                       'start_date': '2012', 'end_date': '2016', 'description': ''}],
+        'projects': [{'name': p['title'], 'description': p['description'], 'start_date': p['startDate'],
+                      'end_date': p['endDate'], 'url': 'https://example.com'} for p in content['projects']],
+        'certifications': content['certifications'],
+        'testimonials': [{'name': 'A. Manager', 'date': '2023', 'rating': 5, 'text': 'Great to work with.'}],
+        'linkedin_url': 'https://linkedin.com/in/example',
+        'github_url': 'https://github.com/example',
+    }
+
+
+# Malformed replies that repair without losing or adding anything.
+LOSSLESS_OUTPUTS = ('valid', 'code_fence', 'preamble', 'trailing_commas', 'single_quotes', 'unquoted_keys')
+
+
+def llm_outputs(seed=0):
+    """Canned model replies for a generated resume, keyed by how they are (mal)formed.
+
+    ``schema_invalid`` parses but lacks required fields; every other reply
+    repairs to a resume that passes ``validate_resume_json``, and those in
+    :data:`LOSSLESS_OUTPUTS` back to exactly ``resume_content(seed)``.
+    """
+    content = resume_content(seed)
+    valid = json.dumps(content, indent=2)
+    truncated = valid[:int(len(valid) * 0.8)]
+    return {
+        'valid': valid,
+        'code_fence': f'```json\n{valid}\n```',
+        'preamble': f"Here is the revised resume as JSON:\n\n{valid}\n\nLet me know if you need changes.",
+        'trailing_commas': valid.replace('\n  }', ',\n  }').replace('\n  ]', ',\n  ]'),
+        'single_quotes': valid.replace('"', "'"),
+        'unquoted_keys': json.dumps(content).replace('"personal":', 'personal:').replace('"skills":', 'skills:'),
+        'python_literals': valid.replace('"awards"', '"open_to_work": True, "references": None, "awards"'),
+        'truncated': truncated,
+        'schema_invalid': json.dumps({'personal': content['personal'], 'skills': content['skills']}),
+    }
@@ -1,17 +1,28 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
+import asyncio
+import json
 import os
+import time
+import weakref
 from dotenv import load_dotenv
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
 
 # Import script functions
-from optimize_resume import analyze_resume
-from generate_cover_letter import generate_cover_letter_api
-from generate_summary import generate_summary
-from extract_pdf import extract_text_from_pdf
+from optimize_resume import analyze_resume, analyze_batch_item, ANALYSIS_MODEL, BATCH_MAX_ITEMS, BATCH_MAX_PARALLEL
+from generate_cover_letter import generate_cover_letter_api, build_cover_letter_prompt, COVER_LETTER_MODEL
+from generate_summary import generate_summary, build_summary_messages, SUMMARY_MODEL, SUMMARY_MAX_TOKENS, EMPTY_PORTFOLIO_MESSAGE
+from extract_pdf import extract_pdf as extract_pdf_document
+from document_extraction import PDF_TIERS
+import llm_client
+import resume_preview
+import structured_output
+from prompt_builder import normalize_whitespace
+from concurrency import flights, limiters, request_key, run_blocking, stats as limiter_stats
 
 # Load environment variables
 load_dotenv()
@@ -36,6 +47,15 @@ class ResumeRequest(BaseModel):
     text: str
     job_description: Optional[str] = None
 
+class BatchItem(BaseModel):
+    resume_text: str
+    job_description: Optional[str] = None
+    id: Optional[str] = None
+
+class BatchResumeRequest(BaseModel):
+    items: List[BatchItem]
+    max_parallel: Optional[int] = None
+
 class CoverLetterRequest(BaseModel):
     resume_text: str
     job_description: str
@@ -54,11 +74,47 @@ class SummaryRequest(BaseModel):
 
 class ExtractPDFRequest(BaseModel):
     file_path: str
+    tier: Optional[str] = "auto"
+
+class PreviewRequest(BaseModel):
+    template: str
+    content: dict
+    # Section hashes the client already shows; omit for a full document.
+    known: Optional[Dict[str, str]] = None
 
 @app.get("/")
 async def root():
     return {"message": "PortfolioAI API is running"}
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "routes": limiter_stats(),
+        "llm_scheduler": llm_client.scheduler.stats(),
+        "structured_output": structured_output.stats(),
+        "preview_fragments": resume_preview.renderer().stats(),
+    }
+
+# Blocking calls below run on the shared thread pool and every route holds a
+# slot of its limiter, so a slow request never stalls the event loop and
+# overload is answered with 429/503 instead of piling up.
+
+async def coalesced(route, key, call):
+    """Await ``call()`` under the route's limiter, shared with identical in-flight requests.
+
+    ``key`` must cover every input that affects the result; whitespace in free
+    text is normalized first since the prompt builder collapses it anyway.
+    """
+    async def limited():
+        async with limiters[route].slot():
+            return await call()
+    try:
+        return await flights[route].do(key, limited)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/generate")
 async def generate_text(request: GenerateRequest):
     try:
@@ -72,50 +128,213 @@ async def generate_text(request: GenerateRequest):
 
 @app.post("/generate-resume")
 async def generate_resume(req: ResumeRequest):
+    groq_api_key = os.getenv('GROQ_API_KEY')
+    if not groq_api_key:
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set")
+    job_description = req.job_description or ''
+    key = request_key(ANALYSIS_MODEL, normalize_whitespace(req.text), normalize_whitespace(job_description))
+    return await coalesced('generate_resume', key, lambda: run_blocking(
+        analyze_resume, req.text, job_description, groq_api_key
+    ))
+
+async def batch_records(items, groq_api_key, parallel):
+    """Run batch items ``parallel`` at a time, yielding NDJSON lines as each finishes, then a summary line."""
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def run(index, item):
+        async with semaphore:
+            return await run_blocking(analyze_batch_item, index, item, groq_api_key)
+
+    tasks = [asyncio.ensure_future(run(index, item.model_dump())) for index, item in enumerate(items)]
+    succeeded = 0
     try:
-        groq_api_key = os.getenv('GROQ_API_KEY')
-        if not groq_api_key:
-            raise HTTPException(status_code=500, detail="GROQ_API_KEY not set")
-        result = analyze_resume(req.text, req.job_description or '', groq_api_key)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        for next_done in asyncio.as_completed(tasks):
+            record = await next_done
+            succeeded += record['status'] == 'ok'
+            yield json.dumps(record) + "\n"
+        yield json.dumps({"summary": {
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "seconds": time.perf_counter() - start,
+        }}) + "\n"
+    finally:
+        # Client went away: do not start the items still queued.
+        for task in tasks:
+            task.cancel()
+
+@app.post("/generate-resume/batch")
+async def generate_resume_batch(req: BatchResumeRequest):
+    groq_api_key = os.getenv('GROQ_API_KEY')
+    if not groq_api_key:
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set")
+    if len(req.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"Batch has {len(req.items)} items, the limit is {BATCH_MAX_ITEMS}")
+    parallel = max(1, min(req.max_parallel or BATCH_MAX_PARALLEL, BATCH_MAX_PARALLEL))
+    return await limited_stream(
+        limiters['generate_resume_batch'],
+        batch_records(req.items, groq_api_key, parallel),
+        "application/x-ndjson",
+    )
 
 @app.post("/generate-cover-letter")
 async def generate_cover_letter(req: CoverLetterRequest):
-    try:
-        cover_letter = generate_cover_letter_api(
-            resume_text=req.resume_text,
-            job_description=req.job_description,
-            full_name=req.full_name,
-            email=req.email,
-            address=req.address,
-            phone=req.phone,
-            date=req.date,
-            hiring_manager=req.hiring_manager,
-            hiring_title=req.hiring_title,
-            company=req.company,
-            company_address=req.company_address
-        )
-        return {"cover_letter": cover_letter}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    fields = req.model_dump()
+    fields['resume_text'] = normalize_whitespace(fields['resume_text'])
+    fields['job_description'] = normalize_whitespace(fields['job_description'])
+    key = request_key(COVER_LETTER_MODEL, fields)
+    cover_letter = await coalesced('generate_cover_letter', key, lambda: run_blocking(
+        generate_cover_letter_api,
+        resume_text=req.resume_text,
+        job_description=req.job_description,
+        full_name=req.full_name,
+        email=req.email,
+        address=req.address,
+        phone=req.phone,
+        date=req.date,
+        hiring_manager=req.hiring_manager,
+        hiring_title=req.hiring_title,
+        company=req.company,
+        company_address=req.company_address
+    ))
+    return {"cover_letter": cover_letter}
 
 @app.post("/generate-summary")
 async def summary(req: SummaryRequest):
+    key = request_key(SUMMARY_MODEL, req.portfolio_data)
+    result = await coalesced('generate_summary', key, lambda: run_blocking(generate_summary, req.portfolio_data))
+    return {"summary": result}
+
+def sse_event(event, data):
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_completion(messages, model, **params):
+    """Relay a streamed completion as SSE: ``token`` events, then ``done`` with the full text and usage."""
+    start = time.perf_counter()
+    first_token = None
     try:
-        result = generate_summary(req.portfolio_data)
-        return {"summary": result}
+        async for event in llm_client.astream(messages, model=model, **params):
+            if event['type'] == 'delta':
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                yield sse_event("token", {"text": event['text']})
+            else:
+                yield sse_event("done", {
+                    "text": event['text'].strip(),
+                    "usage": event['usage'],
+                    "time_to_first_token": first_token,
+                    "seconds": time.perf_counter() - start,
+                })
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        yield sse_event("error", {"detail": str(e)})
+
+class HeldSlot:
+    """A limiter slot that is released exactly once."""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.held = True
+
+    def release(self):
+        if self.held:
+            self.held = False
+            self.limiter.release()
+
+class LimitedStreamingResponse(StreamingResponse):
+    """Streaming response that owns a limiter slot.
+
+    The slot is released once the response is sent, fails or is cancelled by
+    a disconnect, even if the body generator never started, and as a last
+    resort when a response that was never sent is garbage collected.
+    """
+
+    def __init__(self, slot, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.slot = slot
+        weakref.finalize(self, slot.release)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.slot.release()
+
+async def limited_stream(limiter, events, media_type):
+    # Acquire before the response starts so overload is still a 429/503.
+    await limiter.acquire()
+    slot = HeldSlot(limiter)
+    try:
+        return LimitedStreamingResponse(
+            slot,
+            events,
+            media_type=media_type,
+            # Stop proxies from buffering the stream
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    except BaseException:
+        slot.release()
+        raise
+
+async def sse_response(limiter, events):
+    return await limited_stream(limiter, events, "text/event-stream")
+
+@app.post("/generate-cover-letter/stream")
+async def generate_cover_letter_stream(req: CoverLetterRequest):
+    if not os.getenv('GROQ_API_KEY'):
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set")
+    fitted = build_cover_letter_prompt(
+        resume_text=req.resume_text,
+        job_description=req.job_description,
+        full_name=req.full_name,
+        email=req.email,
+        address=req.address,
+        phone=req.phone,
+        date=req.date,
+        hiring_manager=req.hiring_manager,
+        hiring_title=req.hiring_title,
+        company=req.company,
+        company_address=req.company_address
+    )
+    return await sse_response(limiters['generate_cover_letter'], stream_completion(
+        fitted['messages'], COVER_LETTER_MODEL, max_tokens=fitted['max_tokens'], temperature=0.7
+    ))
+
+@app.post("/generate-summary/stream")
+async def summary_stream(req: SummaryRequest):
+    if not os.getenv('GROQ_API_KEY'):
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set")
+    messages = build_summary_messages(req.portfolio_data)
+    if messages is None:
+        async def empty():
+            yield sse_event("done", {"text": EMPTY_PORTFOLIO_MESSAGE, "usage": None})
+        return await sse_response(limiters['generate_summary'], empty())
+    return await sse_response(limiters['generate_summary'], stream_completion(
+        messages, SUMMARY_MODEL, max_tokens=SUMMARY_MAX_TOKENS, temperature=0.7
+    ))
 
 @app.post("/extract-pdf")
 async def extract_pdf(req: ExtractPDFRequest):
-    try:
-        text = extract_text_from_pdf(req.file_path)
-        return {"text": text}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    tier = req.tier or "auto"
+    if tier not in PDF_TIERS:
+        raise HTTPException(status_code=400, detail=f"Unknown extraction tier: {tier} (expected one of {', '.join(PDF_TIERS)})")
+    async with limiters['extract_pdf'].slot():
+        try:
+            result = await run_blocking(extract_pdf_document, req.file_path, tier=tier)
+            return {"text": result["text"], "tier": result["tier"], "seconds": result["seconds"]}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/preview-resume")
+async def preview_resume(req: PreviewRequest):
+    # Renders take well under a millisecond once fragments are cached, so this
+    # runs on the event loop instead of paying for a thread pool hop.
+    async with limiters['preview_resume'].slot():
+        try:
+            return resume_preview.render_preview(req.template, req.content, req.known)
+        except (ValueError, FileNotFoundError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
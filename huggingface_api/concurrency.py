@@ -0,0 +1,190 @@
+"""Admission control for the API routes.
+
+Each route gets a :class:`RouteLimiter`: at most ``concurrency`` requests run
+at once, at most ``max_queue`` more wait for a slot, and a waiter that cannot
+get one within ``queue_timeout`` seconds is turned away. Overload therefore
+shows up as a fast 429 (queue full) or 503 (queue too slow) with a
+``Retry-After`` header instead of unbounded latency.
+
+Blocking work (sync LLM calls, document extraction) runs on a bounded thread
+pool via :func:`run_blocking` so it never stalls the event loop.
+
+Identical requests that arrive while one is already running are coalesced by
+:class:`SingleFlight`: they await the same upstream call instead of spending
+LLM quota on a duplicate.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+from fastapi import HTTPException
+
+# Worker threads for blocking calls; LLM requests spend their time waiting on
+# the network, so this can be well above the core count.
+BLOCKING_WORKERS = int(os.getenv('API_BLOCKING_WORKERS', 32))
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix='api-blocking')
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run ``fn(*args, **kwargs)`` on the shared thread pool and await the result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(fn, *args, **kwargs))
+
+
+class RouteLimiter:
+    """Concurrency limit plus a bounded wait queue for one route."""
+
+    def __init__(self, name, concurrency, max_queue, queue_timeout):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.total_wait = 0.0
+
+    def _retry_after(self):
+        return str(max(1, int(self.queue_timeout)))
+
+    async def acquire(self):
+        """Wait for a slot, raising 429 if the queue is full or 503 on timeout."""
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many concurrent {self.name} requests, try again shortly",
+                headers={'Retry-After': self._retry_after()},
+            )
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.name} is overloaded, try again shortly",
+                headers={'Retry-After': self._retry_after()},
+            )
+        finally:
+            self.waiting -= 1
+        self.total_wait += time.perf_counter() - start
+        self.active += 1
+        self.admitted += 1
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        return {
+            'concurrency': self.concurrency,
+            'max_queue': self.max_queue,
+            'active': self.active,
+            'waiting': self.waiting,
+            'admitted': self.admitted,
+            'rejected_queue_full': self.rejected_queue_full,
+            'rejected_timeout': self.rejected_timeout,
+            'avg_wait_s': self.total_wait / self.admitted if self.admitted else 0.0,
+        }
+
+
+# route -> (concurrency, max_queue). Overridable per route with
+# API_LIMIT_<ROUTE>=concurrency,max_queue, e.g. API_LIMIT_EXTRACT_PDF=2,8.
+ROUTE_LIMITS = {
+    'generate_resume': (8, 32),
+    # Whole batches; each runs up to BATCH_MAX_PARALLEL analyses itself.
+    'generate_resume_batch': (2, 4),
+    'generate_cover_letter': (8, 32),
+    'generate_summary': (16, 64),
+    'extract_pdf': (4, 16),
+    # Keystroke-rate editor previews; each render takes well under a millisecond.
+    'preview_resume': (32, 128),
+}
+QUEUE_TIMEOUT = float(os.getenv('API_QUEUE_TIMEOUT', 30))
+
+
+def _configured(route, default):
+    value = os.getenv(f'API_LIMIT_{route.upper()}')
+    if not value:
+        return default
+    concurrency, max_queue = (int(part) for part in value.split(','))
+    return concurrency, max_queue
+
+
+limiters = {
+    route: RouteLimiter(route, *_configured(route, default), queue_timeout=QUEUE_TIMEOUT)
+    for route, default in ROUTE_LIMITS.items()
+}
+
+
+def request_key(*parts):
+    """Stable hash of JSON-serialisable request inputs (dict keys sorted)."""
+    encoded = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    Only calls that overlap in time are merged; once the leader finishes the
+    key is forgotten, so results are never reused after the fact.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._in_flight = {}
+        self.leaders = 0
+        self.collapsed = 0
+
+    async def do(self, key, fn):
+        """Await ``fn()`` or, if an identical call is running, its result."""
+        task = self._in_flight.get(key)
+        if task is None:
+            self.leaders += 1
+            # Run as a task so a leader whose client disconnects does not
+            # cancel the call for the followers.
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def stats(self):
+        calls = self.leaders + self.collapsed
+        return {
+            'upstream_calls': self.leaders,
+            'collapsed': self.collapsed,
+            'in_flight': len(self._in_flight),
+            'collapse_rate': self.collapsed / calls if calls else 0.0,
+        }
+
+
+flights = {route: SingleFlight(route) for route in ROUTE_LIMITS}
+
+
+def stats():
+    return {
+        route: {**limiter.stats(), 'coalescing': flights[route].stats()}
+        for route, limiter in limiters.items()
+    }
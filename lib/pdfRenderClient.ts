@@ -0,0 +1,95 @@
+// lib/pdfRenderClient.ts
+// Client for the PDF render server (scripts/generate_resume_pdf.py --serve).
+// Set PDF_RENDER_SOCKET to its Unix socket path or HOST:PORT.
+import net from 'net';
+
+// The server answers within its queue wait plus render timeout (30s each by
+// default); past this the server is treated as unreachable.
+const RENDER_TIMEOUT_MS = Number(process.env.PDF_RENDER_CLIENT_TIMEOUT_MS || 65000);
+
+export type PdfRenderRequest =
+  | { html: string }
+  | { template: string; content: unknown };
+
+// The server replied with an error for this document.
+export class PdfRenderError extends Error {
+  constructor(message: string, public status: number = 500) {
+    super(message);
+  }
+}
+
+// The server could not be reached, went away mid-request or did not answer in
+// time; the caller should fall back to rendering another way.
+export class PdfRenderUnavailableError extends Error {}
+
+export function pdfRenderServerAddress(): string | undefined {
+  return process.env.PDF_RENDER_SOCKET || undefined;
+}
+
+function connect(address: string): net.Socket {
+  const separator = address.lastIndexOf(':');
+  if (separator > 0 && !address.includes('/')) {
+    return net.createConnection({ host: address.slice(0, separator), port: Number(address.slice(separator + 1)) });
+  }
+  return net.createConnection({ path: address });
+}
+
+// Render one document on the server and return the PDF bytes. Repeat
+// renders of the same document are served from the server's render cache.
+export function renderPdf(
+  request: PdfRenderRequest,
+  address = pdfRenderServerAddress(),
+  timeoutMs = RENDER_TIMEOUT_MS,
+): Promise<Buffer> {
+  if (!address) {
+    return Promise.reject(new PdfRenderError('PDF_RENDER_SOCKET is not set'));
+  }
+  return new Promise((resolve, reject) => {
+    const socket = connect(address);
+    let buffered = Buffer.alloc(0);
+    let size: number | null = null;
+    let settled = false;
+
+    const timer = setTimeout(() => {
+      finish(new PdfRenderUnavailableError(`PDF render server did not answer within ${timeoutMs}ms`));
+    }, timeoutMs);
+
+    const finish = (error: Error | null, pdf?: Buffer) => {
+      if (settled) return;
+      settled = true;
+      clearTimeout(timer);
+      socket.destroy();
+      if (error) reject(error);
+      else resolve(pdf!);
+    };
+
+    socket.on('connect', () => {
+      socket.write(JSON.stringify({ id: 1, ...request }) + '\n');
+    });
+    socket.on('data', (chunk: Buffer) => {
+      buffered = Buffer.concat([buffered, chunk]);
+      if (size === null) {
+        const newline = buffered.indexOf(0x0a);
+        if (newline === -1) return;
+        let header: { size?: number; error?: string; status?: number };
+        try {
+          header = JSON.parse(buffered.subarray(0, newline).toString('utf-8'));
+        } catch (error) {
+          finish(error as Error);
+          return;
+        }
+        buffered = buffered.subarray(newline + 1);
+        if (header.error) {
+          finish(new PdfRenderError(header.error, header.status ?? 500));
+          return;
+        }
+        size = header.size ?? 0;
+      }
+      if (buffered.length >= size) {
+        finish(null, buffered.subarray(0, size));
+      }
+    });
+    socket.on('error', (error) => finish(new PdfRenderUnavailableError(`PDF render server unavailable: ${error.message}`)));
+    socket.on('close', () => finish(new PdfRenderUnavailableError('PDF render server closed the connection')));
+  });
+}
@@ -0,0 +1,75 @@
+"""Structured resumes from earlier analyses, keyed by resume text hash.
+
+``optimize_resume.analyze_resume`` already returns a ``structured_resume``;
+remembering it lets a later rewrite of the same resume skip re-parsing the
+raw text. The key is the SHA-256 of the whitespace-normalized text, so it
+does not depend on which job description the resume was analyzed against;
+job-specific fields such as ``skills.keyword_gaps`` are therefore never
+stored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from disk_cache import DiskCache, DEFAULT_CACHE_DIR
+from prompt_builder import normalize_whitespace
+
+logger = logging.getLogger(__name__)
+
+_cache = None
+
+# section -> fields that depend on the job description rather than the resume
+JOB_SPECIFIC_FIELDS = {'skills': ('keyword_gaps',)}
+
+
+def _disabled():
+    return os.getenv('ANALYSIS_CACHE_DISABLED') == '1'
+
+
+def _store():
+    global _cache
+    if _cache is None:
+        _cache = DiskCache(
+            os.path.join(os.getenv('ANALYSIS_CACHE_DIR', DEFAULT_CACHE_DIR), 'structured_resumes.sqlite3'),
+            max_bytes=int(os.getenv('ANALYSIS_CACHE_MAX_MB', 64)) * 1024 * 1024,
+            ttl=float(os.getenv('ANALYSIS_CACHE_TTL', 30 * 24 * 3600)),
+        )
+    return _cache
+
+
+def resume_key(resume_text):
+    return hashlib.sha256(normalize_whitespace(resume_text).encode('utf-8')).hexdigest()
+
+
+def _resume_only(structured_resume):
+    """Copy of ``structured_resume`` without its job-specific fields."""
+    resume = dict(structured_resume)
+    for section, fields in JOB_SPECIFIC_FIELDS.items():
+        if isinstance(resume.get(section), dict):
+            resume[section] = {k: v for k, v in resume[section].items() if k not in fields}
+    return resume
+
+
+def remember(resume_text, structured_resume):
+    """Record ``structured_resume`` as the parse of ``resume_text``."""
+    if _disabled() or not resume_text or not isinstance(structured_resume, dict):
+        return
+    _store().set(resume_key(resume_text), json.dumps(_resume_only(structured_resume)))
+
+
+def lookup(resume_text):
+    """Return the structured resume of an earlier analysis of ``resume_text``, or None."""
+    if _disabled() or not resume_text:
+        return None
+    value = _store().get(resume_key(resume_text))
+    if value is None:
+        return None
+    logger.info("Reusing structured resume from an earlier analysis")
+    # Entries written before job-specific fields were dropped may still carry them.
+    return _resume_only(json.loads(value))
+
+
+def stats():
+    return _store().stats()
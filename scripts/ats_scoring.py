@@ -0,0 +1,322 @@
+"""Local, deterministic ATS keyword-match scoring.
+
+A job description is reduced to weighted key terms: unigrams and bigrams
+that do not cross stopwords or punctuation, weighted by sublinear term
+frequency times inverse document frequency over a corpus of job
+descriptions, with a boost for multi-word phrases. The resume scores the
+weighted share of those terms it contains, and the heaviest missing terms
+become the keyword gaps.
+
+The corpus is a small SQLite table of document frequencies, so terms that
+appear in every posting ("team", "experience") sink while distinctive ones
+rise. It is fed offline, each job description counted once by content hash:
+
+    python3 scripts/ats_scoring.py --learn postings/*.txt
+
+Scoring only reads it, so the same resume and job description score the
+same on every request until the corpus is deliberately updated. With an
+empty corpus every IDF is 1 and scoring falls back to term frequency alone.
+
+Skill mentions are first rewritten to their canonical taxonomy names (see
+:mod:`skills_taxonomy`), so "k8s" in a resume matches "Kubernetes" in the
+posting, and the posting's recognised skills count double.
+
+Scoring one resume against many job descriptions builds a CSR matrix of
+term weights and reduces it with NumPy in one pass.
+"""
+
+import argparse
+import hashlib
+import logging
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+
+import numpy as np
+
+import skills_taxonomy
+from disk_cache import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+MAX_GAPS = 15
+PHRASE_BOOST = 1.5
+
+STOPWORDS = frozenset('''
+a about above across after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either etc few for from further
+had has have having he her here hers him his how i if in into is it its itself just like may me might
+more most must my no nor not now of off on once only or other our ours out over own per plus same she
+should so some such than that the their theirs them then there these they this those through to too
+under until up upon us very via was we well were what when where which while who whom why will with
+within without would yet you your yours
+ability able across apply applicant applicants candidate candidates company strong excellent good great
+preferred required requirements requirement responsibilities responsibility role position job jobs
+including include includes work working team teams year years experience experienced knowledge
+understanding skills skill familiarity familiar proficiency proficient plus bonus ideal ideally looking
+join help new using use used related relevant least minimum equivalent opportunity opportunities
+environment day days within based across ensure etc e g eg ie highly demonstrated proven solid hands
+senior junior mid level building build develop developing deliver delivering seeking want need needs
+'''.split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*")
+# Punctuation that ends a phrase: bigrams never span it.
+_BREAK_RE = re.compile(r"[,;:()\[\]!?\n•·|]|\.\s")
+
+
+def _fragments(text):
+    return _BREAK_RE.split((text or '').lower())
+
+
+def tokenize(text):
+    """Lowercased word tokens, keeping tech spellings such as ``c++``, ``node.js`` and ``ci/cd``."""
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+def extract_terms(text):
+    """Return ``{term: count}`` for the unigrams and bigrams of ``text``.
+
+    Stopwords and tokens starting with a digit (years, ``5+``) are dropped
+    and bigrams never span a stopword or a punctuation break.
+    """
+    counts = {}
+    for fragment in _fragments(text):
+        previous = None
+        for token in tokenize(fragment):
+            if token in STOPWORDS or token[0].isdigit() or len(token) < 2 and token not in ('c', 'r'):
+                previous = None
+                continue
+            counts[token] = counts.get(token, 0) + 1
+            if previous is not None:
+                bigram = f'{previous} {token}'
+                counts[bigram] = counts.get(bigram, 0) + 1
+            previous = token
+    return counts
+
+
+class JDCorpus:
+    """Document frequencies of terms over the job descriptions seen so far."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(os.getenv('ATS_CORPUS_DIR', DEFAULT_CACHE_DIR), 'jd_corpus.sqlite3')
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS docs (hash TEXT PRIMARY KEY);
+                CREATE TABLE IF NOT EXISTS df (term TEXT PRIMARY KEY, count INTEGER NOT NULL);
+            ''')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add(self, text, terms=None):
+        """Count ``text`` once in the corpus; returns False if it was already counted."""
+        digest = hashlib.sha256((text or '').strip().encode('utf-8')).hexdigest()
+        terms = terms if terms is not None else extract_terms(text)
+        try:
+            conn = self._connect()
+            with conn:
+                if conn.execute('INSERT OR IGNORE INTO docs VALUES (?)', (digest,)).rowcount == 0:
+                    return False
+                conn.executemany(
+                    'INSERT INTO df VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET count = count + 1',
+                    [(term,) for term in terms],
+                )
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"JD corpus update failed: {e}")
+            return False
+
+    def idf(self, terms):
+        """Smoothed IDF for each term, as a dict."""
+        terms = list(terms)
+        try:
+            conn = self._connect()
+            n_docs = conn.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+            df = {}
+            for start in range(0, len(terms), 500):
+                chunk = terms[start:start + 500]
+                rows = conn.execute(
+                    f'SELECT term, count FROM df WHERE term IN ({",".join("?" * len(chunk))})', chunk
+                ).fetchall()
+                df.update(rows)
+        except sqlite3.Error as e:
+            logger.warning(f"JD corpus read failed: {e}")
+            n_docs, df = 0, {}
+        return {term: math.log((1 + n_docs) / (1 + df.get(term, 0))) + 1 for term in terms}
+
+
+_corpus = None
+
+
+def corpus():
+    """The shared corpus, or None when ATS_CORPUS_DISABLED=1."""
+    global _corpus
+    if os.getenv('ATS_CORPUS_DISABLED') == '1':
+        return None
+    if _corpus is None:
+        _corpus = JDCorpus()
+    return _corpus
+
+
+def term_weights(jd_text, idf=None, skill_terms=()):
+    """Weighted key terms of a job description as ``{term: weight}``."""
+    counts = extract_terms(jd_text)
+    if idf is None:
+        store = corpus()
+        idf = store.idf(counts) if store else {}
+    return _weigh(counts, idf, set(skill_terms))
+
+
+def _weigh(counts, idf, skill_terms):
+    weights = {}
+    for term, count in counts.items():
+        weight = (1 + math.log(count)) * idf.get(term, 1.0)
+        if ' ' in term:
+            weight *= PHRASE_BOOST
+        if term in skill_terms:
+            weight *= 2
+        weights[term] = weight
+    return weights
+
+
+def _gaps(terms, weights, present, limit):
+    """Heaviest missing terms, skipping words already covered by a listed phrase."""
+    order = np.argsort(-weights, kind='stable')
+    gaps = []
+    covered = set()
+    for index in order:
+        if present[index]:
+            continue
+        term = terms[index]
+        if term in covered:
+            continue
+        # A lone word that only matters inside a missing phrase adds nothing.
+        if ' ' not in term and any(term in gap.split() for gap in gaps):
+            continue
+        gaps.append(term)
+        covered.update(term.split())
+        if len(gaps) >= limit:
+            break
+    return gaps
+
+
+def _skill_terms(texts):
+    """Lowercased canonical names of the taxonomy skills mentioned in ``texts``."""
+    terms = set()
+    for text in texts:
+        for bucket in skills_taxonomy.extract(text).values():
+            terms.update(name.lower() for name in bucket)
+    return terms
+
+
+def score_many(resume_text, jd_texts, max_gaps=MAX_GAPS, learn=False, skill_terms=(), use_taxonomy=True):
+    """Score one resume against each job description.
+
+    Returns one ``{'score', 'keyword_gaps', 'matched_keywords'}`` per job
+    description, in order. ``score`` is 0-100: the weighted share of the
+    job description's key terms found in the resume. ``learn=True`` also
+    adds the job descriptions to the corpus, which changes later scores;
+    request paths leave it off.
+    """
+    raw_texts = jd_texts
+    skill_terms = set(skill_terms)
+    if use_taxonomy:
+        resume_text = skills_taxonomy.canonicalize(resume_text)
+        jd_texts = [skills_taxonomy.canonicalize(text) for text in jd_texts]
+        skill_terms |= _skill_terms(jd_texts)
+    jd_counts = [extract_terms(text) for text in jd_texts]
+    store = corpus()
+    if store and learn:
+        for text, counts in zip(raw_texts, jd_counts):
+            store.add(text, counts)
+    vocabulary = sorted(set().union(*jd_counts)) if jd_counts else []
+    index = {term: position for position, term in enumerate(vocabulary)}
+    idf = store.idf(vocabulary) if store else {}
+
+    # CSR matrix: row i holds the weights of job description i's terms.
+    indptr = [0]
+    indices = []
+    data = []
+    for counts in jd_counts:
+        for term, weight in _weigh(counts, idf, skill_terms).items():
+            indices.append(index[term])
+            data.append(weight)
+        indptr.append(len(indices))
+    indices = np.asarray(indices, dtype=np.int64)
+    data = np.asarray(data, dtype=np.float64)
+    indptr = np.asarray(indptr, dtype=np.int64)
+
+    resume_terms = extract_terms(resume_text)
+    present = np.fromiter((term in resume_terms for term in vocabulary), dtype=bool, count=len(vocabulary))
+
+    matched = data * present[indices] if len(data) else data
+    row_lengths = np.diff(indptr)
+    nonempty = row_lengths > 0
+    totals = np.zeros(len(jd_texts))
+    hits = np.zeros(len(jd_texts))
+    if len(data):
+        starts = indptr[:-1][nonempty]
+        totals[nonempty] = np.add.reduceat(data, starts)
+        hits[nonempty] = np.add.reduceat(matched, starts)
+    scores = np.divide(hits, totals, out=np.zeros_like(hits), where=totals > 0) * 100
+
+    results = []
+    for row in range(len(jd_texts)):
+        start, end = indptr[row], indptr[row + 1]
+        row_terms = [vocabulary[i] for i in indices[start:end]]
+        row_weights = data[start:end]
+        row_present = present[indices[start:end]]
+        order = np.argsort(-row_weights, kind='stable')
+        results.append({
+            'score': int(round(scores[row])),
+            'keyword_gaps': _gaps(row_terms, row_weights, row_present, max_gaps),
+            'matched_keywords': [row_terms[i] for i in order if row_present[i]][:max_gaps],
+        })
+    return results
+
+
+def score(resume_text, jd_text, max_gaps=MAX_GAPS, learn=False, skill_terms=(), use_taxonomy=True):
+    """Score a resume against one job description; see :func:`score_many`."""
+    return score_many(resume_text, [jd_text], max_gaps=max_gaps, learn=learn, skill_terms=skill_terms,
+                      use_taxonomy=use_taxonomy)[0]
+
+
+def learn(jd_texts):
+    """Add job descriptions to the corpus; returns how many were new."""
+    store = corpus()
+    if store is None:
+        raise RuntimeError('The JD corpus is disabled (ATS_CORPUS_DISABLED=1)')
+    added = 0
+    for text in jd_texts:
+        if (text or '').strip():
+            # Counted in the canonical form scoring sees, so aliases share counts.
+            added += store.add(text, extract_terms(skills_taxonomy.canonicalize(text)))
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the job-description corpus used for ATS scoring.")
+    parser.add_argument('--learn', nargs='+', metavar='FILE', required=True,
+                        help='Text files, one job description each, to add to the corpus')
+    args = parser.parse_args()
+    texts = []
+    for path in args.learn:
+        with open(path, encoding='utf-8') as f:
+            texts.append(f.read())
+    added = learn(texts)
+    print(f"Added {added} of {len(texts)} job descriptions to {corpus().path}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Small SQLite-backed key/value cache with TTL and LRU size-based eviction.
+
+Safe to share between threads and between the processes of the worker pool:
+each thread opens its own connection and the database runs in WAL mode.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv(
+    'PORTFOLIOAI_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'portfolioai'),
+)
+
+
+class DiskCache:
+    """Persistent cache of text (or bytes) values keyed by string.
+
+    Entries older than ``ttl`` seconds are treated as missing. When the total
+    stored size exceeds ``max_bytes`` the least recently used entries are
+    evicted. Hit and miss counts are persisted so they aggregate across
+    processes.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, ttl=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+                CREATE TABLE IF NOT EXISTS counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+            ''')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, conn, name, amount=1):
+        conn.execute('UPDATE counters SET value = value + ? WHERE name = ?', (amount, name))
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None on a miss."""
+        try:
+            conn = self._connect()
+            row = conn.execute('SELECT value, created FROM entries WHERE key = ?', (key,)).fetchone()
+            now = time.time()
+            if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+                if row is not None:
+                    conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._count(conn, 'misses')
+                return None
+            conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+            self._count(conn, 'hits')
+            return row[0]
+        except sqlite3.Error as e:
+            # A broken cache must never fail the request it was meant to speed up.
+            logger.warning(f"Cache read failed ({self.path}): {str(e)}")
+            return None
+
+    def set(self, key, value):
+        """Store ``value`` under ``key`` and evict LRU entries over the size cap."""
+        size = len(value) if isinstance(value, bytes) else len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        try:
+            conn = self._connect()
+            now = time.time()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                    (key, value, size, now, now),
+                )
+                self._evict(conn)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed ({self.path}): {str(e)}")
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed').fetchall():
+            conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+            evicted += 1
+            if total <= self.max_bytes:
+                break
+        self._count(conn, 'evictions', evicted)
+
+    def delete(self, key):
+        try:
+            self._connect().execute('DELETE FROM entries WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            logger.warning(f"Cache delete failed ({self.path}): {str(e)}")
+
+    def clear(self):
+        try:
+            conn = self._connect()
+            conn.execute('DELETE FROM entries')
+            conn.execute('UPDATE counters SET value = 0')
+        except sqlite3.Error as e:
+            logger.warning(f"Cache clear failed ({self.path}): {str(e)}")
+
+    def stats(self):
+        """Return hit/miss/eviction counters plus current entry count and size."""
+        try:
+            conn = self._connect()
+            stats = dict(conn.execute('SELECT name, value FROM counters').fetchall())
+            entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache stats failed ({self.path}): {str(e)}")
+            return {}
+        stats.update({'entries': entries, 'bytes': size})
+        lookups = stats.get('hits', 0) + stats.get('misses', 0)
+        stats['hit_rate'] = stats.get('hits', 0) / lookups if lookups else 0.0
+        return stats
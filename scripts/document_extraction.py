@@ -0,0 +1,380 @@
+"""Single entry point for turning uploaded resumes into text.
+
+PDFs go through one of two tiers:
+
+- ``fast``: PyPDF2 content-stream text. Cheap, but loses layout and sometimes
+  runs words together or emits junk for unusual encodings.
+- ``layout``: pdfplumber layout-aware extraction. Accurate, but the most
+  CPU-heavy non-LLM step we have.
+
+With ``tier='auto'`` the fast tier runs first and the layout tier is used only
+when the fast output is empty or looks garbled. DOCX files go through
+python-docx and legacy DOC files through textract. Every result reports which
+tier ran and how long it took, and all parses go through the extraction cache.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from urllib.parse import urlparse
+
+import extraction_cache
+
+logger = logging.getLogger(__name__)
+
+FAST = 'fast'
+LAYOUT = 'layout'
+AUTO = 'auto'
+PDF_TIERS = (AUTO, FAST, LAYOUT)
+
+# Cache names for each tier, see extraction_cache.EXTRACTOR_VERSIONS.
+_CACHE_NAMES = {
+    FAST: 'pypdf2',
+    LAYOUT: 'pdfplumber',
+    'docx': 'docx',
+    'textract': 'textract',
+}
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.doc', '.docx')
+
+# Fast-tier output shorter than this is treated as a failed extraction.
+MIN_TEXT_CHARS = 40
+
+# PDFs with fewer pages than this are always extracted serially; below it the
+# cost of shipping the document to pool processes outweighs the speedup. The
+# fast tier costs a few ms per page, so it needs far more pages to pay off.
+PARALLEL_PAGE_THRESHOLDS = {
+    FAST: int(os.getenv('EXTRACTION_PARALLEL_PAGES_FAST', 150)),
+    LAYOUT: int(os.getenv('EXTRACTION_PARALLEL_PAGES_LAYOUT', 8)),
+}
+PARALLEL_WORKERS = int(os.getenv('EXTRACTION_WORKERS', os.cpu_count() or 1))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _join_pages(page_texts):
+    return '\n'.join(text for text in page_texts if text).strip()
+
+
+def _iter_fast_pages(data, start=0, stop=None):
+    try:
+        from PyPDF2 import PdfReader
+    except ImportError:
+        raise RuntimeError("PyPDF2 package not installed. Please run: pip install PyPDF2")
+    reader = PdfReader(BytesIO(data))
+    stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+    for i in range(start, stop):
+        yield reader.pages[i].extract_text()
+
+
+def _iter_layout_pages(data, start=0, stop=None):
+    try:
+        import pdfplumber
+    except ImportError:
+        raise RuntimeError("pdfplumber package not installed. Please run: pip install pdfplumber")
+    with pdfplumber.open(BytesIO(data)) as pdf:
+        for page in pdf.pages[start:stop]:
+            yield page.extract_text()
+
+
+def _fast_pages(data, start=0, stop=None):
+    return list(_iter_fast_pages(data, start, stop))
+
+
+def _layout_pages(data, start=0, stop=None):
+    return list(_iter_layout_pages(data, start, stop))
+
+
+_PAGE_ITERATORS = {FAST: _iter_fast_pages, LAYOUT: _iter_layout_pages}
+_PAGE_EXTRACTORS = {FAST: _fast_pages, LAYOUT: _layout_pages}
+
+
+def page_count(data):
+    """Number of pages in a PDF."""
+    try:
+        from PyPDF2 import PdfReader
+        return len(PdfReader(BytesIO(data)).pages)
+    except ImportError:
+        import pdfplumber
+        with pdfplumber.open(BytesIO(data)) as pdf:
+            return len(pdf.pages)
+
+
+def _extract_range(tier, data, start, stop):
+    # Runs in a pool process; must stay a module-level function to pickle.
+    return _PAGE_EXTRACTORS[tier](data, start, stop)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=PARALLEL_WORKERS)
+    return _executor
+
+
+def _can_fork_pool():
+    # Pool processes (e.g. scripts/worker.py) are daemonic and may not start
+    # children of their own.
+    return not multiprocessing.current_process().daemon
+
+
+def extract_pdf_pages(data, tier, parallel=True):
+    """Return the text of every page of a PDF, in order.
+
+    Documents with at least PARALLEL_PAGE_THRESHOLDS[tier] pages are split
+    into page ranges that are extracted concurrently in a process pool;
+    smaller ones, or ``parallel=False``, run serially in this process.
+    """
+    if not parallel or PARALLEL_WORKERS < 2 or not _can_fork_pool():
+        return _PAGE_EXTRACTORS[tier](data)
+    pages = page_count(data)
+    if pages < PARALLEL_PAGE_THRESHOLDS[tier]:
+        return _PAGE_EXTRACTORS[tier](data)
+
+    # A couple of ranges per worker keeps them busy when pages vary in cost.
+    chunk = max(1, -(-pages // (PARALLEL_WORKERS * 2)))
+    starts = list(range(0, pages, chunk))
+    results = _get_executor().map(
+        _extract_range,
+        [tier] * len(starts),
+        [data] * len(starts),
+        starts,
+        [start + chunk for start in starts],
+    )
+    return [text for page_texts in results for text in page_texts]
+
+
+def _extract_fast(data, parallel=True):
+    return _join_pages(extract_pdf_pages(data, FAST, parallel=parallel))
+
+
+def _extract_layout(data, parallel=True):
+    return _join_pages(extract_pdf_pages(data, LAYOUT, parallel=parallel))
+
+
+def _extract_docx(data):
+    try:
+        from docx import Document
+    except ImportError:
+        # textract handles DOCX too, just more slowly.
+        return _extract_textract(data, '.docx')
+    doc = Document(BytesIO(data))
+    return '\n'.join(para.text for para in doc.paragraphs).strip()
+
+
+def _extract_textract(data, ext):
+    import tempfile
+    try:
+        import textract
+    except ImportError:
+        raise RuntimeError("textract package not installed. Please run: pip install textract")
+    # textract only works on files
+    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_file:
+        temp_file.write(data)
+        temp_file.flush()
+        try:
+            return textract.process(temp_file.name).decode('utf-8').strip()
+        finally:
+            os.unlink(temp_file.name)
+
+
+_WORD_RE = re.compile(r'\S+')
+
+
+def looks_garbled(text):
+    """Heuristic check for fast-tier output that needs the layout tier."""
+    stripped = text.strip()
+    if len(stripped) < MIN_TEXT_CHARS:
+        return True
+
+    non_space = [c for c in stripped if not c.isspace()]
+    # Undecodable glyphs and control characters from broken font encodings
+    junk = sum(1 for c in non_space if c == '�' or (ord(c) < 32) or 0xE000 <= ord(c) <= 0xF8FF)
+    if junk / len(non_space) > 0.02:
+        return True
+    # Mostly symbols instead of letters
+    letters = sum(1 for c in non_space if c.isalpha())
+    if letters / len(non_space) < 0.5:
+        return True
+    # Words run together because spacing was lost
+    words = _WORD_RE.findall(stripped)
+    if sum(len(w) for w in words) / len(words) > 15:
+        return True
+    return False
+
+
+def file_extension(source):
+    """Lower-cased extension of a local path or URL."""
+    path = urlparse(source).path if extraction_cache.is_url(source) else source
+    return os.path.splitext(path)[1].lower()
+
+
+# In auto mode this much fast-tier text is inspected before deciding whether
+# to switch to the layout tier.
+STREAM_SNIFF_CHARS = 500
+
+
+def _cached_pdf_text(source, tier, data=None):
+    """Return ``(tier, text)`` for a cached full extraction, or None."""
+    candidates = [FAST, LAYOUT] if tier == AUTO else [tier]
+    for name in candidates:
+        text = extraction_cache.lookup(source, _CACHE_NAMES[name], data)
+        if text is not None and not (tier == AUTO and name == FAST and looks_garbled(text)):
+            return name, text
+    return None
+
+
+def _stream_pdf(source, tier, load):
+    """Yield ``(tier, page_text, last)`` for a PDF, one page at a time.
+
+    A fully cached extraction is yielded as a single chunk. Otherwise pages
+    are parsed lazily, and the joined text is cached once every page has been
+    parsed, before the last one is yielded.
+    """
+    cached = _cached_pdf_text(source, tier)
+    if cached is None:
+        data = load(source)
+        # The same bytes may already be cached from a local file or another URL.
+        cached = _cached_pdf_text(source, tier, data)
+        if cached is not None and extraction_cache.is_url(source):
+            extraction_cache.store(source, _CACHE_NAMES[cached[0]], data, cached[1])
+    if cached is not None:
+        yield cached + (True,)
+        return
+
+    used = LAYOUT if tier == LAYOUT else FAST
+    pages = _PAGE_ITERATORS[used](data)
+    total = page_count(data)
+    buffered = []
+
+    if tier == AUTO:
+        # Sniff the first pages of fast output before committing to a tier.
+        for text in pages:
+            buffered.append(text)
+            if sum(len(t or '') for t in buffered) >= STREAM_SNIFF_CHARS:
+                break
+        if looks_garbled(_join_pages(buffered)):
+            logger.info("Fast-tier output looks garbled, streaming with layout extraction")
+            pages.close()
+            used, pages, buffered = LAYOUT, _PAGE_ITERATORS[LAYOUT](data), []
+
+    produced = []
+    for text in itertools.chain(buffered, pages):
+        produced.append(text)
+        last = len(produced) == total
+        if last:
+            extraction_cache.store(source, _CACHE_NAMES[used], data, _join_pages(produced))
+        yield used, text, last
+
+
+def iter_pages(source, tier=AUTO, loader=extraction_cache.read_source, ext=None):
+    """Yield document text page by page as it is extracted.
+
+    Stop iterating (or ``close()`` the generator) once you have enough text;
+    the remaining pages are never parsed. DOC/DOCX files and cached
+    extractions come through as a single chunk.
+    """
+    ext = ext or file_extension(source)
+    if ext != '.pdf':
+        yield extract_document(source, tier=tier, loader=loader, ext=ext)['text']
+        return
+    for _, text, _ in _stream_pdf(source, tier, loader):
+        if text:
+            yield text
+
+
+def _extract_prefix(source, tier, load, max_chars):
+    """Extract pages only until ``max_chars`` characters are available.
+
+    Returns ``(tier, text, truncated)``.
+    """
+    stream = _stream_pdf(source, tier, load)
+    parts, total, used, complete = [], 0, tier, False
+    try:
+        for used, text, complete in stream:
+            if text:
+                parts.append(text)
+                total += len(text) + 1
+            if total >= max_chars:
+                break
+        else:
+            complete = True
+    finally:
+        stream.close()
+    text = _join_pages(parts)
+    return used, text[:max_chars], not complete or len(text) > max_chars
+
+
+def extract_document(source, tier=AUTO, loader=extraction_cache.read_source, ext=None, parallel=True,
+                     max_chars=None):
+    """Extract text from a PDF, DOC or DOCX path or URL.
+
+    Returns a dict with ``text``, the ``tier`` that produced it, ``seconds``
+    spent, and ``fallback`` (True when auto mode had to escalate from the fast
+    to the layout tier). ``loader`` reads the raw bytes and is called at most
+    once, and not at all when the extraction cache already knows the source.
+    ``parallel=False`` disables page-parallel PDF extraction.
+
+    With ``max_chars`` set, PDF pages are parsed one at a time and extraction
+    stops as soon as that much text is available; ``truncated`` in the result
+    says whether anything was cut.
+    """
+    ext = ext or file_extension(source)
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f'Unsupported file type: {ext}')
+    if ext == '.pdf' and tier not in PDF_TIERS:
+        raise ValueError(f'Unknown extraction tier: {tier}')
+
+    loaded = []
+
+    def load_once(src):
+        if not loaded:
+            loaded.append(loader(src))
+        return loaded[0]
+
+    def run(name, extract_fn):
+        return extraction_cache.cached_extract(source, _CACHE_NAMES[name], extract_fn, loader=load_once)
+
+    start = time.perf_counter()
+    fallback = False
+    if max_chars and ext == '.pdf':
+        used, text, truncated = _extract_prefix(source, tier, load_once, max_chars)
+        seconds = time.perf_counter() - start
+        logger.info(f"Extracted {len(text)} chars with {used} tier in {seconds:.3f}s"
+                    f"{' (stopped early)' if truncated else ''}")
+        return {'text': text, 'tier': used, 'seconds': seconds, 'fallback': tier == AUTO and used == LAYOUT,
+                'truncated': truncated}
+
+    if ext == '.docx':
+        used, text = 'docx', run('docx', _extract_docx)
+    elif ext == '.doc':
+        used, text = 'textract', run('textract', lambda data: _extract_textract(data, ext))
+    elif tier == LAYOUT:
+        used, text = LAYOUT, run(LAYOUT, lambda data: _extract_layout(data, parallel))
+    else:
+        used, text = FAST, run(FAST, lambda data: _extract_fast(data, parallel))
+        if tier == AUTO and looks_garbled(text):
+            logger.info("Fast-tier output looks garbled, falling back to layout extraction")
+            used, text, fallback = LAYOUT, run(LAYOUT, lambda data: _extract_layout(data, parallel)), True
+    seconds = time.perf_counter() - start
+
+    truncated = bool(max_chars) and len(text) > max_chars
+    if truncated:
+        text = text[:max_chars]
+    logger.info(f"Extracted {len(text)} chars with {used} tier in {seconds:.3f}s")
+    return {'text': text, 'tier': used, 'seconds': seconds, 'fallback': fallback, 'truncated': truncated}
+
+
+def extract_text(source, tier=AUTO, loader=extraction_cache.read_source, ext=None, parallel=True,
+                 max_chars=None):
+    """Convenience wrapper returning only the extracted text."""
+    return extract_document(source, tier=tier, loader=loader, ext=ext, parallel=parallel,
+                            max_chars=max_chars)['text']
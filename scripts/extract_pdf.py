@@ -3,8 +3,8 @@ import os
 import sys
 import logging
 from dotenv import load_dotenv
-import requests
-from io import BytesIO
+
+import document_extraction
 
 # Configure logging
 logging.basicConfig(
@@ -16,50 +16,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-try:
-    import PyPDF2
-except ImportError:
-    logger.error("PyPDF2 package not installed. Please run: pip install PyPDF2")
-    sys.exit(1)
-
-def extract_text_from_pdf(file_path):
-    """Extract text from a PDF file."""
+def extract_pdf(file_path, tier=document_extraction.AUTO):
+    """Extract text from a PDF file, reporting the tier used and its timing."""
     logger.info(f"Extracting text from PDF: {file_path}")
     
     try:
-        if file_path.startswith('http://') or file_path.startswith('https://'):
-            # Download the file from the URL
-            response = requests.get(file_path)
-            response.raise_for_status()
-            file = BytesIO(response.content)
-        else:
-            # Local file
-            file = open(file_path, 'rb')
-        
-        # Create PDF reader object
-        pdf_reader = PyPDF2.PdfReader(file)
-        
-        # Extract text from each page
-        text = ''
-        for page in pdf_reader.pages:
-            text += page.extract_text() + '\n'
-        
-        logger.info("Successfully extracted text from PDF")
-        return text.strip()
+        result = document_extraction.extract_document(file_path, tier=tier, ext='.pdf')
+        logger.info(f"Successfully extracted text from PDF ({result['tier']} tier, {result['seconds']:.3f}s)")
+        return result
             
     except Exception as e:
         logger.error(f"Failed to extract text from PDF: {str(e)}")
         raise
 
+def extract_text_from_pdf(file_path, tier=document_extraction.AUTO):
+    """Extract text from a PDF file."""
+    return extract_pdf(file_path, tier=tier)['text']
+
 def main():
     parser = argparse.ArgumentParser(description="Extract text from a PDF file.")
     parser.add_argument('--file_path', type=str, required=True, help='Path to the PDF file')
+    parser.add_argument('--tier', choices=document_extraction.PDF_TIERS, default=document_extraction.AUTO,
+                        help='Extraction tier: fast (PyPDF2), layout (pdfplumber) or auto')
     args = parser.parse_args()
 
     logger.info("Starting PDF text extraction")
     
     try:
-        text = extract_text_from_pdf(args.file_path)
+        text = extract_text_from_pdf(args.file_path, tier=args.tier)
         print(text)
     except Exception as e:
         logger.error(f"PDF extraction failed: {str(e)}")
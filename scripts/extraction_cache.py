@@ -0,0 +1,136 @@
+"""Cache of extracted document text keyed by file content hash.
+
+Entries are keyed by the SHA-256 of the file bytes plus the extractor name and
+version, so the same upload parsed by different scripts or at different times
+is only parsed once per extractor. A side index maps source URLs to content
+hashes, letting a repeat fetch of the same storage URL skip both the download
+and the parse.
+"""
+
+import hashlib
+import logging
+import os
+import requests
+
+from disk_cache import DiskCache, DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Bump an extractor's version whenever its output changes so stale text is
+# never served.
+EXTRACTOR_VERSIONS = {
+    'pypdf2': 2,
+    'pdfplumber': 2,
+    'docx': 2,
+    'textract': 2,
+}
+
+_text_cache = None
+_url_index = None
+
+
+def _caches():
+    global _text_cache, _url_index
+    if _text_cache is None:
+        cache_dir = os.getenv('EXTRACTION_CACHE_DIR', DEFAULT_CACHE_DIR)
+        _text_cache = DiskCache(
+            os.path.join(cache_dir, 'extractions.sqlite3'),
+            max_bytes=int(os.getenv('EXTRACTION_CACHE_MAX_MB', 512)) * 1024 * 1024,
+            ttl=float(os.getenv('EXTRACTION_CACHE_TTL', 30 * 24 * 3600)),
+        )
+        # URLs can be overwritten in place, so their index entries expire sooner.
+        _url_index = DiskCache(
+            os.path.join(cache_dir, 'extraction_urls.sqlite3'),
+            max_bytes=32 * 1024 * 1024,
+            ttl=float(os.getenv('EXTRACTION_URL_TTL', 24 * 3600)),
+        )
+    return _text_cache, _url_index
+
+
+def is_url(source):
+    return source.startswith(('http://', 'https://'))
+
+
+def read_source(path_or_url):
+    """Return the raw bytes of a local file or URL."""
+    if is_url(path_or_url):
+        response = requests.get(path_or_url)
+        response.raise_for_status()
+        return response.content
+    with open(path_or_url, 'rb') as f:
+        return f.read()
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _text_key(digest, extractor):
+    return f'{extractor}:{EXTRACTOR_VERSIONS[extractor]}:{digest}'
+
+
+def lookup(source, extractor, data=None):
+    """Return cached text for ``source`` without parsing, or None.
+
+    Without ``data`` only the URL index can answer, so local files always miss.
+    """
+    if os.getenv('EXTRACTION_CACHE_DISABLED') == '1':
+        return None
+    text_cache, url_index = _caches()
+    if data is not None:
+        return text_cache.get(_text_key(content_hash(data), extractor))
+    if is_url(source):
+        digest = url_index.get(source)
+        if digest:
+            return text_cache.get(_text_key(digest, extractor))
+    return None
+
+
+def store(source, extractor, data, text):
+    """Record ``text`` as the full extraction of ``data`` (fetched from ``source``)."""
+    if os.getenv('EXTRACTION_CACHE_DISABLED') == '1':
+        return
+    text_cache, url_index = _caches()
+    digest = content_hash(data)
+    text_cache.set(_text_key(digest, extractor), text)
+    if is_url(source):
+        url_index.set(source, digest)
+
+
+def cached_extract(source, extractor, extract_fn, loader=read_source, data=None):
+    """Return ``extract_fn(data)`` for ``source``, parsing each file only once.
+
+    ``extractor`` names an entry in EXTRACTOR_VERSIONS. ``loader`` reads the
+    source bytes when they are needed; pass ``data`` if they are already in
+    memory. Set EXTRACTION_CACHE_DISABLED=1 to always parse.
+    """
+    if os.getenv('EXTRACTION_CACHE_DISABLED') == '1':
+        return extract_fn(data if data is not None else loader(source))
+
+    text_cache, url_index = _caches()
+    from_url = data is None and is_url(source)
+
+    if from_url:
+        text = lookup(source, extractor)
+        if text is not None:
+            logger.info(f"Extraction cache hit for URL ({extractor})")
+            return text
+
+    if data is None:
+        data = loader(source)
+    digest = content_hash(data)
+    key = _text_key(digest, extractor)
+    text = text_cache.get(key)
+    if text is None:
+        text = extract_fn(data)
+        text_cache.set(key, text)
+    else:
+        logger.info(f"Extraction cache hit for content {digest[:12]} ({extractor})")
+    if from_url:
+        url_index.set(source, digest)
+    return text
+
+
+def stats():
+    text_cache, url_index = _caches()
+    return {'text': text_cache.stats(), 'urls': url_index.stats()}
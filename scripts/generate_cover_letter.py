@@ -2,68 +2,58 @@ import argparse
 import os
 import sys
 import json
-import tempfile
+import logging
 import requests
 from dotenv import load_dotenv
 from datetime import datetime
-from urllib.parse import urlparse
 
-# Optional: for file extraction
+# Configure logging; stdout carries the JSON result, so logs go to stderr
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+logger = logging.getLogger(__name__)
+
 try:
-    import pdfplumber
-    from docx import Document
-except ImportError:
-    pdfplumber = None
-    Document = None
-
-def download_to_tempfile(url: str) -> str:
-    """Download a file from URL to a temp file and return the path."""
-    local_filename = os.path.join(tempfile.gettempdir(), os.path.basename(urlparse(url).path))
+    import llm_client
+except ImportError as e:
+    logger.error(str(e))
+    sys.exit(1)
+
+import document_extraction
+import prompt_builder
+
+# Resume text beyond this never fits in the cover-letter prompt, so pages past
+# it are not parsed.
+MAX_RESUME_CHARS = 20000
+
+def extract_resume_text(file_path: str, max_chars: int = MAX_RESUME_CHARS) -> str:
+    """Extract text from a PDF or DOCX file path or URL, stopping after ``max_chars``."""
+    ext = document_extraction.file_extension(file_path)
+    if ext not in ['.pdf', '.doc', '.docx']:
+        print(f"[ERROR] Unsupported file type: {ext}", file=sys.stderr)
+        sys.exit(1)
     try:
-        with requests.get(url, stream=True) as r:
-            r.raise_for_status()
-            with open(local_filename, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-        return local_filename
+        return document_extraction.extract_text(file_path, max_chars=max_chars)
     except requests.exceptions.RequestException as e:
         print(f"[ERROR] Failed to download file: {str(e)}", file=sys.stderr)
         sys.exit(1)
-
-def extract_resume_text(file_path: str) -> str:
-    """Extract text from PDF or DOCX file."""
-    ext = os.path.splitext(file_path)[1].lower()
-    try:
-        if ext == '.pdf':
-            if not pdfplumber:
-                print("[ERROR] pdfplumber is not installed.", file=sys.stderr)
-                sys.exit(1)
-            with pdfplumber.open(file_path) as pdf:
-                return '\n'.join(page.extract_text() or '' for page in pdf.pages)
-        elif ext in ['.doc', '.docx']:
-            if not Document:
-                print("[ERROR] python-docx is not installed.", file=sys.stderr)
-                sys.exit(1)
-            doc = Document(file_path)
-            return '\n'.join([para.text for para in doc.paragraphs])
-        else:
-            print(f"[ERROR] Unsupported file type: {ext}", file=sys.stderr)
-            sys.exit(1)
     except Exception as e:
         print(f"[ERROR] Failed to extract text: {str(e)}", file=sys.stderr)
         sys.exit(1)
 
-def generate_cover_letter_api(resume_text, job_description, full_name='', email='', address='', phone='', date='', hiring_manager='', hiring_title='', company='', company_address=''):
-    load_dotenv()
-    try:
-        from groq import Groq
-    except ImportError:
-        raise ImportError("groq package not installed. Please run: pip install groq")
-    groq_api_key = os.getenv('GROQ_API_KEY')
-    if not groq_api_key:
-        raise RuntimeError('GROQ_API_KEY not found in environment.')
+COVER_LETTER_MODEL = "gemma2-9b-it"
+COVER_LETTER_MAX_TOKENS = 800
+
+def build_cover_letter_prompt(resume_text, job_description, full_name='', email='', address='', phone='', date='', hiring_manager='', hiring_title='', company='', company_address=''):
+    """Build the cover-letter messages, trimmed to fit the model's context."""
     today = date or datetime.now().strftime('%B %d, %Y')
-    prompt = f"""
+
+    def render(fields):
+        prompt = f"""
 You are a professional career assistant. Write a tailored, compelling cover letter for the following job application. Use the provided resume to highlight the most relevant skills and experience. The cover letter should be professional, concise, and specific to the job description. Address the company and job title if possible.
 
 Applicant Information:
@@ -80,25 +70,45 @@ Company: {company}
 Company Address: {company_address}
 
 Resume:
-{resume_text}
+{fields['resume_text']}
 
 Job Description:
-{job_description}
+{fields['job_description']}
 
 Cover Letter:
 """
+        return [
+            {"role": "system", "content": "You are a helpful assistant for job seekers."},
+            {"role": "user", "content": prompt}
+        ]
+
+    return prompt_builder.build(
+        render,
+        {'resume_text': resume_text, 'job_description': job_description},
+        model=COVER_LETTER_MODEL,
+        max_output_tokens=COVER_LETTER_MAX_TOKENS,
+        weights={'resume_text': 3, 'job_description': 2},
+    )
+
+def generate_cover_letter_api(resume_text, job_description, full_name='', email='', address='', phone='', date='', hiring_manager='', hiring_title='', company='', company_address=''):
+    load_dotenv()
+    groq_api_key = os.getenv('GROQ_API_KEY')
+    if not groq_api_key:
+        raise RuntimeError('GROQ_API_KEY not found in environment.')
+    fitted = build_cover_letter_prompt(
+        resume_text, job_description, full_name=full_name, email=email, address=address, phone=phone,
+        date=date, hiring_manager=hiring_manager, hiring_title=hiring_title, company=company,
+        company_address=company_address
+    )
     try:
-        client = Groq(api_key=groq_api_key)
-        completion = client.chat.completions.create(
-            model="gemma2-9b-it",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant for job seekers."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=800,
+        content = llm_client.complete(
+            model=COVER_LETTER_MODEL,
+            messages=fitted['messages'],
+            api_key=groq_api_key,
+            max_tokens=fitted['max_tokens'],
             temperature=0.7,
         )
-        cover_letter = completion.choices[0].message.content.strip()
+        cover_letter = content.strip()
         return cover_letter
     except Exception as e:
         raise RuntimeError(f"Failed to generate cover letter: {e}")
@@ -122,13 +132,8 @@ def main():
     load_dotenv()
 
     resume_text = args.resume_text
-    temp_file = None
     if not resume_text and args.resume_file:
-        file_path = args.resume_file
-        if file_path.startswith('http://') or file_path.startswith('https://'):
-            file_path = download_to_tempfile(file_path)
-            temp_file = file_path  # Remember to clean up
-        resume_text = extract_resume_text(file_path)
+        resume_text = extract_resume_text(args.resume_file)
     if not resume_text:
         print('[ERROR] No resume text provided or extracted.', file=sys.stderr)
         sys.exit(1)
@@ -150,12 +155,6 @@ def main():
     except Exception as e:
         print(f"[ERROR] Failed to generate cover letter: {e}", file=sys.stderr)
         sys.exit(1)
-    finally:
-        if temp_file and os.path.exists(temp_file):
-            try:
-                os.remove(temp_file)
-            except Exception:
-                pass
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -1,6 +1,5 @@
 import os
 import sys
-import tempfile
 import json
 import requests
 import logging
@@ -8,9 +7,12 @@ from io import BytesIO
 from urllib.parse import urlparse
 from typing import Dict, Any, Optional
 
-# Use textract for DOC/DOCX and PyPDF2 for PDF
-import textract
-from PyPDF2 import PdfReader
+from pydantic import ValidationError
+
+import document_extraction
+import prompt_builder
+import resume_schema
+import structured_output
 
 # Configure logging
 logging.basicConfig(
@@ -47,35 +49,16 @@ def extract_text(file_path_or_url: str) -> str:
     logger.info(f"Extracting text from: {file_path_or_url}")
     
     try:
-        file_content, ext = get_file_content(file_path_or_url)
+        ext = document_extraction.file_extension(file_path_or_url)
         
         if ext not in ['.pdf', '.doc', '.docx']:
             error_msg = f'Unsupported file type: {ext}'
             logger.error(error_msg)
             raise ValueError(error_msg)
         
-        if ext == '.pdf':
-            # Use PyPDF2 for PDF files
-            logger.info("Processing PDF file with PyPDF2")
-            reader = PdfReader(file_content)
-            text = ""
-            for i, page in enumerate(reader.pages, 1):
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-                logger.debug(f"Processed page {i}")
-            return text.strip()
-        else:
-            # Use textract for DOC/DOCX files
-            logger.info("Processing DOC/DOCX file with textract")
-            # Save to temporary file for textract
-            with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_file:
-                temp_file.write(file_content.getvalue())
-                temp_file.flush()
-                try:
-                    return textract.process(temp_file.name).decode('utf-8')
-                finally:
-                    os.unlink(temp_file.name)
+        return document_extraction.extract_text(
+            file_path_or_url, loader=lambda source: get_file_content(source)[0].getvalue()
+        )
     except Exception as e:
         error_msg = f'Error extracting text from {file_path_or_url}: {str(e)}'
         logger.error(error_msg)
@@ -83,41 +66,11 @@ def extract_text(file_path_or_url: str) -> str:
 
 def validate_resume_json(data: Dict[str, Any]) -> bool:
     """Validate the structure of the resume JSON."""
-    required_sections = ['personal', 'experience', 'education', 'skills']
-    required_personal = ['name', 'title', 'email', 'phone', 'location', 'summary']
-    
     try:
-        # Check required sections
-        for section in required_sections:
-            if section not in data:
-                logger.error(f"Missing required section: {section}")
-                return False
-        
-        # Check required personal fields
-        for field in required_personal:
-            if field not in data['personal']:
-                logger.error(f"Missing required personal field: {field}")
-                return False
-        
-        # Validate experience entries
-        for i, exp in enumerate(data['experience']):
-            required_exp = ['company', 'position', 'startDate', 'endDate', 'description']
-            for field in required_exp:
-                if field not in exp:
-                    logger.error(f"Missing required field in experience entry {i}: {field}")
-                    return False
-        
-        # Validate education entries
-        for i, edu in enumerate(data['education']):
-            required_edu = ['school', 'degree', 'field', 'startDate', 'endDate']
-            for field in required_edu:
-                if field not in edu:
-                    logger.error(f"Missing required field in education entry {i}: {field}")
-                    return False
-        
+        resume_schema.GeneratedResume.model_validate(data)
         return True
-    except Exception as e:
-        logger.error(f"Error validating resume JSON: {str(e)}")
+    except ValidationError as e:
+        logger.error(f"Invalid resume JSON: {str(e)}")
         return False
 
 def call_groq_api(extracted_text: str, job_title: Optional[str] = None, job_description: Optional[str] = None, user_name: Optional[str] = None, user_email: Optional[str] = None) -> Dict[str, Any]:
@@ -129,33 +82,34 @@ def call_groq_api(extracted_text: str, job_title: Optional[str] = None, job_desc
         logger.error(error_msg)
         raise RuntimeError(error_msg)
     
-    # Determine the type of generation and create appropriate prompt
-    if job_title and job_description:
-        # File-based enhancement flow
-        prompt = f"""
+    model = "llama3-8b-8192"
+    
+    # The prompt-based flow fixes the user's name and email and groups skills.
+    generated_overrides = {
+        'personal': {**resume_schema.template(resume_schema.GeneratedPersonal), 'name': user_name, 'email': user_email},
+        'skills': [{"Technical Skills": "string", "Soft Skills": "string", "Languages": "string", "Tools": "string"}],
+    }
+
+    def render(fields):
+        # Determine the type of generation and create appropriate prompt
+        if job_title and job_description:
+            # File-based enhancement flow
+            prompt = f"""
 You are an expert resume writer. Given the following resume content and a target job, rewrite and structure the resume for ATS compatibility. 
 IMPORTANT: You must respond with ONLY a valid JSON object, no other text. The JSON must have these exact fields:
-{{
-  "personal": {{ "name": "", "title": "", "email": "", "phone": "", "location": "", "summary": "" }},
-  "experience": [{{ "company": "", "position": "", "startDate": "", "endDate": "", "description": "" }}],
-  "education": [{{ "school": "", "degree": "", "field": "", "startDate": "", "endDate": "" }}],
-  "skills": [],
-  "projects": [{{ "title": "", "description": "", "startDate": "", "endDate": "" }}],
-  "certifications": [{{ "name": "", "issuer": "", "date": "" }}],
-  "awards": [{{ "award": "", "description": "", "date": "" }}],
-}}
+{resume_schema.skeleton(resume_schema.GeneratedResume)}
 
 Resume Content:
-{extracted_text}
+{fields['extracted_text']}
 
 Target Job Title: {job_title}
-Target Job Description: {job_description}
+Target Job Description: {fields['job_description']}
 
 Remember: Respond with ONLY the JSON object, no other text or explanation.
 """
-    else:
-        # Prompt-based generation flow
-        prompt = f"""
+        else:
+            # Prompt-based generation flow
+            prompt = f"""
 You are an expert resume writer. Create a professional, complete resume for a candidate applying to the role of {extracted_text}.
 - Do NOT mention the target company or designation (e.g., {extracted_text}) in the experience section.
 - Instead, create a plausible work history at other companies and roles that would make the candidate a strong fit for this job.
@@ -164,81 +118,43 @@ You are an expert resume writer. Create a professional, complete resume for a ca
 - If any section is missing, invent plausible details.
 
 IMPORTANT: You must respond with ONLY a valid JSON object, no other text. The JSON must have these exact fields:
-{{
-  "personal": {{ 
-    "name": "{user_name}",
-    "title": "",
-    "email": "{user_email}",
-    "phone": "",
-    "location": "",
-    "summary": ""
-  }},
-  "experience": [{{ "company": "", "position": "", "startDate": "", "endDate": "", "description": "" }}],
-  "education": [{{ "school": "", "degree": "", "field": "", "startDate": "", "endDate": "" }}],
-  "skills": [
-  {{"Technical Skills": "", "Soft Skills": "", "Languages": "", "Tools": ""}}],
-  "projects": [{{ "title": "", "description": "", "startDate": "", "endDate": "" }}],
-  "certifications": [{{ "name": "", "issuer": "", "date": "" }}],
-  "awards": [{{ "award": "", "description": "", "date": "" }}],
-}}
+{resume_schema.skeleton(resume_schema.GeneratedResume, overrides=generated_overrides)}
 
 Target Role: {extracted_text}
 
 Remember: Respond with ONLY the JSON object, no other text or explanation. Do NOT mention the target company or designation in the experience section.
 """
-
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json',
-    }
-    data = {
-        "messages": [
+        return [
             {"role": "system", "content": "You are an expert resume writer. You must respond with ONLY valid JSON, no other text."},
             {"role": "user", "content": prompt}
-        ],
-        "model": "llama3-8b-8192",
-        "temperature": 0.3,  # Lower temperature for more consistent JSON output
-        "max_tokens": 4000
-    }
+        ]
+    
+    # Keep room for the full resume JSON; the resume and job description
+    # share whatever context is left.
+    fitted = prompt_builder.build(
+        render,
+        {'extracted_text': extracted_text, 'job_description': job_description or ''},
+        model=model,
+        max_output_tokens=4000,
+        weights={'extracted_text': 2, 'job_description': 1},
+    )
     
     try:
         logger.info("Sending request to Groq API")
-        response = requests.post('https://api.groq.com/openai/v1/chat/completions', headers=headers, json=data)
-        response.raise_for_status()
-        content = response.json()['choices'][0]['message']['content']
-        
-        # Debug: Print the raw response
-        logger.debug("Raw API Response: %s", content)
-        
-        # Try to parse the JSON
-        try:
-            resume_json = json.loads(content)
-            if not validate_resume_json(resume_json):
-                raise ValueError("Invalid resume JSON structure")
-            return resume_json
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing JSON: {str(e)}")
-            logger.info("Attempting to clean the response...")
-            
-            # Try to extract JSON from the response if it's wrapped in other text
-            import re
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                try:
-                    resume_json = json.loads(json_match.group(0))
-                    if not validate_resume_json(resume_json):
-                        raise ValueError("Invalid resume JSON structure after cleaning")
-                    return resume_json
-                except json.JSONDecodeError:
-                    error_msg = "Could not parse JSON from API response even after cleaning"
-                    logger.error(error_msg)
-                    raise RuntimeError(error_msg)
-            else:
-                error_msg = "No JSON object found in API response"
-                logger.error(error_msg)
-                raise RuntimeError(error_msg)
-                
-    except requests.exceptions.RequestException as e:
+        return structured_output.complete(
+            fitted['messages'],
+            resume_schema.GeneratedResume,
+            'generate_resume',
+            model=model,
+            api_key=api_key,
+            temperature=0.3,  # Lower temperature for more consistent JSON output
+            max_tokens=fitted['max_tokens']
+        )
+    except structured_output.StructuredOutputError as e:
+        error_msg = f"Could not parse JSON from API response: {str(e)}"
+        logger.error(error_msg)
+        raise RuntimeError(error_msg)
+    except structured_output.APIError as e:
         error_msg = f"API request failed: {str(e)}"
         logger.error(error_msg)
         raise RuntimeError(error_msg)
@@ -1,57 +1,68 @@
 #!/usr/bin/env python3
+"""Render resume PDFs, once from the command line or as a long-lived server.
+
+One-shot:
+    python3 scripts/generate_resume_pdf.py --template ats-classic --data resume.json --output resume.pdf
+
+Server mode keeps a pool of warm render processes (WeasyPrint, templates,
+stylesheets and fonts already loaded) behind a local socket:
+    python3 scripts/generate_resume_pdf.py --serve /tmp/portfolioai-pdf.sock --workers 4
+    python3 scripts/generate_resume_pdf.py --serve 127.0.0.1:8766
+
+Each request is one JSON line, either a template render or a complete HTML
+document:
+
+    {"id": 1, "template": "ats-classic", "content": {...}}
+    {"id": 2, "html": "<!DOCTYPE html>...", "if_none_match": "\"3f2a...\""}
+
+and each reply is one JSON header line, followed on success by exactly
+``size`` bytes of PDF:
+
+    {"id": 1, "size": 48213, "etag": "\"9c1e...\"", "cached": false}
+    {"id": 2, "etag": "\"3f2a...\"", "not_modified": true}
+    {"id": 3, "error": "...", "status": 429}
+
+Rendered PDFs are cached on disk (see ``render_cache``); a request whose
+``if_none_match`` covers the current ETag gets ``not_modified`` and no body.
+
+``status`` follows HTTP: 400 bad request, 429 queue full, 504 render timed
+out, 500 render failed. Requests on one connection are answered in order;
+open several connections to render concurrently.
+"""
 
 import argparse
 import json
+import logging
+import multiprocessing
 import os
+import queue
+import socketserver
 import sys
-from pathlib import Path
-from weasyprint import HTML, CSS
-from jinja2 import Environment, FileSystemLoader
-
-def load_template(template_id):
-    """Load the HTML template and its associated CSS."""
-    template_dir = Path(__file__).parent.parent / 'resume-templates'
-    template_path = template_dir / f'{template_id}.html'
-    css_path = template_dir / f'{template_id}.css'
-    base_css_path = template_dir / 'ats-base.css'
-
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template not found: {template_id}")
+import threading
 
-    # Load the template
-    env = Environment(loader=FileSystemLoader(str(template_dir)))
-    template = env.get_template(f'{template_id}.html')
+import render_cache
+from render_engine import engine
 
-    # Load CSS files
-    css_files = [base_css_path]
-    if css_path.exists():
-        css_files.append(css_path)
+logger = logging.getLogger(__name__)
 
-    return template, css_files
+def load_template(template_id):
+    """Return the compiled template and its parsed stylesheets."""
+    render = engine()
+    return render.template(template_id), render.stylesheets(template_id)
 
 def generate_pdf(template_id, data_file, output_file):
     """Generate a PDF from the template and data."""
     try:
-        # Load the template and CSS
-        template, css_files = load_template(template_id)
-
         # Load the resume data
         with open(data_file, 'r') as f:
             resume_data = json.load(f)
 
-        # Render the template with the data
-        html_content = template.render(**resume_data['content'])
-
-        # Create the HTML document
-        html = HTML(string=html_content)
+        # Render with the shared engine (templates, CSS and fonts are set up
+        # once), or reuse the PDF if this template and content were rendered before
+        pdf, _, _ = render_cache.cached_render({'template': template_id, 'content': resume_data['content']})
 
-        # Load and apply CSS
-        css = []
-        for css_file in css_files:
-            css.append(CSS(filename=str(css_file)))
-
-        # Generate the PDF
-        html.write_pdf(output_file, stylesheets=css)
+        with open(output_file, 'wb') as f:
+            f.write(pdf)
 
         print(f"PDF generated successfully: {output_file}")
         return True
@@ -60,15 +71,238 @@ def generate_pdf(template_id, data_file, output_file):
         print(f"Error generating PDF: {str(e)}", file=sys.stderr)
         return False
 
+
+class RenderError(Exception):
+    """A render that failed; ``status`` is the HTTP-style status to report."""
+
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+
+def _render_loop(conn):
+    """Body of one render process: warm the engine, then render until told to stop."""
+    render = engine()
+    render.warm()
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        try:
+            if 'html' in request:
+                conn.send(('ok', render.html_to_pdf(request['html'])))
+            else:
+                conn.send(('ok', render.render_pdf(request['template'], request.get('content') or {})))
+        except FileNotFoundError as e:
+            conn.send(('missing', str(e)))
+        except Exception as e:
+            conn.send(('error', f'{type(e).__name__}: {e}'))
+
+
+class _RenderProcess:
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_render_loop, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.renders = 0
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(5)
+        self.conn.close()
+
+
+class RenderPool:
+    """Warm render processes behind a bounded queue.
+
+    At most ``workers`` renders run at once and at most ``queue_size`` more
+    wait; beyond that :meth:`render` fails fast with status 429 instead of
+    piling up work. A queued request that gets no process within ``timeout``
+    seconds fails with status 504, and a render running past ``timeout``
+    seconds has its process killed and replaced. Processes are recycled after
+    ``max_renders`` renders to bound memory growth.
+    """
+
+    def __init__(self, workers, queue_size=None, timeout=30.0, max_renders=None):
+        methods = multiprocessing.get_all_start_methods()
+        if 'forkserver' in methods:
+            self._ctx = multiprocessing.get_context('forkserver')
+            # New render processes fork from a server that already imported
+            # WeasyPrint, so replacements come back warm.
+            self._ctx.set_forkserver_preload(['render_engine'])
+        else:
+            self._ctx = multiprocessing.get_context('spawn')
+        self.workers = workers
+        self.queue_size = workers * 4 if queue_size is None else queue_size
+        self.timeout = timeout
+        self.max_renders = max_renders
+        self._slots = threading.BoundedSemaphore(workers + self.queue_size)
+        self._idle = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(_RenderProcess(self._ctx))
+        logger.info(f"Started {workers} render processes (queue {self.queue_size}, timeout {timeout}s)")
+
+    def render(self, request):
+        """Render one request dict to PDF bytes, raising :class:`RenderError` on failure."""
+        if not self._slots.acquire(blocking=False):
+            raise RenderError('Render queue is full', status=429)
+        try:
+            try:
+                worker = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise RenderError(f'No render process free after {self.timeout}s', status=504)
+            try:
+                worker.conn.send(request)
+                if not worker.conn.poll(self.timeout):
+                    raise RenderError(f'Render timed out after {self.timeout}s', status=504)
+                kind, result = worker.conn.recv()
+            except (RenderError, EOFError, OSError) as e:
+                # Replace a hung or dead process; its late reply must not be
+                # read by the next request.
+                worker.stop(kill=True)
+                worker = _RenderProcess(self._ctx)
+                if isinstance(e, RenderError):
+                    raise
+                raise RenderError('Render process died')
+            else:
+                worker.renders += 1
+                if self.max_renders and worker.renders >= self.max_renders:
+                    worker.stop()
+                    worker = _RenderProcess(self._ctx)
+            finally:
+                self._idle.put(worker)
+        finally:
+            self._slots.release()
+        if kind == 'missing':
+            raise RenderError(result, status=400)
+        if kind != 'ok':
+            raise RenderError(result)
+        return result
+
+    def close(self):
+        for _ in range(self.workers):
+            self._idle.get().stop()
+
+
+def _validate(request):
+    if not isinstance(request, dict):
+        raise RenderError('Request must be a JSON object', status=400)
+    if isinstance(request.get('html'), str):
+        return {'html': request['html']}
+    if isinstance(request.get('template'), str):
+        # Template IDs name files in resume-templates/; never a path.
+        if os.path.basename(request['template']) != request['template']:
+            raise RenderError('Invalid template ID', status=400)
+        return {'template': request['template'], 'content': request.get('content') or {}}
+    raise RenderError('Request needs "template" and "content", or "html"', status=400)
+
+
+class _RenderHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            if not raw.strip():
+                continue
+            request_id = None
+            try:
+                try:
+                    request = json.loads(raw)
+                except json.JSONDecodeError as e:
+                    raise RenderError(f'Invalid JSON request: {e}', status=400)
+                request_id = request.get('id') if isinstance(request, dict) else None
+                render_request = _validate(request)
+                key = render_cache.render_key(render_request)
+                tag = render_cache.etag(key)
+                if render_cache.etag_matches(request.get('if_none_match'), tag):
+                    self._send({'id': request_id, 'etag': tag, 'not_modified': True})
+                    continue
+                # Cache hits are answered here without taking a render slot.
+                pdf, tag, cached = render_cache.cached_render(render_request, render=self.server.pool.render, key=key)
+            except RenderError as e:
+                self._send({'id': request_id, 'error': str(e), 'status': e.status})
+                continue
+            self._send({'id': request_id, 'size': len(pdf), 'etag': tag, 'cached': cached}, pdf)
+
+    def _send(self, header, body=b''):
+        try:
+            self.wfile.write(json.dumps(header).encode('utf-8') + b'\n' + body)
+            self.wfile.flush()
+        except OSError:
+            # Client hung up before its PDF was ready.
+            pass
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def serve(pool, address):
+    if ':' in address:
+        host, port = address.rsplit(':', 1)
+        server = _TCPServer((host, int(port)), _RenderHandler)
+    else:
+        if os.path.exists(address):
+            os.unlink(address)
+        server = _UnixServer(address, _RenderHandler)
+    server.pool = pool
+    logger.info(f"PDF render server listening on {address}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
 def main():
     parser = argparse.ArgumentParser(description='Generate a resume PDF from a template and data.')
-    parser.add_argument('--template', required=True, help='Template ID')
-    parser.add_argument('--data', required=True, help='Path to JSON data file')
-    parser.add_argument('--output', required=True, help='Path to output PDF file')
+    parser.add_argument('--template', help='Template ID')
+    parser.add_argument('--data', help='Path to JSON data file')
+    parser.add_argument('--output', help='Path to output PDF file')
+    parser.add_argument('--serve', metavar='ADDRESS',
+                        help='Run the render server on HOST:PORT or a Unix socket path')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('PDF_RENDER_WORKERS', os.cpu_count() or 2)),
+                        help='Render processes in server mode')
+    parser.add_argument('--queue', type=int, default=None,
+                        help='Renders allowed to wait for a process before new ones are refused (default 4 per worker)')
+    parser.add_argument('--timeout', type=float, default=float(os.getenv('PDF_RENDER_TIMEOUT', 30)),
+                        help='Per-render timeout in seconds')
+    parser.add_argument('--max-renders', type=int, default=int(os.getenv('PDF_RENDER_MAX_RENDERS', 500)),
+                        help='Recycle a render process after this many renders (0 disables recycling)')
     args = parser.parse_args()
 
+    if args.serve:
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s',
+            handlers=[logging.StreamHandler(sys.stderr)]
+        )
+        pool = RenderPool(args.workers, queue_size=args.queue, timeout=args.timeout,
+                          max_renders=args.max_renders or None)
+        try:
+            serve(pool, args.serve)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.close()
+        return
+
+    if not (args.template and args.data and args.output):
+        parser.error('--template, --data and --output are required unless --serve is given')
     success = generate_pdf(args.template, args.data, args.output)
     sys.exit(0 if success else 1)
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -1,58 +1,58 @@
 import json
-import os
 import sys
-from groq import Groq
 from dotenv import load_dotenv
-
-def generate_summary(portfolio_data):
-    """Generates a portfolio summary using the Groq API."""
-    try:
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
-        # Construct prompt parts from portfolio data
-        prompt_parts = []
-
-        if portfolio_data.get('education'):
-            prompt_parts.append("Education:")
-            for edu in portfolio_data['education']:
-                prompt_parts.append(f"- {edu.get('degree', '')} in {edu.get('field_of_study', '')} from {edu.get('institution', '')} ({edu.get('start_date', '')} - {edu.get('end_date', '')})")
-                if edu.get('description'):
-                    prompt_parts.append(f"  Description: {edu['description']}")
-            prompt_parts.append("")
-
-        if portfolio_data.get('experience'):
-            prompt_parts.append("Experience:")
-            for exp in portfolio_data['experience']:
-                prompt_parts.append(f"- {exp.get('position', '')} at {exp.get('company', '')} ({exp.get('start_date', '')} - {exp.get('end_date', '')})")
-                if exp.get('description'):
-                    prompt_parts.append(f"  Description: {exp['description']}")
-            prompt_parts.append("")
-
-        if portfolio_data.get('projects'):
-            prompt_parts.append("Projects:")
-            for project in portfolio_data['projects']:
-                prompt_parts.append(f"- {project.get('name', '')} ({project.get('start_date', '')} - {project.get('end_date', '')})")
-                if project.get('description'):
-                    prompt_parts.append(f"  Description: {project['description']}")
-                if project.get('url'):
-                    prompt_parts.append(f"  URL: {project['url']}")
-            prompt_parts.append("")
-
-        if portfolio_data.get('certifications'):
-            prompt_parts.append("Certifications:")
-            for cert in portfolio_data['certifications']:
-                prompt_parts.append(f"- {cert.get('name', '')} from {cert.get('issuer', '')} (Issued: {cert.get('date', '')})")
-                if cert.get('url'):
-                    prompt_parts.append(f"  URL: {cert.get('url', '')}")
-            prompt_parts.append("")
-
-        prompt = "\n".join(prompt_parts).strip()
-
-        if not prompt:
-            return "Please add some education, experience, projects, or certifications to generate a summary."
-
-        # Final prompt instruction
-        full_prompt = f"""You are an expert portfolio branding assistant.
+import llm_client
+
+SUMMARY_MODEL = "llama3-8b-8192"
+SUMMARY_MAX_TOKENS = 250
+EMPTY_PORTFOLIO_MESSAGE = "Please add some education, experience, projects, or certifications to generate a summary."
+
+def build_summary_messages(portfolio_data):
+    """Build the summary chat messages, or None when there is nothing to summarize."""
+    # Construct prompt parts from portfolio data
+    prompt_parts = []
+
+    if portfolio_data.get('education'):
+        prompt_parts.append("Education:")
+        for edu in portfolio_data['education']:
+            prompt_parts.append(f"- {edu.get('degree', '')} in {edu.get('field_of_study', '')} from {edu.get('institution', '')} ({edu.get('start_date', '')} - {edu.get('end_date', '')})")
+            if edu.get('description'):
+                prompt_parts.append(f"  Description: {edu['description']}")
+        prompt_parts.append("")
+
+    if portfolio_data.get('experience'):
+        prompt_parts.append("Experience:")
+        for exp in portfolio_data['experience']:
+            prompt_parts.append(f"- {exp.get('position', '')} at {exp.get('company', '')} ({exp.get('start_date', '')} - {exp.get('end_date', '')})")
+            if exp.get('description'):
+                prompt_parts.append(f"  Description: {exp['description']}")
+        prompt_parts.append("")
+
+    if portfolio_data.get('projects'):
+        prompt_parts.append("Projects:")
+        for project in portfolio_data['projects']:
+            prompt_parts.append(f"- {project.get('name', '')} ({project.get('start_date', '')} - {project.get('end_date', '')})")
+            if project.get('description'):
+                prompt_parts.append(f"  Description: {project['description']}")
+            if project.get('url'):
+                prompt_parts.append(f"  URL: {project['url']}")
+        prompt_parts.append("")
+
+    if portfolio_data.get('certifications'):
+        prompt_parts.append("Certifications:")
+        for cert in portfolio_data['certifications']:
+            prompt_parts.append(f"- {cert.get('name', '')} from {cert.get('issuer', '')} (Issued: {cert.get('date', '')})")
+            if cert.get('url'):
+                prompt_parts.append(f"  URL: {cert.get('url', '')}")
+        prompt_parts.append("")
+
+    prompt = "\n".join(prompt_parts).strip()
+
+    if not prompt:
+        return None
+
+    # Final prompt instruction
+    full_prompt = f"""You are an expert portfolio branding assistant.
 
 Write a crisp 2–3 line summary for the top section portfolio website. Do **not** start with "As a..." or "I am a...". Instead, begin with a confident, direct statement.
 
@@ -62,24 +62,36 @@ Here's the background data:
 {prompt}
 """
 
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You generate crisp, confident portfolio summaries — output only the summary with no preamble or explanation.",
-                },
-                {
-                    "role": "user",
-                    "content": full_prompt,
-                }
-            ],
-            model="llama3-8b-8192",
+    return [
+        {
+            "role": "system",
+            "content": "You generate crisp, confident portfolio summaries — output only the summary with no preamble or explanation.",
+        },
+        {
+            "role": "user",
+            "content": full_prompt,
+        }
+    ]
+
+def generate_summary(portfolio_data, use_cache=False):
+    """Generates a portfolio summary using the Groq API.
+
+    Summaries are sampled at a high temperature, so caching is opt-in: pass
+    ``use_cache=True`` to reuse the previous summary for unchanged data.
+    """
+    try:
+        messages = build_summary_messages(portfolio_data)
+        if messages is None:
+            return EMPTY_PORTFOLIO_MESSAGE
+
+        return llm_client.complete(
+            messages=messages,
+            model=SUMMARY_MODEL,
             temperature=0.7,
-            max_tokens=250,
+            max_tokens=SUMMARY_MAX_TOKENS,
+            cache=use_cache,
         )
 
-        return chat_completion.choices[0].message.content
-
     except Exception as e:
         print(f"Error generating summary: {e}", file=sys.stderr)
         return f"Error generating summary: {e}"
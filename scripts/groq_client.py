@@ -1,33 +1,26 @@
 import sys
 import json
-import os
-import pdfplumber
-import requests
-from io import BytesIO
-from groq import Groq
 from dotenv import load_dotenv
+import document_extraction
+import prompt_builder
+import resume_parser
+import resume_schema
+import skills_taxonomy
+import structured_output
 import argparse
 
 load_dotenv()
 
 def extract_text_from_url(pdf_url):
     try:
-        # Download PDF from URL
-        response = requests.get(pdf_url)
-        response.raise_for_status()
-        
-        # Read PDF from bytes
-        pdf_file = BytesIO(response.content)
-        full_text = ""
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    full_text += text + "\n"
+        # Download and parse the PDF, or reuse an earlier parse of the same file
+        result = document_extraction.extract_document(pdf_url, ext='.pdf')
 
         return {
             "success": True,
-            "text": full_text.strip()
+            "text": result['text'],
+            "tier": result['tier'],
+            "seconds": result['seconds']
         }
     except Exception as e:
         return {
@@ -35,90 +28,135 @@ def extract_text_from_url(pdf_url):
             "error": str(e)
         }
 
-def extract_info_with_groq(text):
-    try:
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# Resume parser section -> the ProfileExtraction fields it fills, by group.
+PROFILE_FIELDS = {
+    'personal_info': {'basic_info': ('name', 'email', 'phone', 'country')},
+    'education': {'basic_info': ('education',)},
+    'experience': {'professional_info': ('current_designation', 'experience')},
+    'skills': {'professional_info': ('skills',)},
+    'projects': {'professional_info': ('projects',)},
+    'certifications': {'professional_info': ('certifications',)},
+}
 
-        prompt = """
+def _local_profile(parsed):
+    resume = parsed['resume']
+    info = resume['personal_info']
+    location = info['location'] or ''
+    links = parsed['links']
+    linkedin = next((link for link in links if 'linkedin.com' in link.lower()), None)
+    portfolio = next((link for link in links if link != linkedin), None)
+    return {
+        "basic_info": {
+            "name": info['name'],
+            "email": info['email'],
+            "phone": info['phone'],
+            "country": location.rsplit(',', 1)[-1].strip() if ',' in location else None,
+            "education": resume['education'],
+        },
+        "professional_info": {
+            "current_designation": parsed['title'] or next((job['designation'] for job in resume['experience']), None),
+            "skills": resume['skills'],
+            "experience": resume['experience'],
+            "certifications": [],
+            "projects": [],
+            "linkedin_url": linkedin,
+            "portfolio_url": portfolio,
+        },
+    }
+
+def _unsure_sections(parsed):
+    """Sections the local parser cannot fill.
+
+    Those are its low-confidence sections, plus any projects or
+    certifications sections, which it does not read.
+    """
+    return resume_parser.low_confidence_sections(parsed) + parsed['extra_sections']
+
+def local_extract_info(text):
+    """Build the extraction schema from the rule-based parser, or None if it is unsure."""
+    parsed = resume_parser.parse_resume(text)
+    if _unsure_sections(parsed):
+        return None
+    return _local_profile(parsed)
+
+def _requested_fields(sections):
+    """``{group: [field, ...]}`` of the profile fields covering ``sections``."""
+    requested = {'basic_info': [], 'professional_info': []}
+    for section in sections:
+        for group, fields in PROFILE_FIELDS[section].items():
+            requested[group].extend(fields)
+    return requested
+
+def _profile_skeleton(requested):
+    groups = {'basic_info': resume_schema.BasicInfo, 'professional_info': resume_schema.ProfessionalInfo}
+    return json.dumps({
+        group: {field: resume_schema.template(groups[group].model_fields[field].annotation) for field in fields}
+        for group, fields in requested.items()
+    })
+
+def extract_info_with_groq(text, use_local_parser=True):
+    """Extract the profile schema from resume text.
+
+    Fields the local rule-based parser reads confidently are taken from it;
+    the LLM is asked only for the rest, and not at all for a cleanly
+    formatted resume.
+    """
+    try:
+        local = None
+        requested = None
+        if use_local_parser:
+            parsed = resume_parser.parse_resume(text)
+            local = _local_profile(parsed)
+            unsure = _unsure_sections(parsed)
+            if not unsure:
+                return {
+                    "success": True,
+                    "data": local
+                }
+            requested = _requested_fields(unsure)
+
+        response_format = _profile_skeleton(requested) if requested else resume_schema.skeleton(resume_schema.ProfileExtraction)
+        prompt = f"""
 You are a helpful assistant that extracts structured information from a resume text. 
 
-Extract all available details and when extracting `skills`, carefully classify them into:
-- "technical_skills": programming languages, tools, frameworks, data science libraries, AI/ML tools, platforms, software
-- "soft_skills": communication, problem-solving, adaptability, leadership, critical thinking, teamwork, etc.
-- "languages": spoken or written languages like English, Hindi, Spanish, etc.
-
-Only classify a skill if it's clearly present in the text. Do not guess. Use lowercase consistently unless it's a proper name or acronym.
-
-Return all data in this exact JSON format:
-
-{
-  "basic_info": {
-    "name": "string or null",
-    "email": "string or null",
-    "phone": "string or null",
-    "country": "string or null",
-    "education": [
-      {
-        "degree": "string or null",
-        "institution": "string or null",
-        "field_of_study": "string or null",
-        "start_year": "string or null",
-        "end_year": "string or null"
-      }
-    ]
-  },
-  "professional_info": {
-    "current_designation": "string or null",
-    "skills": {
-      "technical_skills": ["string"],
-      "soft_skills": ["string"],
-      "languages": ["string"]
-    },
-    "experience": [
-      {
-        "company": "string or null",
-        "designation": "string or null",
-        "start_date": "string or null",
-        "end_date": "string or null",
-        "description": "string or null"
-      }
-    ],
-    "certifications": [
-      {
-        "name": "string or null",
-        "issuer": "string or null",
-        "year": "string or null"
-      }
-    ],
-    "projects": [
-      {
-        "title": "string or null",
-        "description": "string or null",
-        "technologies": ["string"],
-      }
-    ],
-    "linkedin_url": "string or null",
-    "portfolio_url": "string or null"
-  }
-}
+Extract all available details. List every skill clearly present in the text (technical, soft and spoken languages) in one `skills` array, as written. Do not guess.
+
+Return all data as a JSON object in this exact format:
+{response_format}
 
 Only include fields if data is clearly available. If a value is missing, use null or an empty string/array where appropriate.
 Do not add extra explanations or comments. Output only the raw JSON.
 """
 
-        completion = client.chat.completions.create(
-            messages=[
+        fitted = prompt_builder.build(
+            lambda fields: [
                 {"role": "system", "content": prompt},
-                {"role": "user", "content": f"Extract structured info from the following resume text:\n\n{text}"}
+                {"role": "user", "content": f"Extract structured info from the following resume text:\n\n{fields['text']}"}
             ],
+            {'text': text},
+            model="gemma2-9b-it",
+            max_output_tokens=2500,
+        )
+        result_json = structured_output.complete(
+            fitted['messages'],
+            resume_schema.ProfileExtraction,
+            'extract_profile',
             model="gemma2-9b-it",
-            temperature=0.1
+            temperature=0.1,
+            max_tokens=fitted['max_tokens']
         )
 
-        content = completion.choices[0].message.content
-        # Clean and parse the content
-        content = content.replace("```json", "").replace("```", "").strip()
-        result_json = json.loads(content)
+        # The taxonomy classifies and names the flat skill list.
+        professional = result_json.get("professional_info") or {}
+        if "skills" in professional:
+            professional["skills"] = skills_taxonomy.normalize_skills(professional["skills"])
+
+        if requested:
+            # Keep the confident local fields; take only the requested ones from the model.
+            for group, fields in requested.items():
+                restated = result_json.get(group) or {}
+                local[group].update({field: restated[field] for field in fields if field in restated})
+            result_json = local
 
         return {
             "success": True,
@@ -0,0 +1,302 @@
+"""Compile the Handlebars subset used by ``portfolio-templates/`` to Python.
+
+The portfolio templates are written for Handlebars, which Jinja cannot read.
+:func:`compile_template` parses a template once into a tree of closures;
+rendering is then plain function calls with no re-parsing. Supported:
+
+- ``{{path}}`` (HTML-escaped) and ``{{{path}}}`` (raw), with dotted paths,
+  ``this``, ``../`` parent lookups, ``@index``, ``@key``, ``@first``,
+  ``@last`` and ``@root``;
+- block helpers ``#if``, ``#unless``, ``#each``, ``#with`` and ``#times``,
+  each with an optional ``{{else}}``;
+- simple helpers (``subtract``, ``add``) as mustaches or subexpressions,
+  e.g. ``{{#times (subtract 5 rating)}}``;
+- ``{{! comments}}`` and ``{{!-- comments --}}``.
+
+Values follow Handlebars semantics: ``#if`` treats empty lists as false and
+``{}`` as true, missing paths render as the empty string.
+"""
+
+import re
+
+HELPERS = {
+    'subtract': lambda a, b: _number(a) - _number(b),
+    'add': lambda a, b: _number(a) + _number(b),
+}
+
+_MUSTACHE = re.compile(r'\{\{(~?)(\{?)(!--.*?--|.*?)(\}?)(~?)\}\}', re.S)
+_ARG = re.compile(r'\(|\)|"[^"]*"|\'[^\']*\'|[^\s()]+')
+_ESCAPES = str.maketrans({
+    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;',
+    "'": '&#x27;', '`': '&#x60;', '=': '&#x3D;',
+})
+
+
+class TemplateError(ValueError):
+    """The template uses syntax or helpers outside the supported subset."""
+
+
+def _number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0
+
+
+def _truthy(value):
+    return isinstance(value, dict) or bool(value)
+
+
+def _to_string(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, tuple)):
+        return ','.join(_to_string(item) for item in value)
+    return str(value)
+
+
+def escape(value):
+    return _to_string(value).translate(_ESCAPES)
+
+
+class _Frame:
+    __slots__ = ('value', 'parent', 'root', 'data')
+
+    def __init__(self, value, parent=None, data=None):
+        self.value = value
+        self.parent = parent
+        self.root = parent.root if parent is not None else value
+        self.data = data or {}
+
+
+def _compile_path(path):
+    """Return a function resolving ``path`` against a frame."""
+    if path.startswith('@root'):
+        parts = [p for p in path[len('@root'):].split('.') if p]
+        return lambda frame: _walk(frame.root, parts)
+    if path.startswith('@'):
+        name = path[1:]
+        return lambda frame: frame.data.get(name)
+    depth = 0
+    while path.startswith('../'):
+        depth += 1
+        path = path[3:]
+    if path.startswith('./'):
+        path = path[2:]
+    parts = [p for p in path.split('.') if p and p != 'this']
+
+    def resolve(frame):
+        for _ in range(depth):
+            frame = frame.parent or frame
+        return _walk(frame.value, parts)
+    return resolve
+
+
+def _walk(value, parts):
+    for part in parts:
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, (list, tuple)) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+        if value is None:
+            return None
+    return value
+
+
+def _tokenize_args(text):
+    return _ARG.findall(text)
+
+
+def _compile_expression(tokens, pos=0):
+    """Compile one argument (path, literal or subexpression) starting at ``pos``."""
+    token = tokens[pos]
+    if token == '(':
+        end = pos + 1
+        depth = 1
+        while end < len(tokens) and depth:
+            depth += {'(': 1, ')': -1}.get(tokens[end], 0)
+            end += 1
+        if depth:
+            raise TemplateError(f"Unclosed subexpression: {' '.join(tokens)}")
+        return _compile_call(tokens[pos + 1:end - 1]), end
+    if token[0] in '"\'':
+        literal = token[1:-1]
+        return (lambda frame: literal), pos + 1
+    if re.fullmatch(r'-?\d+(\.\d+)?', token):
+        number = float(token) if '.' in token else int(token)
+        return (lambda frame: number), pos + 1
+    if token in ('true', 'false', 'null', 'undefined'):
+        constant = {'true': True, 'false': False}.get(token)
+        return (lambda frame: constant), pos + 1
+    return _compile_path(token), pos + 1
+
+
+def _compile_args(tokens):
+    args = []
+    pos = 0
+    while pos < len(tokens):
+        arg, pos = _compile_expression(tokens, pos)
+        args.append(arg)
+    return args
+
+
+def _compile_call(tokens):
+    """Compile ``helper arg...`` or a lone path/literal."""
+    if not tokens:
+        raise TemplateError('Empty expression')
+    name = tokens[0]
+    if len(tokens) > 1 or name in HELPERS:
+        helper = HELPERS.get(name)
+        if helper is None:
+            raise TemplateError(f"Unknown helper: {name}")
+        args = _compile_args(tokens[1:])
+        return lambda frame: helper(*(arg(frame) for arg in args))
+    value, _ = _compile_expression(tokens)
+    return value
+
+
+def _render_nodes(nodes, frame, out):
+    for node in nodes:
+        node(frame, out)
+
+
+def _text_node(text):
+    return lambda frame, out: out.append(text)
+
+
+def _value_node(expression, raw):
+    if raw:
+        return lambda frame, out: out.append(_to_string(expression(frame)))
+    return lambda frame, out: out.append(escape(expression(frame)))
+
+
+def _block_node(name, args, body, inverse):
+    if name in ('if', 'unless'):
+        if len(args) != 1:
+            raise TemplateError(f"#{name} takes one argument")
+        condition = args[0]
+        negate = name == 'unless'
+
+        def render_if(frame, out):
+            branch = body if _truthy(condition(frame)) != negate else inverse
+            _render_nodes(branch, frame, out)
+        return render_if
+
+    if name == 'each':
+        if len(args) != 1:
+            raise TemplateError('#each takes one argument')
+        collection = args[0]
+
+        def render_each(frame, out):
+            items = collection(frame)
+            if isinstance(items, dict):
+                entries = list(items.items())
+            elif isinstance(items, (list, tuple)):
+                entries = list(enumerate(items))
+            else:
+                entries = []
+            if not entries:
+                _render_nodes(inverse, frame, out)
+                return
+            last = len(entries) - 1
+            for index, (key, item) in enumerate(entries):
+                data = {'index': index, 'key': key, 'first': index == 0, 'last': index == last}
+                _render_nodes(body, _Frame(item, frame, data), out)
+        return render_each
+
+    if name == 'with':
+        if len(args) != 1:
+            raise TemplateError('#with takes one argument')
+        target = args[0]
+
+        def render_with(frame, out):
+            value = target(frame)
+            if _truthy(value):
+                _render_nodes(body, _Frame(value, frame), out)
+            else:
+                _render_nodes(inverse, frame, out)
+        return render_with
+
+    if name == 'times':
+        if len(args) != 1:
+            raise TemplateError('#times takes one argument')
+        count = args[0]
+
+        def render_times(frame, out):
+            n = max(0, int(_number(count(frame))))
+            for index in range(n):
+                _render_nodes(body, _Frame(frame.value, frame, {'index': index}), out)
+        return render_times
+
+    raise TemplateError(f"Unknown block helper: #{name}")
+
+
+def _parse(source):
+    """Parse ``source`` into a list of node functions."""
+    # Each stack entry: (name, args, body nodes, inverse nodes or None)
+    root = []
+    stack = []
+    current = root
+    pos = 0
+    for match in _MUSTACHE.finditer(source):
+        strip_before, triple, content, _, strip_after = match.groups()
+        text = source[pos:match.start()]
+        if strip_before:
+            text = text.rstrip()
+        if text:
+            current.append(_text_node(text))
+        pos = match.end()
+        if strip_after:
+            while pos < len(source) and source[pos].isspace():
+                pos += 1
+        content = content.strip()
+
+        if content.startswith('!'):
+            continue
+        if content.startswith('#'):
+            tokens = _tokenize_args(content[1:])
+            body = []
+            stack.append((tokens[0], _compile_args(tokens[1:]), body, None, current))
+            current = body
+        elif content == 'else' or content.startswith('^') and not content[1:].strip():
+            if not stack:
+                raise TemplateError('{{else}} outside a block')
+            name, args, body, inverse, parent = stack[-1]
+            if inverse is not None:
+                raise TemplateError(f"Duplicate {{{{else}}}} in #{name}")
+            inverse = []
+            stack[-1] = (name, args, body, inverse, parent)
+            current = inverse
+        elif content.startswith('/'):
+            if not stack:
+                raise TemplateError(f"Unexpected {{{{{content}}}}}")
+            name, args, body, inverse, parent = stack.pop()
+            if content[1:].strip() != name:
+                raise TemplateError(f"{{{{{content}}}}} closes #{name}")
+            current = parent
+            current.append(_block_node(name, args, body, inverse or []))
+        else:
+            current.append(_value_node(_compile_call(_tokenize_args(content)), raw=bool(triple)))
+    if stack:
+        raise TemplateError(f"Unclosed block #{stack[-1][0]}")
+    if pos < len(source):
+        current.append(_text_node(source[pos:]))
+    return root
+
+
+def compile_template(source):
+    """Compile ``source`` once and return ``render(context) -> str``."""
+    nodes = _parse(source)
+
+    def render(context):
+        out = []
+        _render_nodes(nodes, _Frame(context), out)
+        return ''.join(out)
+    return render
@@ -0,0 +1,353 @@
+"""Tolerant, incremental JSON parsing for model output.
+
+Models wrap JSON in prose and code fences, leave trailing commas, use single
+quotes or Python literals, and stop mid-object when they hit ``max_tokens``.
+Retrying costs a full multi-second call, so instead :class:`StreamingJSONParser`
+reads the first JSON object or array out of the text and repairs it on the
+way:
+
+- text before and after the value (preamble, code fences) is skipped;
+- single-quoted strings, unquoted keys, ``True``/``False``/``None``, raw
+  control characters and invalid escapes in strings are normalized; inside
+  a single-quoted string, a quote not followed by ``,``, ``:``, ``}`` or
+  ``]`` is kept as an apostrophe, as in ``'don't'``;
+- trailing and missing commas and missing colons are fixed;
+- at truncation, an open string is closed, a member without a value is
+  dropped and open brackets are closed.
+
+The parser consumes text in chunks, so it can follow a streamed completion
+and produce a best-effort value at any point with :meth:`StreamingJSONParser.snapshot`.
+Every repair applied is reported by name, in the order first seen.
+"""
+
+import copy
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_NUMBER_RE = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+_LITERALS = {'true': 'true', 'false': 'false', 'null': 'null', 'True': 'true', 'False': 'false', 'None': 'null'}
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t', "'": "'"}
+_WORD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-+.$')
+_FENCE_RE = re.compile(r'```(?:json)?', re.IGNORECASE)
+# A code fence around the whole reply; fences anywhere else may be data.
+_WRAPPING_FENCE_RE = re.compile(r'\A\s*```(?:json)?(.*?)```\s*\Z', re.IGNORECASE | re.DOTALL)
+# Skipped text kept only to tell a bare code fence from real prose.
+_SKIPPED_LIMIT = 200
+
+
+class JSONRepairError(ValueError):
+    """Raised when no JSON object or array can be recovered from the text."""
+
+
+class StreamingJSONParser:
+    """Incrementally parse and repair the first JSON object or array in a text.
+
+    Call :meth:`feed` with each chunk, then :meth:`value` (or
+    :meth:`snapshot` mid-stream). :attr:`done` turns True once the top-level
+    value is closed; anything fed after that is ignored.
+    """
+
+    def __init__(self):
+        self.repairs = []
+        self.done = False
+        self._started = False
+        self._out = []
+        # Open containers, innermost last: [bracket, expecting, rollback], where
+        # ``expecting`` is 'key', 'colon', 'value' or 'comma' and ``rollback`` is
+        # the output length after the last complete member.
+        self._stack = []
+        self._quote = None
+        self._escape = False
+        # Whitespace seen after a single quote that may or may not close its
+        # string, or None when no such quote is pending.
+        self._pending_quote = None
+        self._string = []
+        self._string_is_key = False
+        self._word = []
+        self._word_is_key = False
+        self._skipped = []
+        self._trailing = []
+
+    def _repair(self, name):
+        if name not in self.repairs:
+            self.repairs.append(name)
+
+    def feed(self, chunk):
+        """Consume the next piece of text; returns :attr:`done`."""
+        for char in chunk:
+            if self.done:
+                if len(self._trailing) < _SKIPPED_LIMIT:
+                    self._trailing.append(char)
+            elif self._quote is not None:
+                self._string_char(char)
+            elif not self._started:
+                if char in '{[':
+                    self._started = True
+                    self._note_skipped(self._skipped, 'preamble')
+                    self._open(char)
+                elif len(self._skipped) < _SKIPPED_LIMIT:
+                    self._skipped.append(char)
+            else:
+                self._structure_char(char)
+        return self.done
+
+    def _note_skipped(self, chars, name):
+        text = ''.join(chars)
+        if not text.strip():
+            return
+        self._repair('code_fence' if not _FENCE_RE.sub('', text).strip() else name)
+
+    # Strings
+
+    def _string_char(self, char):
+        if self._pending_quote is not None:
+            if char.isspace():
+                self._pending_quote.append(char)
+                return
+            gap = self._pending_quote
+            self._pending_quote = None
+            # A closing quote is followed by a separator, or by the next
+            # string after whitespace (a missing comma).
+            if char in ',:}]' or gap and char in '"\'':
+                self._close_string()
+                self._structure_char(char)
+                return
+            self._repair('unescaped_quotes')
+            self._string.append("'")
+            self._string.extend(gap)
+        if self._escape:
+            self._string.append(char)
+            self._escape = False
+        elif char == '\\':
+            self._string.append(char)
+            self._escape = True
+        elif char == self._quote:
+            if char == "'":
+                # Could be an apostrophe: decide on the next character.
+                self._pending_quote = []
+            else:
+                self._close_string()
+        else:
+            self._string.append(char)
+
+    def _decode_string(self, raw):
+        chars = []
+        i = 0
+        while i < len(raw):
+            char = raw[i]
+            if char != '\\' or i + 1 >= len(raw):
+                if char < ' ':
+                    self._repair('control_characters')
+                if char != '\\':
+                    chars.append(char)
+                i += 1
+                continue
+            escaped = raw[i + 1]
+            if escaped == 'u':
+                digits = raw[i + 2:i + 6]
+                if len(digits) == 4 and all(d in '0123456789abcdefABCDEF' for d in digits):
+                    chars.append(chr(int(digits, 16)))
+                    i += 6
+                    continue
+                if len(digits) < 4 and i + 2 + len(digits) == len(raw):
+                    break  # Escape cut off by truncation.
+            if escaped in _ESCAPES:
+                chars.append(_ESCAPES[escaped])
+                if escaped == "'" and self._quote != "'":
+                    self._repair('invalid_escapes')
+            else:
+                self._repair('invalid_escapes')
+                chars.append(escaped)
+            i += 2
+        return ''.join(chars)
+
+    def _close_string(self):
+        if self._quote == "'":
+            self._repair('single_quotes')
+        text = json.dumps(self._decode_string(''.join(self._string)), ensure_ascii=False)
+        self._quote = None
+        self._string = []
+        self._out.append(text)
+        if self._string_is_key:
+            self._stack[-1][1] = 'colon'
+        else:
+            self._complete_value()
+
+    # Structure
+
+    def _structure_char(self, char):
+        if self._word and char not in _WORD_CHARS:
+            self._flush_word()
+        if char.isspace():
+            return
+        if char in '"\'':
+            self._string_is_key = self._begin_value()
+            self._quote = char
+            self._escape = False
+        elif char in '{[':
+            if self._begin_value():
+                self._repair('unexpected_characters')
+                return
+            self._open(char)
+        elif char in '}]':
+            self._close(char)
+        elif char == ',':
+            frame = self._stack[-1]
+            if frame[1] == 'comma':
+                self._out.append(',')
+                frame[1] = 'key' if frame[0] == '{' else 'value'
+            else:
+                self._repair('extra_commas')
+        elif char == ':':
+            frame = self._stack[-1]
+            if frame[1] == 'colon':
+                self._out.append(':')
+                frame[1] = 'value'
+            else:
+                self._repair('unexpected_characters')
+        elif char in _WORD_CHARS:
+            if not self._word:
+                self._word_is_key = self._begin_value()
+            self._word.append(char)
+        else:
+            self._repair('unexpected_characters')
+
+    def _begin_value(self):
+        """Fix up separators before a new token; returns True if it is an object key."""
+        frame = self._stack[-1]
+        if frame[1] == 'comma':
+            self._repair('missing_commas')
+            self._out.append(',')
+            frame[1] = 'key' if frame[0] == '{' else 'value'
+        if frame[1] == 'colon':
+            self._repair('missing_colons')
+            self._out.append(':')
+            frame[1] = 'value'
+        return frame[1] == 'key'
+
+    def _flush_word(self, final=False):
+        word = ''.join(self._word)
+        self._word = []
+        if self._word_is_key:
+            self._repair('unquoted_keys')
+            self._out.append(json.dumps(word))
+            self._stack[-1][1] = 'colon'
+            return
+        if word in _LITERALS:
+            if _LITERALS[word] != word:
+                self._repair('python_literals')
+            self._out.append(_LITERALS[word])
+        elif _NUMBER_RE.fullmatch(word):
+            self._out.append(word)
+        elif final:
+            return  # A literal or number cut off by truncation.
+        else:
+            self._repair('unquoted_strings')
+            self._out.append(json.dumps(word))
+        self._complete_value()
+
+    def _complete_value(self):
+        if not self._stack:
+            self.done = True
+            return
+        frame = self._stack[-1]
+        frame[1] = 'comma'
+        frame[2] = len(self._out)
+
+    def _open(self, bracket):
+        self._out.append(bracket)
+        self._stack.append([bracket, 'key' if bracket == '{' else 'value', len(self._out)])
+
+    def _close(self, closer):
+        bracket = '{' if closer == '}' else '['
+        if not any(frame[0] == bracket for frame in self._stack):
+            self._repair('unexpected_characters')
+            return
+        while self._stack[-1][0] != bracket:
+            self._repair('mismatched_brackets')
+            self._close_frame()
+        self._close_frame()
+
+    def _close_frame(self):
+        bracket, expecting, rollback = self._stack.pop()
+        if expecting != 'comma' and len(self._out) > rollback:
+            # A trailing comma, or a key with no value: drop back to the last
+            # complete member.
+            self._repair('trailing_commas' if expecting in ('key', 'value') and self._out[-1] == ',' else 'incomplete_members')
+            del self._out[rollback:]
+        self._out.append('}' if bracket == '{' else ']')
+        self._complete_value()
+
+    # Results
+
+    def _finish(self):
+        if not self._started:
+            raise JSONRepairError('No JSON object or array found in model output')
+        if self.done:
+            self._note_skipped(self._trailing, 'trailing_text')
+            return
+        self._repair('truncated')
+        if self._pending_quote is not None:
+            self._pending_quote = None
+            self._close_string()
+        if self._quote is not None:
+            if self._escape:
+                self._string.pop()
+            self._close_string()
+        if self._word:
+            self._flush_word(final=True)
+        while self._stack:
+            self._close_frame()
+
+    def text(self):
+        """The repaired JSON document for everything fed so far."""
+        finished = copy.copy(self)
+        finished.repairs = list(self.repairs)
+        finished._out = list(self._out)
+        finished._stack = [list(frame) for frame in self._stack]
+        finished._string = list(self._string)
+        if self._pending_quote is not None:
+            finished._pending_quote = list(self._pending_quote)
+        finished._word = list(self._word)
+        finished._finish()
+        return ''.join(finished._out), finished.repairs
+
+    def snapshot(self):
+        """Best-effort value for the text fed so far, or None before any JSON starts."""
+        if not self._started:
+            return None
+        return self.value()[0]
+
+    def value(self):
+        """Return ``(value, repairs)`` for everything fed so far."""
+        text, repairs = self.text()
+        try:
+            return json.loads(text), repairs
+        except json.JSONDecodeError as e:
+            raise JSONRepairError(f'Could not repair model output as JSON: {e}') from e
+
+
+def parse(text):
+    """Parse the first JSON object or array in ``text``; returns ``(value, repairs)``."""
+    # Fast path: well-formed output, possibly fenced, needs no character walk.
+    fenced = _WRAPPING_FENCE_RE.match(text or '')
+    stripped = (fenced.group(1) if fenced else text or '').strip()
+    if stripped[:1] in ('{', '['):
+        try:
+            return json.loads(stripped), ['code_fence'] if fenced else []
+        except json.JSONDecodeError:
+            pass
+    parser = StreamingJSONParser()
+    parser.feed(text or '')
+    return parser.value()
+
+
+def loads(text, what='model output'):
+    """Parse model output as JSON, repairing it if needed and logging the repairs."""
+    value, repairs = parse(text)
+    if set(repairs) - {'code_fence'}:
+        logger.warning(f"Repaired {what} JSON: {', '.join(repairs)}")
+    return value
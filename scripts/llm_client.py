@@ -0,0 +1,326 @@
+"""Shared Groq client layer used by every script and the API service.
+
+Clients are created once per process (and per event loop for the async
+variant) and reuse a pooled keep-alive HTTP connection, so repeat calls skip
+the TCP/TLS handshake. Timeouts and per-model defaults live here too.
+
+Calls go through :mod:`llm_scheduler`, which paces them against the rate
+limits the API reports and retries transient failures; the SDK's own retries
+are turned off so the two do not stack.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import weakref
+import httpx
+from dotenv import load_dotenv
+
+from disk_cache import DiskCache, DEFAULT_CACHE_DIR
+from llm_scheduler import scheduler, priority, INTERACTIVE, BATCH
+
+try:
+    from groq import Groq, AsyncGroq, APIError
+except ImportError:
+    raise ImportError("groq package not installed. Please run: pip install groq")
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Fallbacks for anything a call site does not set explicitly. No output cap
+# here: ``max_tokens`` is set by the call sites that want one.
+MODEL_DEFAULTS = {
+    'gemma2-9b-it': {'temperature': 0.3},
+    'llama3-8b-8192': {'temperature': 0.3},
+    'llama-3.1-8b-instant': {'temperature': 0.3},
+}
+DEFAULT_MODEL = 'llama-3.1-8b-instant'
+
+REQUEST_TIMEOUT = httpx.Timeout(
+    float(os.getenv('GROQ_TIMEOUT', 60)),
+    connect=float(os.getenv('GROQ_CONNECT_TIMEOUT', 5)),
+)
+POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv('GROQ_MAX_CONNECTIONS', 20)),
+    max_keepalive_connections=int(os.getenv('GROQ_MAX_KEEPALIVE', 10)),
+    keepalive_expiry=30.0,
+)
+
+# Calls at or below this temperature are deterministic enough to be cached
+# unless the call site says otherwise.
+CACHE_MAX_TEMPERATURE = 0.2
+
+_clients = {}
+# event loop -> {(pid, api_key): AsyncGroq}. Weakly keyed so a loop's clients,
+# and their connection pools, go away with it (every asyncio.run() makes one).
+_async_clients = weakref.WeakKeyDictionary()
+_completion_cache = None
+_lock = threading.Lock()
+
+
+def _resolve_api_key(api_key):
+    api_key = api_key or os.getenv('GROQ_API_KEY')
+    if not api_key:
+        raise RuntimeError('GROQ_API_KEY not found in environment.')
+    return api_key
+
+
+def _request_model(request):
+    try:
+        return json.loads(request.content).get('model')
+    except (ValueError, AttributeError, httpx.RequestNotRead):
+        return None
+
+
+def _record_rate_limits(response):
+    """httpx response hook: feed the rate-limit headers to the scheduler."""
+    model = _request_model(response.request)
+    if model:
+        scheduler.observe(model, response.headers)
+
+
+async def _arecord_rate_limits(response):
+    _record_rate_limits(response)
+
+
+def _estimated_tokens(params):
+    """Tokens a call may consume against the per-minute budget: prompt plus the output cap."""
+    import prompt_builder
+    return prompt_builder.count_message_tokens(params['messages']) + (params.get('max_tokens') or 0)
+
+
+def get_client(api_key=None):
+    """Return the process-wide Groq client for ``api_key``."""
+    api_key = _resolve_api_key(api_key)
+    # Keyed by pid as well: a client inherited across fork() would share
+    # sockets with the parent.
+    key = (os.getpid(), api_key)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = Groq(
+                    api_key=api_key,
+                    timeout=REQUEST_TIMEOUT,
+                    max_retries=0,
+                    http_client=httpx.Client(
+                        timeout=REQUEST_TIMEOUT,
+                        limits=POOL_LIMITS,
+                        event_hooks={'response': [_record_rate_limits]},
+                    ),
+                )
+                _clients[key] = client
+    return client
+
+
+def get_async_client(api_key=None):
+    """Return the AsyncGroq client for ``api_key`` bound to the running loop."""
+    api_key = _resolve_api_key(api_key)
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.get(loop)
+    if clients is None:
+        clients = _async_clients[loop] = {}
+    key = (os.getpid(), api_key)
+    client = clients.get(key)
+    if client is None:
+        client = AsyncGroq(
+            api_key=api_key,
+            timeout=REQUEST_TIMEOUT,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                timeout=REQUEST_TIMEOUT,
+                limits=POOL_LIMITS,
+                event_hooks={'response': [_arecord_rate_limits]},
+            ),
+        )
+        clients[key] = client
+    return client
+
+
+def build_params(messages, model=DEFAULT_MODEL, **overrides):
+    """Merge the model defaults with call-site overrides into request kwargs."""
+    params = {'model': model, 'messages': messages}
+    params.update(MODEL_DEFAULTS.get(model, {}))
+    params.update({k: v for k, v in overrides.items() if v is not None})
+    return params
+
+
+def _create(params, api_key):
+    client = get_client(api_key)
+    return scheduler.run(params['model'], _estimated_tokens(params), lambda: client.chat.completions.create(**params))
+
+
+async def _acreate(params, api_key, **extra):
+    client = get_async_client(api_key)
+    return await scheduler.arun(
+        params['model'], _estimated_tokens(params), lambda: client.chat.completions.create(**params, **extra)
+    )
+
+
+def chat_completion(messages, model=DEFAULT_MODEL, api_key=None, **overrides):
+    """Run a chat completion on the shared client and return the raw response."""
+    return _create(build_params(messages, model, **overrides), api_key)
+
+
+def completion_cache():
+    """Return the shared completion cache, or None when disabled."""
+    global _completion_cache
+    if os.getenv('LLM_CACHE_DISABLED') == '1':
+        return None
+    if _completion_cache is None:
+        _completion_cache = DiskCache(
+            os.getenv('LLM_CACHE_PATH', os.path.join(DEFAULT_CACHE_DIR, 'completions.sqlite3')),
+            max_bytes=int(os.getenv('LLM_CACHE_MAX_MB', 256)) * 1024 * 1024,
+            ttl=float(os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600)),
+        )
+    return _completion_cache
+
+
+def cache_key(params):
+    """Content hash of everything that determines a completion.
+
+    Covers every request parameter, so e.g. JSON-mode (``response_format``)
+    and plain calls with the same messages get separate entries.
+    """
+    material = json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def _cache_for(params, cache):
+    """Resolve the per-call ``cache`` flag: True/False force it, None means auto."""
+    if cache is None:
+        temperature = params.get('temperature')
+        cache = temperature is not None and temperature <= CACHE_MAX_TEMPERATURE
+    return completion_cache() if cache else None
+
+
+def cache_entry(messages, model=DEFAULT_MODEL, cache=None, **overrides):
+    """Return ``(store, key)`` a call with these arguments is cached under.
+
+    ``store`` is None when the call would not be cached. Callers that
+    validate replies themselves use this to evict an entry that turned out
+    to be invalid, or to store a value they validated.
+    """
+    params = build_params(messages, model, **overrides)
+    store = _cache_for(params, cache)
+    return store, cache_key(params) if store else None
+
+
+def _is_valid(content, validate):
+    if validate is None:
+        return True
+    try:
+        validate(content)
+    except ValueError as e:
+        logger.info(f"Not caching invalid completion: {str(e)}")
+        return False
+    return True
+
+
+def _cached(store, key, validate, model):
+    cached = store.get(key)
+    if cached is None:
+        return None
+    if not _is_valid(cached, validate):
+        # Written before validation was in place, or by a different validator.
+        store.delete(key)
+        return None
+    logger.info(f"Completion cache hit for {model}")
+    return cached
+
+
+def complete(messages, model=DEFAULT_MODEL, api_key=None, cache=None, validate=None, **overrides):
+    """Run a chat completion and return the message text.
+
+    ``cache=True`` serves repeat calls from the completion cache, ``False``
+    bypasses it; by default only low-temperature calls are cached.
+    ``validate(content)`` should raise ValueError for a reply that must not
+    be cached (malformed or truncated output); the reply is still returned.
+    """
+    params = build_params(messages, model, **overrides)
+    store = _cache_for(params, cache)
+    key = cache_key(params) if store else None
+    if store:
+        cached = _cached(store, key, validate, model)
+        if cached is not None:
+            return cached
+
+    content = _create(params, api_key).choices[0].message.content
+    if store and content and _is_valid(content, validate):
+        store.set(key, content)
+    return content
+
+
+async def achat_completion(messages, model=DEFAULT_MODEL, api_key=None, **overrides):
+    """Async variant of :func:`chat_completion`."""
+    return await _acreate(build_params(messages, model, **overrides), api_key)
+
+
+async def acomplete(messages, model=DEFAULT_MODEL, api_key=None, cache=None, validate=None, **overrides):
+    """Async variant of :func:`complete`."""
+    params = build_params(messages, model, **overrides)
+    store = _cache_for(params, cache)
+    key = cache_key(params) if store else None
+    if store:
+        cached = _cached(store, key, validate, model)
+        if cached is not None:
+            return cached
+
+    completion = await _acreate(params, api_key)
+    content = completion.choices[0].message.content
+    if store and content and _is_valid(content, validate):
+        store.set(key, content)
+    return content
+
+
+def _usage_dict(usage):
+    if usage is None:
+        return None
+    return {
+        'prompt_tokens': getattr(usage, 'prompt_tokens', None),
+        'completion_tokens': getattr(usage, 'completion_tokens', None),
+        'total_tokens': getattr(usage, 'total_tokens', None),
+    }
+
+
+async def astream(messages, model=DEFAULT_MODEL, api_key=None, **overrides):
+    """Stream a chat completion.
+
+    Yields ``{'type': 'delta', 'text': ...}`` for each token chunk, then one
+    ``{'type': 'done', 'text': <full text>, 'usage': {...}}``. Usage comes
+    from the API when it reports it and is estimated locally otherwise.
+    """
+    params = build_params(messages, model, **overrides)
+    # Only opening the stream is retried; a stream that fails midway surfaces
+    # the error since tokens were already sent to the caller.
+    stream = await _acreate(params, api_key, stream=True)
+    parts = []
+    usage = None
+    async for chunk in stream:
+        if chunk.choices:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield {'type': 'delta', 'text': delta}
+        # Groq reports usage on the final chunk under x_groq.
+        chunk_usage = getattr(chunk, 'usage', None) or getattr(getattr(chunk, 'x_groq', None), 'usage', None)
+        if chunk_usage is not None:
+            usage = _usage_dict(chunk_usage)
+
+    text = ''.join(parts)
+    if usage is None:
+        import prompt_builder
+        prompt_tokens = prompt_builder.count_message_tokens(messages)
+        completion_tokens = prompt_builder.estimate_tokens(text)
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'estimated': True,
+        }
+    yield {'type': 'done', 'text': text, 'usage': usage}
@@ -0,0 +1,324 @@
+"""Rate-limit-aware admission and retries for Groq calls.
+
+Every model call made through :mod:`llm_client` passes through the process-wide
+:data:`scheduler`. It keeps a per-model view of the request and token budget
+reported by the ``x-ratelimit-*`` response headers, holds a call back until
+its estimated tokens fit (rather than sending it into a certain 429), and
+retries 429s, 5xx responses and connection errors with exponential backoff
+and full jitter, honouring ``Retry-After``.
+
+Calls are either ``INTERACTIVE`` (the default: someone is waiting on the
+response) or ``BATCH``. Batch calls give way while interactive calls for the
+same model are waiting and leave a slice of the budget unused, so a large
+batch cannot starve the UI. Select the class with::
+
+    with llm_scheduler.priority(llm_scheduler.BATCH):
+        llm_client.complete(...)
+
+Budgets are per process; each worker process learns them from its own
+responses.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+
+MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 4))
+BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 0.5))
+BACKOFF_CAP = float(os.getenv('LLM_BACKOFF_CAP', 20))
+# Longest a call is held back for budget; after that it is sent anyway and
+# the retry path deals with a 429.
+MAX_QUEUE_WAIT = float(os.getenv('LLM_MAX_QUEUE_WAIT', 60))
+# Share of a model's token and request budget that batch calls leave unused.
+BATCH_RESERVE = float(os.getenv('LLM_BATCH_RESERVE', 0.2))
+POLL_INTERVAL = 0.05
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+_priority = contextvars.ContextVar('llm_priority', default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def priority(value):
+    """Run the enclosed model calls with priority class ``value``."""
+    token = _priority.set(value)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_duration(value):
+    """Parse a rate-limit reset such as ``'7.66s'``, ``'2m59.56s'`` or ``'150ms'`` into seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _header_int(headers, name):
+    try:
+        return int(float(headers.get(name)))
+    except (TypeError, ValueError):
+        return None
+
+
+class ModelBudget:
+    """Last known request/token budget for one model."""
+
+    def __init__(self):
+        self.limit_requests = None
+        self.remaining_requests = None
+        self.requests_reset_at = 0.0
+        self.limit_tokens = None
+        self.remaining_tokens = None
+        self.tokens_reset_at = 0.0
+        self.cooldown_until = 0.0
+        self.waiting_interactive = 0
+
+    def observe(self, headers, now):
+        """Update from a response's ``x-ratelimit-*`` headers."""
+        remaining_requests = _header_int(headers, 'x-ratelimit-remaining-requests')
+        if remaining_requests is not None:
+            self.limit_requests = _header_int(headers, 'x-ratelimit-limit-requests') or self.limit_requests
+            self.remaining_requests = remaining_requests
+            self.requests_reset_at = now + (parse_duration(headers.get('x-ratelimit-reset-requests')) or 0)
+        remaining_tokens = _header_int(headers, 'x-ratelimit-remaining-tokens')
+        if remaining_tokens is not None:
+            self.limit_tokens = _header_int(headers, 'x-ratelimit-limit-tokens') or self.limit_tokens
+            self.remaining_tokens = remaining_tokens
+            self.tokens_reset_at = now + (parse_duration(headers.get('x-ratelimit-reset-tokens')) or 0)
+
+    def _available(self, remaining, limit, reset_at, now, reserve):
+        """Budget left, or None if unknown (never observed or window already reset)."""
+        if remaining is None or now >= reset_at:
+            return None
+        return remaining - (limit or 0) * reserve
+
+    def delay(self, tokens, klass, now):
+        """Seconds to hold a call of ``tokens`` estimated tokens, 0 to send now."""
+        if now < self.cooldown_until:
+            return self.cooldown_until - now
+        reserve = 0.0
+        if klass == BATCH:
+            if self.waiting_interactive:
+                return POLL_INTERVAL
+            reserve = BATCH_RESERVE
+        requests = self._available(self.remaining_requests, self.limit_requests, self.requests_reset_at, now, reserve)
+        if requests is not None and requests < 1:
+            return self.requests_reset_at - now
+        available = self._available(self.remaining_tokens, self.limit_tokens, self.tokens_reset_at, now, reserve)
+        # A call bigger than the whole budget can only wait for a full window.
+        if available is not None and available < tokens:
+            return self.tokens_reset_at - now
+        return 0.0
+
+    def reserve(self, tokens):
+        """Count an admitted call against the budget until the next headers arrive."""
+        if self.remaining_requests is not None:
+            self.remaining_requests -= 1
+        if self.remaining_tokens is not None:
+            self.remaining_tokens -= tokens
+
+    def snapshot(self, now):
+        return {
+            'remaining_requests': self.remaining_requests if now < self.requests_reset_at else None,
+            'remaining_tokens': self.remaining_tokens if now < self.tokens_reset_at else None,
+            'limit_requests': self.limit_requests,
+            'limit_tokens': self.limit_tokens,
+            'cooldown_s': max(0.0, self.cooldown_until - now),
+        }
+
+
+class Scheduler:
+    def __init__(self, max_retries=MAX_RETRIES, max_queue_wait=MAX_QUEUE_WAIT):
+        self.max_retries = max_retries
+        self.max_queue_wait = max_queue_wait
+        self._budgets = {}
+        self._lock = threading.Lock()
+        self._wait = {klass: {'calls': 0, 'total_s': 0.0, 'max_s': 0.0} for klass in (INTERACTIVE, BATCH)}
+        self.retries = 0
+        self.rate_limited = 0
+        self.failed = 0
+
+    def _budget(self, model):
+        budget = self._budgets.get(model)
+        if budget is None:
+            budget = self._budgets.setdefault(model, ModelBudget())
+        return budget
+
+    def observe(self, model, headers):
+        with self._lock:
+            self._budget(model).observe(headers, time.monotonic())
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _cool_down(self, model, seconds):
+        with self._lock:
+            budget = self._budget(model)
+            budget.cooldown_until = max(budget.cooldown_until, time.monotonic() + seconds)
+
+    # Admission, shared by the sync and async paths: _try_admit either
+    # reserves budget and returns 0 or returns how long to sleep first.
+
+    def _enter(self, model, klass):
+        if klass == INTERACTIVE:
+            with self._lock:
+                self._budget(model).waiting_interactive += 1
+
+    def _try_admit(self, model, tokens, klass, started):
+        now = time.monotonic()
+        with self._lock:
+            budget = self._budget(model)
+            delay = budget.delay(tokens, klass, now)
+            if delay > 0 and now - started < self.max_queue_wait:
+                return min(delay, 1.0)
+            budget.reserve(tokens)
+            if klass == INTERACTIVE:
+                budget.waiting_interactive -= 1
+            stats = self._wait[klass]
+            waited = now - started
+            stats['calls'] += 1
+            stats['total_s'] += waited
+            stats['max_s'] = max(stats['max_s'], waited)
+        if waited > 0.01:
+            logger.info(f"{model} {klass} call queued {waited:.2f}s for rate limit budget")
+        return 0.0
+
+    def _leave(self, model, klass):
+        """Undo :meth:`_enter` for a caller that gave up before admission."""
+        if klass == INTERACTIVE:
+            with self._lock:
+                self._budget(model).waiting_interactive -= 1
+
+    def admit(self, model, tokens):
+        klass = current_priority()
+        started = time.monotonic()
+        self._enter(model, klass)
+        try:
+            while (delay := self._try_admit(model, tokens, klass, started)) > 0:
+                time.sleep(delay)
+        except BaseException:
+            self._leave(model, klass)
+            raise
+
+    async def aadmit(self, model, tokens):
+        klass = current_priority()
+        started = time.monotonic()
+        self._enter(model, klass)
+        try:
+            while (delay := self._try_admit(model, tokens, klass, started)) > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._leave(model, klass)
+            raise
+
+    # Retries
+
+    def _retry_delay(self, model, error, attempt):
+        """Seconds to wait before retrying after ``error``, or None if it is not retryable."""
+        status = getattr(error, 'status_code', None)
+        if status is None:
+            # No HTTP status: only connection-level failures are worth retrying.
+            if not any(cls.__name__ == 'APIConnectionError' for cls in type(error).__mro__):
+                return None
+        elif status not in RETRYABLE_STATUS and status < 500:
+            return None
+        if attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        response = getattr(error, 'response', None)
+        retry_after = parse_duration(response.headers.get('retry-after')) if response is not None else None
+        if status == 429:
+            self._count('rate_limited')
+            if response is not None:
+                self.observe(model, response.headers)
+            if retry_after:
+                # Hold every call to this model, not just this one.
+                self._cool_down(model, retry_after)
+                delay = max(delay, retry_after)
+        elif retry_after:
+            delay = max(delay, retry_after)
+        self._count('retries')
+        logger.warning(f"{model} call failed ({status or type(error).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+    def run(self, model, tokens, send):
+        """Call ``send()`` once admitted, retrying transient failures."""
+        attempt = 0
+        while True:
+            self.admit(model, tokens)
+            try:
+                return send()
+            except Exception as e:
+                delay = self._retry_delay(model, e, attempt)
+                if delay is None:
+                    self._count('failed')
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def arun(self, model, tokens, send):
+        """Async variant of :meth:`run`; ``send`` returns an awaitable."""
+        attempt = 0
+        while True:
+            await self.aadmit(model, tokens)
+            try:
+                return await send()
+            except Exception as e:
+                delay = self._retry_delay(model, e, attempt)
+                if delay is None:
+                    self._count('failed')
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            queue_wait = {
+                klass: {
+                    'calls': stats['calls'],
+                    'avg_s': stats['total_s'] / stats['calls'] if stats['calls'] else 0.0,
+                    'max_s': stats['max_s'],
+                }
+                for klass, stats in self._wait.items()
+            }
+            models = {model: budget.snapshot(now) for model, budget in self._budgets.items()}
+            counts = {'retries': self.retries, 'rate_limited': self.rate_limited, 'failed': self.failed}
+        return {
+            'queue_wait': queue_wait,
+            **counts,
+            'models': models,
+        }
+
+
+scheduler = Scheduler()
@@ -3,12 +3,21 @@ import os
 import sys
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 import requests
 from io import BytesIO
-import pdfplumber
 from urllib.parse import urlparse
 
+import analysis_cache
+import ats_scoring
+import document_extraction
+import prompt_builder
+import resume_parser
+import resume_schema
+import structured_output
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,9 +29,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 try:
-    from groq import Groq
-except ImportError:
-    logger.error("groq package not installed. Please run: pip install groq")
+    import llm_client
+except ImportError as e:
+    logger.error(str(e))
     sys.exit(1)
 
 def get_file_content(file_path_or_url: str) -> BytesIO:
@@ -45,41 +54,68 @@ def get_file_content(file_path_or_url: str) -> BytesIO:
             logger.error(f"Error reading file: {str(e)}")
             raise RuntimeError(f"Failed to read file: {str(e)}")
 
-def extract_text_from_pdf(file_path_or_url: str) -> str:
-    """Extract text from a PDF file or URL."""
+# Resume text beyond this never fits in the analysis prompt, so pages past it
+# are not parsed.
+MAX_RESUME_CHARS = 20000
+
+def extract_text_from_pdf(file_path_or_url: str, max_chars: int = MAX_RESUME_CHARS) -> str:
+    """Extract text from a PDF file or URL, stopping after ``max_chars``."""
     logger.info(f"Extracting text from PDF: {file_path_or_url}")
     
     try:
-        file_content = get_file_content(file_path_or_url)
-        full_text = ""
-        with pdfplumber.open(file_content) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    full_text += text + "\n"
-        return full_text.strip()
+        return document_extraction.extract_document(
+            file_path_or_url,
+            loader=lambda source: get_file_content(source).getvalue(),
+            ext='.pdf',
+            max_chars=max_chars,
+        )['text']
     except Exception as e:
         logger.error(f"Failed to extract text from PDF: {str(e)}")
         raise
 
-def clean_json_string(json_str):
-    """Clean and parse JSON string, handling common LLM output issues."""
-    try:
-        # Remove markdown code blocks if present
-        json_str = json_str.replace("```json", "").replace("```", "").strip()
-        
-        # Try to parse the JSON
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse JSON: {str(e)}")
-        logger.error(f"Raw JSON string: {json_str}")
-        raise
+ANALYSIS_MODEL = "gemma2-9b-it"
+
+def analyze_resume(resume_text, job_description, groq_api_key, use_cache=True, local_scoring=True):
+    """Analyze resume against job description and generate structured feedback.
 
-def analyze_resume(resume_text, job_description, groq_api_key):
-    """Analyze resume against job description and generate structured feedback."""
+    Repeat runs on the same resume and job description are served from the
+    completion cache unless ``use_cache`` is False. Sections of the resume
+    the local parser reads confidently are taken from it, and the model
+    restates only the rest as ``structured_resume``, which saves most of the
+    output tokens.
+
+    With ``local_scoring`` the ``score`` and ``keyword_gaps`` come from the
+    deterministic keyword matcher in :mod:`ats_scoring`, so they are the same
+    on every run; the model only writes the ``suggestions``.
+    """
     logger.info("Starting resume analysis")
+    model = ANALYSIS_MODEL
+    parsed = resume_parser.parse_resume(resume_text)
+    missing = resume_parser.low_confidence_sections(parsed)
+    structured_rule = '' if not missing else f"\n- The structured_resume should include only these sections: {', '.join(missing)}; use null or [] for missing values"
+
+    scored = None
+    if local_scoring and (job_description or '').strip():
+        scored = ats_scoring.score(resume_text, job_description)
+        logger.info(f"Local ATS score {scored['score']}, {len(scored['keyword_gaps'])} keyword gaps")
+    requested = ('suggestions',) + (() if scored else ('score', 'keyword_gaps')) + (('structured_resume',) if missing else ())
+    schema = resume_schema.require(resume_schema.ResumeAnalysis, *requested)
+    # Only the sections the local parser missed are shown to the model.
+    response_format = resume_schema.skeleton(schema, include=requested, overrides={
+        'structured_resume': {
+            section: resume_schema.template(resume_schema.AnalysisResume.model_fields[section].annotation)
+            for section in missing
+        },
+    } if missing else None)
+    keyword_context = '' if not scored else f"""
+KEYWORD ANALYSIS (already computed, base your suggestions on it):
+Match score: {scored['score']}/100
+Missing keywords: {', '.join(scored['keyword_gaps']) or 'none'}
+"""
+    score_rules = "- All suggestions must be specific and actionable" if scored else "- Score should be a number between 0-100\n- All suggestions and keyword gaps must be specific and actionable"
     
-    prompt = f"""
+    def render(fields):
+        prompt = f"""
 You are an expert ATS (Applicant Tracking System) and resume optimization specialist.
 
 TASK:
@@ -90,103 +126,130 @@ Focus on:
 3. Overall ATS compatibility
 
 RESUME:
-{resume_text}
+{fields['resume_text']}
 
 JOB DESCRIPTION:
-{job_description}
-
-Return your analysis in this exact JSON format:
-{{
-  "score": number (0-100),
-  "keyword_gaps": [
-    "string (specific missing keywords or skills)",
-    ...
-  ],
-  "suggestions": [
-    "string (specific improvement suggestions)",
-    ...
-  ],
-  "structured_resume": {{
-    "personal_info": {{
-      "name": "string or null",
-      "email": "string or null",
-      "phone": "string or null",
-      "location": "string or null",
-      "summary": "string or null"
-    }},
-    "education": [
-      {{
-        "degree": "string or null",
-        "institution": "string or null",
-        "field_of_study": "string or null",
-        "start_year": "string or null",
-        "end_year": "string or null"
-      }}
-    ],
-    "experience": [
-      {{
-        "company": "string or null",
-        "designation": "string or null",
-        "start_date": "string or null",
-        "end_date": "string or null",
-        "description": "string or null"
-      }}
-    ],
-    "skills": {{
-      "technical_skills": ["string"],
-      "soft_skills": ["string"],
-      "languages": ["string"],
-      "keyword_gaps": ["string"]
-    }}
-  }}
-}}
+{fields['job_description']}
+{keyword_context}
+Return your analysis as a JSON object in this exact format:
+{response_format}
 
 IMPORTANT:
-- Score should be a number between 0-100
-- All suggestions and keyword gaps must be specific and actionable
-- The structured_resume should include all available information from the original resume
+{score_rules}{structured_rule}
 - Do not add any text outside the JSON object
 - Return ONLY the JSON object, no markdown or extra text
 """
+        return [
+            {"role": "system", "content": "You are an expert ATS and resume optimization specialist. Return only valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
+
     try:
-        client = Groq(api_key=groq_api_key)
+        fitted = prompt_builder.build(
+            render,
+            {'resume_text': resume_text, 'job_description': job_description},
+            model=model,
+            max_output_tokens=2500 if missing else 800,
+            weights={'resume_text': 2, 'job_description': 1},
+        )
         logger.info("Calling Groq API for resume analysis")
-        completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are an expert ATS and resume optimization specialist. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            model="gemma2-9b-it",
+        analysis = structured_output.complete(
+            fitted['messages'],
+            schema,
+            'analyze_resume',
+            model=model,
+            api_key=groq_api_key,
+            cache=use_cache,
             temperature=0.3,
-            max_tokens=2500
+            max_tokens=fitted['max_tokens']
         )
-        
-        content = completion.choices[0].message.content
-        logger.info("Received response from Groq API")
-        
-        # Clean and parse the JSON
-        analysis = clean_json_string(content)
-        logger.info("Successfully parsed analysis result")
+        logger.info("Received and validated analysis result")
+        if scored:
+            analysis['score'] = scored['score']
+            analysis['keyword_gaps'] = scored['keyword_gaps']
+        restated = analysis.get('structured_resume') or {}
+        structured = {**parsed['resume'], **{key: restated[key] for key in missing if key in restated}}
+        structured['skills'] = {**structured['skills'], 'keyword_gaps': analysis.get('keyword_gaps', [])}
+        analysis['structured_resume'] = structured
         
         # Validate required fields
         required_fields = ['score', 'keyword_gaps', 'suggestions', 'structured_resume']
         for field in required_fields:
             if field not in analysis:
                 raise ValueError(f"Missing required field: {field}")
-        
+
+        # Lets a rewrite of the same resume skip re-parsing it.
+        analysis_cache.remember(resume_text, analysis['structured_resume'])
         return analysis
             
     except Exception as e:
         logger.error(f"Failed to analyze resume: {str(e)}")
         raise
 
+# Upper bound on analyses a batch runs at once; callers may ask for fewer.
+BATCH_MAX_PARALLEL = int(os.getenv('BATCH_MAX_PARALLEL', 4))
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 100))
+
+def analyze_batch_item(index, item, groq_api_key, use_cache=True):
+    """Analyze one ``{'resume_text', 'job_description', 'id'?}`` batch item.
+
+    Never raises: failures are reported in the returned record so one bad
+    item does not sink the batch. Runs at batch priority, so interactive
+    requests for the same model go first when the rate limit is tight.
+    """
+    start = time.perf_counter()
+    record = {'index': index, 'id': item.get('id')}
+    try:
+        with llm_client.priority(llm_client.BATCH):
+            record['result'] = analyze_resume(item['resume_text'], item.get('job_description') or '', groq_api_key, use_cache=use_cache)
+        record['status'] = 'ok'
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = str(e)
+    record['seconds'] = time.perf_counter() - start
+    return record
+
+def analyze_batch(items, groq_api_key, max_parallel=BATCH_MAX_PARALLEL, use_cache=True):
+    """Analyze many resume/job-description pairs concurrently.
+
+    Yields one record per item (see :func:`analyze_batch_item`) in completion
+    order, running at most ``max_parallel`` (capped at ``BATCH_MAX_PARALLEL``)
+    analyses at a time. Records carry the item's ``index`` so callers can
+    restore input order.
+    """
+    if len(items) > BATCH_MAX_ITEMS:
+        raise ValueError(f"Batch has {len(items)} items, the limit is {BATCH_MAX_ITEMS}")
+    workers = max(1, min(max_parallel or BATCH_MAX_PARALLEL, BATCH_MAX_PARALLEL, len(items) or 1))
+    logger.info(f"Analyzing batch of {len(items)} items, {workers} at a time")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(analyze_batch_item, index, item, groq_api_key, use_cache)
+            for index, item in enumerate(items)
+        ]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Stop queued items if the consumer gives up early.
+            for future in futures:
+                future.cancel()
+
 def main():
     parser = argparse.ArgumentParser(description="Analyze and optimize a resume against a job description.")
     parser.add_argument('--resume_text', type=str, help='Resume text to analyze')
-    parser.add_argument('--job_description', type=str, required=True, help='Job description to compare against')
+    parser.add_argument('--job_description', type=str, help='Job description to compare against')
+    parser.add_argument('--batch_file', type=str, help='JSON file with a list of {"resume_text", "job_description", "id"} items; prints one JSON result per line as each finishes')
+    parser.add_argument('--max_parallel', type=int, default=BATCH_MAX_PARALLEL, help='Analyses to run at once in batch mode')
     parser.add_argument('--resume_file', type=str, help='Path or URL to the PDF file to extract resume text from')
+    parser.add_argument('--no_cache', action='store_true', help='Bypass the completion cache and force a fresh analysis')
     args = parser.parse_args()
 
+    if args.batch_file:
+        # stdout carries the NDJSON records; keep log lines out of it.
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+                handler.setStream(sys.stderr)
+
     logger.info("Starting resume optimization process")
     
     load_dotenv()
@@ -195,6 +258,24 @@ def main():
         logger.error("GROQ_API_KEY not found in environment")
         sys.exit(1)
 
+    if args.batch_file:
+        try:
+            with open(args.batch_file) as f:
+                items = json.load(f)
+            for record in analyze_batch(items, groq_api_key, max_parallel=args.max_parallel, use_cache=not args.no_cache):
+                print(json.dumps(record), flush=True)
+        except Exception as e:
+            logger.error(f"Batch analysis failed: {str(e)}")
+            print(json.dumps({'error': str(e)}))
+            sys.exit(1)
+        return
+
+    if not args.job_description:
+        error_msg = '--job_description is required unless --batch_file is given.'
+        logger.error(error_msg)
+        print(json.dumps({'error': error_msg}))
+        sys.exit(1)
+
     resume_text = None
     if args.resume_text:
         resume_text = args.resume_text
@@ -213,7 +294,7 @@ def main():
         sys.exit(1)
 
     try:
-        analysis = analyze_resume(resume_text, args.job_description, groq_api_key)
+        analysis = analyze_resume(resume_text, args.job_description, groq_api_key, use_cache=not args.no_cache)
         # Print clean JSON without indentation for API consumption
         print(json.dumps(analysis))
     except Exception as e:
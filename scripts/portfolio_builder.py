@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""Build deployable static portfolio sites in bulk.
+
+Each template in ``portfolio-templates/`` is prepared once per build: its
+Handlebars markup is compiled (see ``handlebars_compiler``), its stylesheet
+is minified into a content-fingerprinted asset, and the rules needed above
+the fold are extracted for inlining. Portfolios are then rendered in
+parallel worker processes, minified, and written as one bundle per user:
+
+    <output>/<user_id>/index.html
+    <output>/<user_id>/assets/<template>.<hash>.css
+
+A build key (template sources plus portfolio data) is recorded per bundle in
+``<output>/manifest.json``; a portfolio whose key is unchanged is skipped, so
+editing a template rebuilds exactly the portfolios that use it.
+
+Usage:
+    python3 scripts/portfolio_builder.py --input portfolios.jsonl --output dist/portfolios --workers 8
+
+The input is a JSON array or JSON lines of ``portfolios`` rows (as stored in
+Supabase); a row's ``template_id`` picks its template.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from handlebars_compiler import compile_template
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(os.getenv('PORTFOLIO_TEMPLATE_DIR', Path(__file__).parent.parent / 'portfolio-templates'))
+TEMPLATES = ('creative', 'cyberpunk', 'dark', 'minimalist', 'professional', 'tech-developer')
+DEFAULT_TEMPLATE = os.getenv('PORTFOLIO_DEFAULT_TEMPLATE', 'professional')
+WORKERS = int(os.getenv('PORTFOLIO_BUILD_WORKERS', os.cpu_count() or 1))
+MANIFEST = 'manifest.json'
+# Bump when the build output changes for the same inputs, to force a rebuild.
+BUILDER_VERSION = '1'
+
+# Elements whose surrounding whitespace never renders.
+_BLOCK_TAGS = frozenset('''
+    html head body meta link title style script noscript header footer main nav section article aside
+    div p ul ol li dl dt dd h1 h2 h3 h4 h5 h6 table thead tbody tr td th form hr br figure figcaption
+'''.split())
+_PRESERVE = re.compile(r'(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)', re.S | re.I)
+_HTML_TOKEN = re.compile(r'(<!--.*?-->|<[^>]+>)', re.S)
+_TAG_NAME = re.compile(r'</?\s*([a-zA-Z][\w-]*)')
+_LOCAL_STYLESHEET = re.compile(
+    r'<link\b(?=[^>]*\brel=["\']stylesheet["\'])(?![^>]*\bhref=["\'](?:https?:)?//)[^>]*>\s*', re.I)
+_CLASS_ATTR = re.compile(r'\bclass=["\']([^"\']*)["\']', re.I)
+_ID_ATTR = re.compile(r'\bid=["\']([^"\']*)["\']', re.I)
+_ABOVE_FOLD_END = re.compile(r'</header\s*>|</section\s*>', re.I)
+# Portfolio IDs name bundle directories, so they must be one plain path component.
+_PORTFOLIO_ID = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]*')
+
+
+# --- Minification -----------------------------------------------------------
+
+def minify_css(css):
+    """Strip comments and redundant whitespace; strings are left untouched."""
+    out = []
+    i = 0
+    n = len(css)
+    while i < n:
+        c = css[i]
+        if c in '"\'':
+            end = i + 1
+            while end < n and css[end] != c:
+                end += 2 if css[end] == '\\' else 1
+            out.append(css[i:end + 1])
+            i = end + 1
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif c.isspace():
+            while i < n and css[i].isspace():
+                i += 1
+            # Spaces before ':' are significant in selectors ("a :hover"),
+            # so only the space after it goes.
+            if out and out[-1] not in ('{', '}', ';', ',', '>', ':') and i < n and css[i] not in '{};,>':
+                out.append(' ')
+        elif c == '}' and out and out[-1] == ';':
+            out[-1] = c
+            i += 1
+        else:
+            out.append(c)
+            i += 1
+    return ''.join(out).strip()
+
+
+def minify_html(html):
+    """Collapse whitespace and drop comments, keeping <pre>, <textarea> and scripts verbatim."""
+    preserved = []
+
+    def keep(match):
+        open_tag, name, body, close_tag = match.groups()
+        if name.lower() == 'style':
+            body = minify_css(body)
+        preserved.append(open_tag + body + close_tag)
+        return f'<preserved-{len(preserved) - 1}>'
+
+    html = _PRESERVE.sub(keep, html)
+    tokens = _HTML_TOKEN.split(html)
+    out = []
+    for index, token in enumerate(tokens):
+        if not token:
+            continue
+        if index % 2:
+            if token.startswith('<!--') and not token.startswith('<!--[if'):
+                continue
+            out.append(re.sub(r'\s+', ' ', token))
+            continue
+        text = re.sub(r'\s+', ' ', token)
+        if text == ' ' or text.startswith(' ') or text.endswith(' '):
+            before = _TAG_NAME.match(tokens[index - 1]) if index else None
+            after = _TAG_NAME.match(tokens[index + 1]) if index + 1 < len(tokens) else None
+            if before is None or before.group(1).lower() in _BLOCK_TAGS or before.group(1).startswith('preserved-'):
+                text = text.lstrip()
+            if after is None or after.group(1).lower() in _BLOCK_TAGS or after.group(1).startswith('preserved-'):
+                text = text.rstrip()
+        if text:
+            out.append(text)
+    html = ''.join(out)
+    return re.sub(r'<preserved-(\d+)>', lambda m: preserved[int(m.group(1))], html)
+
+
+# --- Critical CSS -----------------------------------------------------------
+
+def _split_rules(css):
+    """Split minified CSS into top-level ``(prelude, block)`` pairs."""
+    rules = []
+    depth = 0
+    start = 0
+    prelude = None
+    i = 0
+    while i < len(css):
+        c = css[i]
+        if c in '"\'':
+            i = css.find(c, i + 1)
+            if i == -1:
+                break
+        elif c == '{':
+            if depth == 0:
+                prelude = css[start:i].strip()
+                start = i + 1
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[start:i]))
+                start = i + 1
+        elif c == ';' and depth == 0:
+            # @import / @charset statements
+            rules.append((css[start:i].strip(), None))
+            start = i + 1
+        i += 1
+    return rules
+
+
+def _selector_matches(selector, classes, ids, tags):
+    for compound in re.split(r'[\s>+~]+', selector):
+        compound = re.sub(r'::?[\w-]+(\([^)]*\))?', '', compound)
+        tag = re.match(r'[a-zA-Z][\w-]*', compound)
+        if tag and tag.group(0).lower() not in tags:
+            return False
+        if any(name not in classes for name in re.findall(r'\.([\w-]+)', compound)):
+            return False
+        if any(name not in ids for name in re.findall(r'#([\w-]+)', compound)):
+            return False
+    return True
+
+
+def _critical_rules(rules, classes, ids, tags):
+    kept = []
+    for prelude, block in rules:
+        if block is None:
+            kept.append(prelude + ';')
+        elif prelude.startswith('@media') or prelude.startswith('@supports'):
+            inner = _critical_rules(_split_rules(block), classes, ids, tags)
+            if inner:
+                kept.append(prelude + '{' + inner + '}')
+        elif prelude.startswith('@font-face'):
+            kept.append(prelude + '{' + block + '}')
+        elif prelude.startswith('@'):
+            # @keyframes and friends are added below if critical rules use them.
+            continue
+        elif any(_selector_matches(s.strip(), classes, ids, tags) for s in prelude.split(',')):
+            kept.append(prelude + '{' + block + '}')
+    return ''.join(kept)
+
+
+def critical_css(css, html):
+    """Rules of ``css`` that can apply to the above-the-fold part of ``html``.
+
+    The fold is the end of the first ``<header>`` or ``<section>``. Matching
+    is by the classes, IDs and tags that appear there, so it runs on the
+    template source once rather than on each rendered page.
+    """
+    match = _ABOVE_FOLD_END.search(html)
+    fold = html[:match.end()] if match else html
+    classes = {name for attr in _CLASS_ATTR.findall(fold) for name in attr.split()}
+    ids = set(_ID_ATTR.findall(fold))
+    tags = {name.lower() for name in _TAG_NAME.findall(fold)} | {'html', 'body'}
+    rules = _split_rules(minify_css(css))
+    critical = _critical_rules(rules, classes, ids, tags)
+    for prelude, block in rules:
+        if block is not None and re.match(r'@(-\w+-)?keyframes\s', prelude):
+            name = prelude.split()[-1]
+            if re.search(rf'\b{re.escape(name)}\b', critical):
+                critical += prelude + '{' + block + '}'
+    return critical
+
+
+# --- Templates and data -----------------------------------------------------
+
+class PortfolioTemplate:
+    """One template prepared for a build: compiled markup and its CSS asset."""
+
+    def __init__(self, template_id, template_dir=TEMPLATE_DIR):
+        template_dir = Path(template_dir)
+        source_path = template_dir / f'{template_id}.html'
+        if template_id not in TEMPLATES or not source_path.exists():
+            raise FileNotFoundError(f"Portfolio template not found: {template_id}")
+        css_path = template_dir / f'{template_id}.css'
+        source = source_path.read_text(encoding='utf-8')
+        css = css_path.read_text(encoding='utf-8') if css_path.exists() else ''
+
+        self.id = template_id
+        self.fingerprint = hashlib.sha256(
+            '\0'.join((BUILDER_VERSION, source, css)).encode('utf-8')
+        ).hexdigest()
+        self.css = minify_css(css).encode('utf-8')
+        self.asset = f'assets/{template_id}.{hashlib.sha256(self.css).hexdigest()[:10]}.css'
+
+        # The template's own <link> points at a file name that does not ship
+        # with it; load the fingerprinted asset instead, with critical rules
+        # inline and the rest fetched without blocking first paint.
+        head = (
+            f'<style>{critical_css(css, source)}</style>'
+            f'<link rel="preload" href="{self.asset}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            f'<noscript><link rel="stylesheet" href="{self.asset}"></noscript>'
+        ) if css else ''
+        source, replaced = _LOCAL_STYLESHEET.subn(lambda m: head, source, count=1)
+        if not replaced:
+            source = re.sub(r'</head\s*>', lambda m: head + m.group(0), source, count=1, flags=re.I)
+        self.render = compile_template(source)
+
+
+def valid_portfolio_id(pid):
+    return isinstance(pid, str) and _PORTFOLIO_ID.fullmatch(pid) is not None
+
+
+def portfolio_id(row):
+    """Bundle directory name for a row, raising ValueError if it has no usable ID."""
+    value = row.get('user_id') or row.get('id')
+    if value is None or value == '':
+        raise ValueError('Portfolio row has no user_id or id')
+    pid = str(value)
+    if not valid_portfolio_id(pid):
+        raise ValueError(f'Portfolio ID is not a valid directory name: {pid!r}')
+    return pid
+
+
+def portfolio_context(row, year=None):
+    """Template variables for a ``portfolios`` row.
+
+    Covers both naming schemes the templates use: flat (``{{name}}``,
+    ``{{linkedin}}``) and nested (``{{user.name}}``, ``{{linkedin_url}}``).
+    """
+    basic = row.get('basic_info') or {}
+    skills = row.get('skills') or {}
+    year = year or datetime.date.today().year
+    name = basic.get('name') or row.get('title') or ''
+    user = {
+        'name': name,
+        'email': basic.get('email') or '',
+        'phone': basic.get('phone') or '',
+        'country': basic.get('country') or '',
+        'current_designation': basic.get('current_designation') or '',
+        'photo_url': basic.get('photo_url') or row.get('photo_url') or '',
+    }
+    return {
+        **user,
+        'title': user['current_designation'],
+        'description': row.get('description') or '',
+        'linkedin': row.get('linkedin_url') or '',
+        'github': row.get('github_url') or '',
+        'linkedin_url': row.get('linkedin_url') or '',
+        'github_url': row.get('github_url') or '',
+        'currentYear': year,
+        'current_year': year,
+        'user': user,
+        'portfolio': {
+            'title': row.get('title') or '',
+            'description': row.get('description') or '',
+            'theme': row.get('theme') or 'dark',
+        },
+        'skills': {
+            'technical_skills': skills.get('technical_skills') or [],
+            'soft_skills': skills.get('soft_skills') or [],
+            'languages': skills.get('languages') or [],
+        },
+        'experience': row.get('experience') or [],
+        'education': row.get('education') or [],
+        'projects': row.get('projects') or [],
+        'certifications': row.get('certifications') or [],
+        'testimonials': row.get('testimonials') or [],
+    }
+
+
+def build_key(template_fingerprint, context):
+    canonical = json.dumps(context, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(f'{template_fingerprint}\0{canonical}'.encode('utf-8')).hexdigest()
+
+
+# --- Building ---------------------------------------------------------------
+
+_templates = {}
+
+
+def _template(template_id, template_dir):
+    """Per-process template cache; a template is recompiled only when its files change."""
+    versions = []
+    for suffix in ('.html', '.css'):
+        try:
+            versions.append(os.stat(Path(template_dir) / f'{template_id}{suffix}').st_mtime_ns)
+        except (FileNotFoundError, ValueError):
+            versions.append(None)
+    key = (template_id, str(template_dir), *versions)
+    if key not in _templates:
+        _templates[key] = PortfolioTemplate(template_id, template_dir)
+    return _templates[key]
+
+
+def _write(path, data):
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _build_one(job):
+    """Render one portfolio into its bundle; runs in a worker process."""
+    pid, template_id, context, output_dir, template_dir = job
+    start = time.perf_counter()
+    try:
+        template = _template(template_id, template_dir)
+        bundle = Path(output_dir) / pid
+        (bundle / 'assets').mkdir(parents=True, exist_ok=True)
+        if template.css:
+            _write(bundle / template.asset, template.css)
+        _write(bundle / 'index.html', minify_html(template.render(context)).encode('utf-8'))
+        # Drop assets left over from earlier fingerprints.
+        for stale in (bundle / 'assets').iterdir():
+            if f'assets/{stale.name}' != template.asset:
+                stale.unlink()
+        files = ['index.html'] + ([template.asset] if template.css else [])
+        return {'id': pid, 'status': 'built', 'files': files, 'seconds': time.perf_counter() - start}
+    except Exception as e:
+        return {'id': pid, 'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+
+
+def _load_manifest(output_dir):
+    try:
+        with open(Path(output_dir) / MANIFEST) as f:
+            return json.load(f).get('portfolios', {})
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_manifest(output_dir, entries):
+    data = json.dumps({'version': BUILDER_VERSION, 'portfolios': entries}, indent=1, sort_keys=True)
+    _write(Path(output_dir) / MANIFEST, data.encode('utf-8'))
+
+
+def build_portfolios(rows, output_dir, workers=WORKERS, force=False,
+                     default_template=DEFAULT_TEMPLATE, template_dir=TEMPLATE_DIR):
+    """Build a static bundle for every portfolio in ``rows``.
+
+    Portfolios whose build key matches the manifest, and whose bundle is
+    still on disk, are skipped unless ``force``. Returns a summary with
+    counts per outcome and the errors of failed portfolios.
+    """
+    start = time.perf_counter()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(output_dir)
+    year = datetime.date.today().year
+
+    fingerprints = {}
+    jobs = []
+    keys = {}
+    summary = {'built': 0, 'skipped': 0, 'failed': 0, 'errors': {}}
+    for index, row in enumerate(rows):
+        try:
+            pid = portfolio_id(row)
+        except ValueError as e:
+            summary['failed'] += 1
+            summary['errors'][f'row {index}'] = str(e)
+            continue
+        template_id = row.get('template_id') or default_template
+        if template_id not in fingerprints:
+            try:
+                fingerprints[template_id] = _template(template_id, template_dir).fingerprint
+            except FileNotFoundError as e:
+                fingerprints[template_id] = None
+                logger.warning(str(e))
+        if fingerprints[template_id] is None:
+            summary['failed'] += 1
+            summary['errors'][pid] = f"Unknown template: {template_id}"
+            continue
+        context = portfolio_context(row, year)
+        key = build_key(fingerprints[template_id], context)
+        previous = manifest.get(pid)
+        if (not force and previous and previous.get('key') == key
+                and (output_dir / pid / 'index.html').exists()):
+            summary['skipped'] += 1
+            continue
+        keys[pid] = (key, template_id)
+        jobs.append((pid, template_id, context, str(output_dir), str(template_dir)))
+
+    if jobs:
+        logger.info(f"Building {len(jobs)} portfolios ({summary['skipped']} unchanged) with {workers} workers")
+    results = []
+    try:
+        if workers > 1 and len(jobs) > 1:
+            # Forked workers inherit the templates compiled above.
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunk = max(1, len(jobs) // (workers * 8))
+                results.extend(executor.map(_build_one, jobs, chunksize=chunk))
+        else:
+            results.extend(map(_build_one, jobs))
+    finally:
+        # Record whatever finished, so an interrupted build resumes where it stopped.
+        for result in results:
+            pid = result['id']
+            if result['status'] == 'built':
+                key, template_id = keys[pid]
+                manifest[pid] = {'key': key, 'template': template_id, 'files': result['files']}
+                summary['built'] += 1
+            else:
+                manifest.pop(pid, None)
+                summary['failed'] += 1
+                summary['errors'][pid] = result['error']
+        _save_manifest(output_dir, manifest)
+
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def prune(output_dir, keep_ids):
+    """Delete bundles (and manifest entries) for portfolios not in ``keep_ids``."""
+    output_dir = Path(output_dir)
+    manifest = _load_manifest(output_dir)
+    removed = [pid for pid in manifest if pid not in keep_ids]
+    for pid in removed:
+        # Never delete outside output_dir, whatever the manifest says.
+        if valid_portfolio_id(pid):
+            shutil.rmtree(output_dir / pid, ignore_errors=True)
+        else:
+            logger.warning(f"Dropping invalid portfolio ID from manifest: {pid!r}")
+        del manifest[pid]
+    _save_manifest(output_dir, manifest)
+    return removed
+
+
+def load_rows(path):
+    with open(path) as f:
+        text = f.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build static portfolio sites from portfolio rows.')
+    parser.add_argument('--input', required=True, help='JSON array or JSON lines of portfolios rows')
+    parser.add_argument('--output', required=True, help='Directory for the per-user bundles')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='Parallel build processes')
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE, help='Template for rows without template_id')
+    parser.add_argument('--force', action='store_true', help='Rebuild portfolios even if unchanged')
+    parser.add_argument('--prune', action='store_true', help='Delete bundles of portfolios not in the input')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stderr)]
+    )
+    rows = load_rows(args.input)
+    summary = build_portfolios(rows, args.output, workers=args.workers, force=args.force,
+                               default_template=args.template)
+    if args.prune:
+        keep_ids = {str(row.get('user_id') or row.get('id')) for row in rows}
+        summary['pruned'] = len(prune(args.output, keep_ids))
+    print(json.dumps(summary, indent=2))
+    sys.exit(1 if summary['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+"""Token-budget-aware prompt construction shared by every LLM call.
+
+Token counts are estimated locally with a conservative word-piece heuristic
+(no tokenizer download needed). ``build`` renders a prompt from variable
+fields such as the resume and job description, sizes them to fit the model's
+context next to the fixed instruction text and the requested output, and
+trims the least valuable content first when they do not fit.
+"""
+
+import copy
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+MODEL_CONTEXT_WINDOWS = {
+    'gemma2-9b-it': 8192,
+    'llama3-8b-8192': 8192,
+    'llama-3.1-8b-instant': 131072,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# The estimate is deliberately pessimistic, but a margin still guards against
+# tokenizer differences between models.
+SAFETY_MARGIN = 0.05
+MESSAGE_OVERHEAD_TOKENS = 4
+
+class PromptTooLongError(ValueError):
+    """The fixed part of a prompt leaves no room for the minimum output."""
+
+
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in ``text``.
+
+    Short words are one token, longer words roughly one token per six
+    letters, digit runs one token per three digits and every symbol one token.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        first = piece[0]
+        if first.isalpha():
+            tokens += 1 + (len(piece) - 1) // 6
+        elif first.isdigit():
+            tokens += (len(piece) + 2) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+def count_message_tokens(messages):
+    """Estimate the prompt tokens of a chat ``messages`` list."""
+    return sum(estimate_tokens(m.get('content', '')) + MESSAGE_OVERHEAD_TOKENS for m in messages) + 3
+
+
+def context_window(model):
+    return MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+
+
+# Sections dropped first when a field has to shrink, in drop order.
+LOW_VALUE_HEADINGS = [
+    r'references?',
+    r'declaration',
+    r'hobbies|interests|hobbies (?:and|&) interests',
+    r'personal (?:details|information|data)',
+    r'extra[- ]?curricular(?: activities)?|volunteer(?:ing)?(?: experience)?',
+    r'equal (?:employment )?opportunity.*|eeo.*',
+    r'benefits|perks|perks (?:and|&) benefits|what we offer',
+    r'about (?:us|the company)|who we are|our (?:story|mission|values)',
+    r'how to apply|application process',
+    r'publications|conferences?|talks',
+    r'awards?|honou?rs|achievements',
+    r'certifications?|licenses?',
+    r'projects?',
+]
+_LOW_VALUE_RES = [re.compile(rf'^\s*(?:{pattern})\s*:?\s*$', re.IGNORECASE) for pattern in LOW_VALUE_HEADINGS]
+
+_HEADING_WORDS_RE = re.compile(r'^[A-Za-z][A-Za-z &/\-]{1,40}:?$')
+
+
+def _is_heading(line):
+    stripped = line.strip()
+    if not stripped or not _HEADING_WORDS_RE.match(stripped):
+        return False
+    return (stripped.isupper() or stripped.endswith(':')
+            or any(regex.match(stripped) for regex in _LOW_VALUE_RES))
+
+
+def _split_sections(text):
+    """Split text into ``[heading, lines]`` chunks; the preamble has heading None."""
+    sections = [[None, []]]
+    for line in text.split('\n'):
+        if _is_heading(line):
+            sections.append([line.strip(), []])
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+def _section_rank(heading):
+    """Lower ranks are dropped first; sections not in the list are never dropped."""
+    if heading is None:
+        return None
+    for rank, regex in enumerate(_LOW_VALUE_RES):
+        if regex.match(heading):
+            return rank
+    return None
+
+
+def _render_sections(sections):
+    parts = []
+    for heading, lines in sections:
+        if heading is not None:
+            parts.append(heading)
+        parts.extend(lines)
+    return '\n'.join(parts).strip()
+
+
+def normalize_whitespace(text):
+    """Collapse runs of spaces and blank lines, which cost tokens for nothing."""
+    text = re.sub(r'[ \t\u00a0]+', ' ', text or '')
+    text = re.sub(r' ?\n ?', '\n', text)
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+def trim_to_tokens(text, max_tokens):
+    """Shrink ``text`` to at most ``max_tokens`` estimated tokens.
+
+    Steps, cheapest loss first: collapse whitespace, drop low-value sections
+    (references, hobbies, benefits boilerplate, ...), then cut trailing lines.
+    Returns ``(text, steps)`` where ``steps`` lists what was removed.
+    """
+    steps = []
+    text = normalize_whitespace(text)
+    if estimate_tokens(text) <= max_tokens:
+        return text, steps
+
+    sections = _split_sections(text)
+    droppable = sorted(
+        (rank, index) for index, (heading, _) in enumerate(sections)
+        if (rank := _section_rank(heading)) is not None
+    )
+    for _, index in droppable:
+        steps.append(f'dropped section {sections[index][0].rstrip(":")!r}')
+        sections[index] = [None, []]
+        text = _render_sections(sections)
+        if estimate_tokens(text) <= max_tokens:
+            return text, steps
+
+    lines = text.split('\n')
+    # Binary search for the longest prefix of lines that fits.
+    low, high = 0, len(lines)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens('\n'.join(lines[:mid])) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    kept = '\n'.join(lines[:low])
+    if low == 0 and max_tokens > 0:
+        # A single huge line: cut by characters instead.
+        kept = lines[0][:max_tokens * 3]
+        while kept and estimate_tokens(kept) > max_tokens:
+            kept = kept[:int(len(kept) * 0.9)]
+    steps.append(f'truncated to {low} of {len(lines)} lines')
+    return kept.strip(), steps
+
+
+def _containers(value):
+    """Every list and dict inside ``value``, outermost first."""
+    found = []
+    pending = [value]
+    while pending:
+        item = pending.pop(0)
+        if isinstance(item, (list, dict)):
+            found.append(item)
+            pending.extend(item.values() if isinstance(item, dict) else item)
+    return found
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def trim_json(value, max_tokens):
+    """Shrink a JSON-serialisable structure to at most ``max_tokens`` estimated tokens.
+
+    Unlike :func:`trim_to_tokens` nothing is cut mid-value, so the result
+    always serialises to valid JSON: list entries are dropped from the end of
+    the longest list first, and once every list is down to one entry, the
+    largest fields go. Returns ``(value, steps)``; ``value`` is a trimmed copy.
+    """
+    steps = []
+    if estimate_tokens(_dumps(value)) <= max_tokens:
+        return value, steps
+    value = copy.deepcopy(value)
+    dropped_entries = 0
+    while estimate_tokens(_dumps(value)) > max_tokens:
+        containers = _containers(value)
+        lists = [item for item in containers if isinstance(item, list) and len(item) > 1]
+        if lists:
+            max(lists, key=len).pop()
+            dropped_entries += 1
+            continue
+        fields = [(estimate_tokens(_dumps(item[key])), id(item), key, item)
+                  for item in containers if isinstance(item, dict) for key in item]
+        if not fields:
+            break
+        _, _, key, item = max(fields, key=lambda field: field[0])
+        del item[key]
+        steps.append(f'dropped field {key!r}')
+    if dropped_entries:
+        steps.insert(0, f'dropped {dropped_entries} list entries')
+    return value, steps
+
+
+def _allocate(sizes, weights, available):
+    """Split ``available`` tokens between fields, in proportion to ``weights``.
+
+    Fields that need less than their share keep their full size and the
+    surplus is redistributed to the others.
+    """
+    budgets = {}
+    remaining = dict(sizes)
+    while remaining:
+        total_weight = sum(weights.get(name, 1) for name in remaining) or 1
+        share = {name: available * weights.get(name, 1) / total_weight for name in remaining}
+        fitting = [name for name in remaining if remaining[name] <= share[name]]
+        if not fitting:
+            for name in remaining:
+                budgets[name] = int(share[name])
+            break
+        for name in fitting:
+            budgets[name] = remaining[name]
+            available -= remaining.pop(name)
+    return budgets
+
+
+def build(render, fields, model, max_output_tokens, weights=None, min_output_tokens=256):
+    """Render a prompt whose variable ``fields`` fit the model's context.
+
+    ``render(fields) -> messages`` builds the chat messages from a dict of
+    field values. The fixed part of the prompt is measured by rendering with
+    empty fields; what remains of the context after reserving
+    ``max_output_tokens`` is split between the fields by ``weights`` (default:
+    equal). Fields that do not fit are trimmed with :func:`trim_to_tokens`;
+    a field given as a dict or list is trimmed with :func:`trim_json` and
+    passed to ``render`` serialised as JSON.
+
+    Returns a dict with ``messages``, ``prompt_tokens`` (estimated),
+    ``max_tokens`` (output budget actually left, at most
+    ``max_output_tokens``) and ``trimmed`` (field -> steps taken). Raises
+    :class:`PromptTooLongError` if even the trimmed prompt leaves less than
+    ``min_output_tokens``, which the API would reject.
+    """
+    weights = weights or {}
+    window = int(context_window(model) * (1 - SAFETY_MARGIN))
+    fixed_tokens = count_message_tokens(render({name: '' for name in fields}))
+
+    structured = {name: value for name, value in fields.items() if isinstance(value, (dict, list))}
+    normalized = {
+        name: _dumps(value) if name in structured else normalize_whitespace(value)
+        for name, value in fields.items()
+    }
+    sizes = {name: estimate_tokens(value) for name, value in normalized.items()}
+    available = max(0, window - fixed_tokens - max_output_tokens)
+
+    trimmed = {}
+    fitted = dict(normalized)
+    if sum(sizes.values()) > available:
+        budgets = _allocate(sizes, weights, available)
+        for name, budget in budgets.items():
+            if sizes[name] > budget and name in structured:
+                value, trimmed[name] = trim_json(structured[name], budget)
+                fitted[name] = _dumps(value)
+            elif sizes[name] > budget:
+                fitted[name], trimmed[name] = trim_to_tokens(normalized[name], budget)
+
+    messages = render(fitted)
+    prompt_tokens = count_message_tokens(messages)
+    max_tokens = min(max_output_tokens, window - prompt_tokens)
+    needed = min(min_output_tokens, max_output_tokens)
+    if max_tokens < needed:
+        raise PromptTooLongError(
+            f"Prompt for {model} is ~{prompt_tokens} tokens, leaving {max(0, max_tokens)} of the "
+            f"{needed} output tokens needed"
+        )
+    if trimmed:
+        logger.info(f"Trimmed prompt fields to fit {model}: {trimmed}")
+    logger.info(f"Prompt for {model}: ~{prompt_tokens} tokens, max_tokens={max_tokens}")
+    return {
+        'messages': messages,
+        'prompt_tokens': prompt_tokens,
+        'max_tokens': max_tokens,
+        'trimmed': trimmed,
+    }
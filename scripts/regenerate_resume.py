@@ -13,11 +13,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 try:
-    from groq import Groq
-except ImportError:
-    logger.error("groq package not installed. Please run: pip install groq")
+    import llm_client
+except ImportError as e:
+    logger.error(str(e))
     sys.exit(1)
 
+import json_repair
+
 def main():
     parser = argparse.ArgumentParser(description="Regenerate a resume using LLM and a prompt.")
     parser.add_argument('--prompt', type=str, required=True, help='Prompt for the LLM')
@@ -30,20 +32,22 @@ def main():
         sys.exit(1)
 
     try:
-        client = Groq(api_key=groq_api_key)
         logger.info("Calling Groq API for resume regeneration")
-        completion = client.chat.completions.create(
+        content = llm_client.complete(
             messages=[
                 {"role": "system", "content": "You are a professional resume writer. Return only valid JSON."},
                 {"role": "user", "content": args.prompt}
             ],
             model="llama-3.1-8b-instant",
+            api_key=groq_api_key,
             temperature=0.3,
             max_tokens=2500
         )
-        content = completion.choices[0].message.content
-        content = content.replace("```json", "").replace("```", "").strip()
-        print(content)
+        try:
+            print(json.dumps(json_repair.loads(content, what='regenerated resume')))
+        except json_repair.JSONRepairError:
+            # Pass the raw output on; the caller reports it.
+            print(content.replace("```json", "").replace("```", "").strip())
     except Exception as e:
         logger.error(f"Resume regeneration failed: {str(e)}")
         print(json.dumps({'error': str(e)}))
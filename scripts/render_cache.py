@@ -0,0 +1,120 @@
+"""Cache of rendered resume PDFs, with strong ETags.
+
+A render is keyed by the template ID, the SHA-256 of the template's files
+(its HTML, its stylesheet and ``ats-base.css``) and a canonical hash of the
+resume content (JSON with sorted keys). Editing a file in
+``resume-templates/`` therefore changes the key of every render that used
+it, and the stale PDFs age out of the LRU instead of being served. Complete
+HTML documents are keyed by their own hash.
+
+The key doubles as the ETag, so it is known before rendering: a client that
+already holds the PDF can be answered with 304 without touching the cache or
+the renderer.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from disk_cache import DiskCache, DEFAULT_CACHE_DIR
+from render_engine import BASE_STYLESHEET, TEMPLATE_DIR, engine
+
+_cache = None
+# file path -> ((mtime_ns, size), sha256), so unchanged files are not re-hashed
+_file_hashes = {}
+_lock = threading.Lock()
+
+
+def render_cache():
+    """The shared PDF cache, or None when RENDER_CACHE_DISABLED=1."""
+    global _cache
+    if os.getenv('RENDER_CACHE_DISABLED') == '1':
+        return None
+    if _cache is None:
+        _cache = DiskCache(
+            os.path.join(os.getenv('RENDER_CACHE_DIR', DEFAULT_CACHE_DIR), 'rendered_pdfs.sqlite3'),
+            max_bytes=int(os.getenv('RENDER_CACHE_MAX_MB', 256)) * 1024 * 1024,
+            ttl=float(os.getenv('RENDER_CACHE_TTL', 30 * 24 * 3600)),
+        )
+    return _cache
+
+
+def _file_hash(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return ''
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _file_hashes.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    with _lock:
+        _file_hashes[path] = (signature, digest)
+    return digest
+
+
+def template_fingerprint(template_id, template_dir=TEMPLATE_DIR):
+    """Hash of every file that affects how ``template_id`` renders."""
+    names = (f'{template_id}.html', f'{template_id}.css', BASE_STYLESHEET)
+    return hashlib.sha256(
+        ''.join(_file_hash(os.path.join(template_dir, name)) for name in names).encode('ascii')
+    ).hexdigest()
+
+
+def content_hash(content):
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def render_key(request):
+    """Cache key for a ``{'template', 'content'}`` or ``{'html'}`` render request."""
+    if 'html' in request:
+        parts = ('html', hashlib.sha256(request['html'].encode('utf-8')).hexdigest())
+    else:
+        template_id = request['template']
+        parts = ('template', template_id, template_fingerprint(template_id), content_hash(request.get('content') or {}))
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def etag(key):
+    """Strong ETag for a render key."""
+    return f'"{key[:40]}"'
+
+
+def etag_matches(if_none_match, tag):
+    """True if an If-None-Match header value covers ``tag``."""
+    if not isinstance(if_none_match, str):
+        return False
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    return '*' in candidates or tag in candidates
+
+
+def cached_render(request, render=None, key=None):
+    """Return ``(pdf, etag, hit)`` for a render request, rendering on a miss.
+
+    ``render`` turns the request into PDF bytes; by default the local render
+    engine does it. ``key`` skips recomputing an already known render key.
+    """
+    if key is None:
+        key = render_key(request)
+    store = render_cache()
+    if store is not None:
+        pdf = store.get(key)
+        if pdf is not None:
+            return pdf, etag(key), True
+    if render is None:
+        render = _render_locally
+    pdf = render(request)
+    if store is not None:
+        store.set(key, pdf)
+    return pdf, etag(key), False
+
+
+def _render_locally(request):
+    if 'html' in request:
+        return engine().html_to_pdf(request['html'])
+    return engine().render_pdf(request['template'], request.get('content') or {})
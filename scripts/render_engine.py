@@ -0,0 +1,117 @@
+"""Long-lived resume render engine: templates, stylesheets and fonts set up once.
+
+Rendering a resume PDF used to build a Jinja environment, re-read and
+re-parse ``ats-base.css`` and the template's stylesheet, and set up fonts on
+every call. :class:`RenderEngine` keeps all of that for the life of the
+process:
+
+- every ``resume-templates/*.html`` is compiled once by a shared Jinja
+  environment, which recompiles a template only when its file changes;
+- stylesheets are parsed into WeasyPrint ``CSS`` objects once and re-parsed
+  only when their mtime changes;
+- one ``FontConfiguration`` serves every render.
+
+:meth:`RenderEngine.render_pdf` returns the PDF as bytes, without temp files.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, TemplateSyntaxError
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(os.getenv('RESUME_TEMPLATE_DIR', Path(__file__).parent.parent / 'resume-templates'))
+BASE_STYLESHEET = 'ats-base.css'
+
+
+class RenderEngine:
+    def __init__(self, template_dir=TEMPLATE_DIR):
+        self.template_dir = Path(template_dir)
+        self.font_config = FontConfiguration()
+        self.env = Environment(
+            loader=FileSystemLoader(str(self.template_dir)),
+            auto_reload=True,
+            cache_size=-1,
+        )
+        # stylesheet file name -> (mtime, CSS)
+        self._stylesheets = {}
+        self._lock = threading.Lock()
+
+    def template_ids(self):
+        return sorted(path.stem for path in self.template_dir.glob('*.html'))
+
+    def warm(self):
+        """Compile every template and parse every stylesheet now, not on first use."""
+        start = time.perf_counter()
+        warmed = 0
+        for template_id in self.template_ids():
+            try:
+                self.template(template_id)
+            except TemplateSyntaxError as e:
+                # A template Jinja cannot compile fails on use, not at startup.
+                logger.warning(f"Skipping template {template_id}: {e}")
+                continue
+            self.stylesheets(template_id)
+            warmed += 1
+        logger.info(f"Render engine warmed {warmed} templates in {time.perf_counter() - start:.2f}s")
+
+    def template(self, template_id):
+        if not (self.template_dir / f'{template_id}.html').exists():
+            raise FileNotFoundError(f"Template not found: {template_id}")
+        return self.env.get_template(f'{template_id}.html')
+
+    def _stylesheet(self, name):
+        path = self.template_dir / name
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            cached = self._stylesheets.get(name)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        css = CSS(filename=str(path), font_config=self.font_config)
+        with self._lock:
+            self._stylesheets[name] = (mtime, css)
+        return css
+
+    def stylesheets(self, template_id):
+        """Parsed base and template stylesheets for ``template_id``."""
+        names = (BASE_STYLESHEET, f'{template_id}.css')
+        return [css for css in map(self._stylesheet, names) if css is not None]
+
+    def render_html(self, template_id, content):
+        return self.template(template_id).render(**content)
+
+    def render_pdf(self, template_id, content):
+        """Render ``content`` (the resume's ``content`` object) with ``template_id`` to PDF bytes."""
+        html = HTML(string=self.render_html(template_id, content), base_url=str(self.template_dir))
+        return html.write_pdf(stylesheets=self.stylesheets(template_id), font_config=self.font_config)
+
+    def html_to_pdf(self, html):
+        """Render a complete, self-styled HTML document to PDF bytes."""
+        return HTML(string=html, base_url=str(self.template_dir)).write_pdf(font_config=self.font_config)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def engine():
+    """The process-wide render engine."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RenderEngine()
+    return _engine
+
+
+def render_pdf(template_id, content):
+    return engine().render_pdf(template_id, content)
@@ -0,0 +1,401 @@
+"""Rule-based resume parser: a fast path in front of the LLM extraction calls.
+
+Splits resume text into sections by their headings and parses each one with
+patterns (email/phone/URL, date ranges, degree and institution keywords,
+skill lists) into the same schema the LLM prompts ask for::
+
+    {"personal_info": {...}, "education": [...], "experience": [...],
+     "skills": {"technical_skills": [...], "soft_skills": [...], "languages": [...]}}
+
+Each section gets a confidence between 0 and 1. Callers use the local result
+for confident sections and ask the LLM only for the rest; a cleanly formatted
+ATS resume (single column, standard headings, one date range per role)
+usually needs no LLM call at all.
+"""
+
+import re
+import time
+
+import skills_taxonomy
+
+SECTIONS = ('personal_info', 'education', 'experience', 'skills')
+CONFIDENCE_THRESHOLD = 0.7
+
+HEADING_ALIASES = {
+    'summary': ['summary', 'professional summary', 'profile', 'professional profile', 'objective',
+                'career objective', 'about me', 'about'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history', 'relevant experience'],
+    'education': ['education', 'academic background', 'academics', 'education and training',
+                  'educational qualifications', 'qualifications'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core skills', 'core competencies',
+               'competencies', 'skills and tools', 'tools and technologies', 'technologies',
+               'skills & tools', 'tools & technologies'],
+    'languages': ['languages', 'spoken languages', 'language skills'],
+    'projects': ['projects', 'personal projects', 'key projects', 'academic projects'],
+    'certifications': ['certifications', 'certificates', 'licenses', 'licenses and certifications',
+                       'licenses & certifications'],
+    'other': ['awards', 'honors', 'achievements', 'publications', 'interests', 'hobbies',
+              'references', 'volunteering', 'volunteer experience', 'activities', 'declaration'],
+}
+_HEADINGS = {alias: section for section, aliases in HEADING_ALIASES.items() for alias in aliases}
+
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE_RE = re.compile(r'(?<![\w/])(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)[\s.-]?)?\d{2,5}(?:[\s.-]\d{2,5}){1,3}(?![\w/])')
+URL_RE = re.compile(r'(?:https?://)?(?:www\.)?(?:[\w-]+\.)+[a-z]{2,}(?:/[^\s|,;]*)?', re.IGNORECASE)
+LOCATION_RE = re.compile(r"^[A-Z][A-Za-z .'-]+(?:,\s*[A-Z][A-Za-z .'-]+){1,2}$")
+
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+_DATE = rf'(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})'
+_PRESENT = r'(?:present|current|now|today|ongoing)'
+DATE_RANGE_RE = re.compile(rf'\(?\b({_DATE})\s*(?:-|–|—|to|until)\s*({_DATE}|{_PRESENT})\b\)?', re.IGNORECASE)
+YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+
+BULLET_RE = re.compile(r'^\s*(?:[-*•·▪◦●‣>]|\d+[.)])\s+')
+SPLIT_RE = re.compile(r'\s+(?:-|–|—|\||@|at)\s+|\s*[|•·]\s*|,\s+(?=[A-Z])')
+
+TITLE_WORDS = {
+    'engineer', 'developer', 'manager', 'analyst', 'scientist', 'intern', 'designer', 'consultant',
+    'lead', 'director', 'specialist', 'architect', 'administrator', 'officer', 'associate',
+    'assistant', 'coordinator', 'head', 'programmer', 'researcher', 'technician', 'executive',
+    'founder', 'co-founder', 'cto', 'ceo', 'vp', 'president', 'tester', 'trainee', 'fellow',
+    'representative', 'advisor', 'strategist', 'writer', 'editor', 'teacher', 'lecturer', 'owner',
+}
+COMPANY_WORDS = {
+    'inc', 'inc.', 'llc', 'ltd', 'ltd.', 'limited', 'corp', 'corp.', 'corporation', 'company', 'co.',
+    'gmbh', 'plc', 'labs', 'technologies', 'solutions', 'systems', 'group', 'pvt', 'bank', 'health',
+    'analytics', 'software', 'consulting', 'services', 'studio', 'studios', 'partners', 'agency',
+}
+DEGREE_RE = re.compile(
+    r"\b(?:b\.?\s?s\.?c?|b\.?\s?a|b\.?\s?e|b\.?\s?tech|b\.?\s?com|bachelor(?:'s)?(?: of [a-z]+)?|"
+    r"m\.?\s?s\.?c?|m\.?\s?a|m\.?\s?e|m\.?\s?tech|mba|master(?:'s)?(?: of [a-z]+)?|"
+    r"ph\.?\s?d|doctor(?:ate)?(?: of [a-z]+)?|associate(?:'s)? degree|diploma|high school|a-levels|ged)\b\.?",
+    re.IGNORECASE,
+)
+INSTITUTION_RE = re.compile(r'\b(?:university|college|institute|school|academy|polytechnic|iit|mit)\b', re.IGNORECASE)
+
+def _clean(line):
+    # Runs of spaces are kept: they often separate columns (title    dates).
+    return line.replace('\t', '    ').replace('\u00a0', ' ').strip()
+
+
+def heading_section(line):
+    """Return the section a heading line opens, or None if it is not a heading."""
+    text = re.sub(r'\s+', ' ', line).strip().rstrip(':').strip()
+    if not text or len(text) > 40:
+        return None
+    section = _HEADINGS.get(text.lower())
+    if section:
+        return section
+    # An unknown all-caps line with no sentence punctuation still ends the
+    # previous section.
+    if text.isupper() and len(text.split()) <= 4 and not re.search(r'[\d@,.|]', text):
+        return 'other'
+    return None
+
+
+def split_sections(text):
+    """Split ``text`` into ``{'header': [...], section: [...]}`` line lists."""
+    sections = {'header': []}
+    current = 'header'
+    for raw in text.splitlines():
+        line = _clean(raw)
+        section = heading_section(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _strip_bullet(line):
+    return BULLET_RE.sub('', line).strip()
+
+
+def _normalize_date(value):
+    value = value.strip().strip('()')
+    if re.fullmatch(_PRESENT, value, re.IGNORECASE):
+        return 'Present'
+    return value
+
+
+def parse_personal_info(header, summary_lines):
+    info = {'name': None, 'email': None, 'phone': None, 'location': None, 'summary': None}
+    links = []
+    title = None
+    for line in header:
+        if not line:
+            continue
+        if info['email'] is None and (match := EMAIL_RE.search(line)):
+            info['email'] = match.group(0)
+        if info['phone'] is None:
+            for match in PHONE_RE.finditer(EMAIL_RE.sub(' ', line)):
+                digits = re.sub(r'\D', '', match.group(0))
+                if 7 <= len(digits) <= 15 and not DATE_RANGE_RE.search(match.group(0)):
+                    info['phone'] = match.group(0).strip()
+                    break
+        for part in re.split(r'\s*[|•·]\s*|\s{3,}', line):
+            part = part.strip()
+            if EMAIL_RE.search(part):
+                continue
+            if URL_RE.fullmatch(part):
+                links.append(part)
+            elif info['location'] is None and LOCATION_RE.match(part):
+                info['location'] = part
+        if info['name'] is None:
+            words = line.split()
+            if (1 < len(words) <= 4 and not re.search(r'[\d@/:|]', line)
+                    and all(w[0].isupper() for w in words if w[0].isalpha())):
+                info['name'] = line
+                continue
+        elif title is None and not re.search(r'[\d@|]', line) and len(line.split()) <= 8 and not LOCATION_RE.match(line):
+            title = line
+    summary = ' '.join(_strip_bullet(line) for line in summary_lines if line)
+    info['summary'] = summary or None
+    return info, links, title
+
+
+def _split_role_company(text):
+    """Split an entry header like ``Data Engineer - Acme Inc`` into (designation, company)."""
+    parts = [p.strip(' ,-–—|') for p in SPLIT_RE.split(text) if p and p.strip(' ,-–—|')]
+    if not parts:
+        return None, None
+    if len(parts) == 1:
+        return (parts[0], None) if _is_title(parts[0]) else (None, parts[0])
+    return _assign(parts[0], parts[1])
+
+
+def _assign(first, second):
+    """Order two header parts as (designation, company), title words deciding first."""
+    if _is_title(first) != _is_title(second):
+        return (first, second) if _is_title(first) else (second, first)
+    if _is_company(second) != _is_company(first):
+        return (first, second) if _is_company(second) else (second, first)
+    return first, second
+
+
+def _words(text):
+    return {w.strip('.,()').lower() for w in text.split()}
+
+
+def _is_title(text):
+    return bool(_words(text) & TITLE_WORDS)
+
+
+def _is_company(text):
+    return bool(_words(text) & COMPANY_WORDS)
+
+
+def _entries(lines, starts_entry):
+    """Group lines into entries; a line for which ``starts_entry`` holds opens a new one.
+
+    A short header line directly above an opening line (a role title on its
+    own line above ``Company  2020 - 2022``) is pulled into the new entry.
+    """
+    entries = []
+    current = None
+    for index, line in enumerate(lines):
+        if not line:
+            continue
+        if starts_entry(line):
+            carried = []
+            if current and current['body'] and not BULLET_RE.match(lines[index - 1] or '-') and lines[index - 1]:
+                carried = [current['body'].pop()]
+            current = {'head': carried + [line], 'body': []}
+            entries.append(current)
+        elif current is None:
+            current = {'head': [line], 'body': []}
+            entries.append(current)
+        elif not current['body'] and not BULLET_RE.match(line) and len(current['head']) < 3 and len(line) < 80:
+            current['head'].append(line)
+        else:
+            current['body'].append(line)
+    return entries
+
+
+def parse_experience(lines):
+    experience = []
+    for entry in _entries(lines, lambda line: bool(DATE_RANGE_RE.search(line))):
+        head = ' | '.join(entry['head'])
+        match = DATE_RANGE_RE.search(head)
+        start = end = None
+        if match:
+            start, end = _normalize_date(match.group(1)), _normalize_date(match.group(2))
+            head = (head[:match.start()] + ' ' + head[match.end():]).strip(' |,-–—')
+        designation = company = None
+        head_lines = [h.strip(' |,-–—') for h in head.split(' | ') if h.strip(' |,-–—')]
+        if len(head_lines) >= 2 and not any(SPLIT_RE.search(h) for h in head_lines[:2]):
+            # Title and company on separate lines.
+            designation, company = _assign(head_lines[0], head_lines[1])
+        else:
+            designation, company = _split_role_company(' | '.join(head_lines))
+        description = '\n'.join(_strip_bullet(line) for line in entry['body']) or None
+        experience.append({
+            'company': company,
+            'designation': designation,
+            'start_date': start,
+            'end_date': end,
+            'description': description,
+        })
+    return experience
+
+
+def parse_education(lines):
+    education = []
+    starts = lambda line: bool(DEGREE_RE.search(line) or INSTITUTION_RE.search(line))
+    for entry in _entries(lines, starts):
+        text = ' | '.join(entry['head'] + entry['body'])
+        degree = institution = field = None
+        match = DEGREE_RE.search(text)
+        if match:
+            degree = match.group(0).strip()
+            rest = text[match.end():]
+            field_match = re.match(r'\s*(?:in|of|,|-|–)?\s*([A-Z][A-Za-z &]+?)(?=\s*(?:[-–—|,(]|\bat\b|$|\d))', rest)
+            if field_match and not INSTITUTION_RE.search(field_match.group(1)):
+                field = field_match.group(1).strip()
+        for part in re.split(r'\s*[|,]\s*|\s+[-–—]\s+|\s+at\s+', DATE_RANGE_RE.sub(' ', text)):
+            if INSTITUTION_RE.search(part):
+                institution = YEAR_RE.sub('', part).strip(' ()')
+                break
+        start_year = end_year = None
+        date_match = DATE_RANGE_RE.search(text)
+        if date_match:
+            start_year, end_year = _normalize_date(date_match.group(1)), _normalize_date(date_match.group(2))
+        else:
+            years = [m.group(0) for m in YEAR_RE.finditer(text)]
+            if years:
+                end_year = years[-1]
+        if not (degree or institution):
+            continue
+        education.append({
+            'degree': degree,
+            'institution': institution,
+            'field_of_study': field,
+            'start_year': start_year,
+            'end_year': end_year,
+        })
+    return education
+
+
+def _skill_items(lines):
+    items = []
+    for line in lines:
+        line = _strip_bullet(line)
+        if not line:
+            continue
+        # "Languages: Python, Go" -> keep the label for classification
+        label, _, rest = line.partition(':') if ':' in line[:40] else ('', '', line)
+        for item in re.split(r'\s*[,;|•·]\s*|\s{2,}', rest):
+            item = item.strip(' .')
+            if item and len(item) <= 40:
+                items.append((label.strip().lower(), item))
+    return items
+
+
+def parse_skills(skill_lines, language_lines):
+    """Bucket skill-list items by their taxonomy category, using canonical names.
+
+    Items the taxonomy does not know go by their label ("Soft skills: ...")
+    and otherwise count as technical. Items from a languages section are
+    always spoken languages.
+    """
+    taxonomy = skills_taxonomy.taxonomy()
+    skills = {'technical_skills': [], 'soft_skills': [], 'languages': []}
+    seen = set()
+    tagged = _skill_items(skill_lines) + [('spoken languages', item) for _, item in _skill_items(language_lines)]
+    for label, item in tagged:
+        qualifier = re.search(r'\s*\(.*\)$', item)
+        base = item[:qualifier.start()] if qualifier else item
+        entry = taxonomy.lookup(base)
+        if entry is not None:
+            # Keep qualifiers such as "Spanish (fluent)".
+            item = entry['name'] + (qualifier.group() if qualifier else '')
+        key = item.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        if label == 'spoken languages' or (entry and entry['category'] == skills_taxonomy.LANGUAGE
+                                           and not label.startswith('programming')):
+            skills['languages'].append(item)
+        elif (entry['category'] == skills_taxonomy.SOFT) if entry else 'soft' in label:
+            skills['soft_skills'].append(item)
+        else:
+            skills['technical_skills'].append(item)
+    return skills
+
+
+def _experience_confidence(entries, lines):
+    if not entries:
+        return 0.0 if not any(lines) else 0.2
+    complete = sum(1 for e in entries if e['company'] and e['designation'] and e['start_date'])
+    return round(0.3 + 0.7 * complete / len(entries), 2)
+
+
+def _education_confidence(entries, lines):
+    if not entries:
+        return 0.0 if not any(lines) else 0.2
+    complete = sum(1 for e in entries if e['degree'] and e['institution'])
+    return round(0.3 + 0.7 * complete / len(entries), 2)
+
+
+def _skills_confidence(skills, found_heading):
+    count = sum(len(items) for items in skills.values())
+    if not found_heading:
+        return 0.0
+    if count >= 3:
+        return 0.9
+    return 0.5 if count else 0.2
+
+
+def _personal_confidence(info):
+    score = 0.0
+    if info['name']:
+        score += 0.5
+    if info['email']:
+        score += 0.3
+    if info['phone']:
+        score += 0.1
+    if info['location'] or info['summary']:
+        score += 0.1
+    return round(score, 2)
+
+
+def parse_resume(text):
+    """Parse resume ``text`` into the structured schema.
+
+    Returns ``{'resume': {...}, 'confidence': {section: 0..1}, 'links': [...],
+    'title': str|None, 'extra_sections': [...], 'seconds': float}``.
+    ``extra_sections`` names recognised sections outside the schema (projects,
+    certifications, ...) that callers needing them must get elsewhere.
+    """
+    start = time.perf_counter()
+    sections = split_sections(text or '')
+    personal_info, links, title = parse_personal_info(sections['header'], sections.get('summary', []))
+    experience = parse_experience(sections.get('experience', []))
+    education = parse_education(sections.get('education', []))
+    skills = parse_skills(sections.get('skills', []), sections.get('languages', []))
+    confidence = {
+        'personal_info': _personal_confidence(personal_info),
+        'education': _education_confidence(education, sections.get('education', [])),
+        'experience': _experience_confidence(experience, sections.get('experience', [])),
+        'skills': _skills_confidence(skills, 'skills' in sections or 'languages' in sections),
+    }
+    return {
+        'resume': {
+            'personal_info': personal_info,
+            'education': education,
+            'experience': experience,
+            'skills': skills,
+        },
+        'confidence': confidence,
+        'links': links,
+        'title': title,
+        'extra_sections': sorted(s for s in sections if s in ('projects', 'certifications') and any(sections[s])),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def low_confidence_sections(parsed, threshold=CONFIDENCE_THRESHOLD):
+    """Schema sections whose confidence is below ``threshold``, in schema order."""
+    return [section for section in SECTIONS if parsed['confidence'][section] < threshold]
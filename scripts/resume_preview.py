@@ -0,0 +1,220 @@
+"""Incremental HTML previews of a resume, one cached fragment per section.
+
+The editor preview changes one section at a time, usually one field of one
+entry, so re-rendering the whole document on every keystroke wastes nearly
+all of the work. Here each section (personal, experience, education, skills,
+projects, certifications, awards) is rendered on its own by a Jinja fragment
+in ``resume-templates/sections/`` and cached under a hash of that section's
+data. An edit re-renders only the section it touched.
+
+:func:`render_preview` also diffs against the hashes the client already
+shows, so a reply carries only the fragments to patch:
+
+    {"template": "ats-classic",
+     "order": ["personal", "experience", "skills"],
+     "hashes": {"personal": "9f0c...", "experience": "41b2...", "skills": "c7d8..."},
+     "changed": {"experience": "<section class=\\"section\\">..."},
+     "removed": ["awards"]}
+
+A section's hash covers the template, the fragment file's version and the
+section's data, so switching templates or editing a fragment file also
+marks it changed. Each fragment is wrapped in the document as
+``<div data-section="experience" data-hash="41b2...">``, so the client
+replaces that element's contents (or removes it) and inserts new sections
+following ``order``. Without ``known`` hashes the reply also includes the
+full ``html`` document, with the template's stylesheets inlined.
+
+A template can override any fragment with
+``resume-templates/sections/<template_id>/<section>.html``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader
+from markupsafe import Markup
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(os.getenv('RESUME_TEMPLATE_DIR', Path(__file__).parent.parent / 'resume-templates'))
+BASE_STYLESHEET = 'ats-base.css'
+SECTIONS = ('personal', 'experience', 'education', 'skills', 'projects', 'certifications', 'awards')
+CACHE_SIZE = int(os.getenv('PREVIEW_CACHE_SIZE', 4096))
+
+
+def section_hash(data):
+    """Short, stable hash of one section's data (dict keys sorted)."""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def _section_data(content, section):
+    """The data ``section`` renders from, or None when the resume has none."""
+    data = content.get(section)
+    if section == 'personal':
+        return data if isinstance(data, dict) and any(data.values()) else None
+    if isinstance(data, dict):
+        # Skills may come grouped, e.g. {"technical_skills": [...], "soft_skills": [...]}
+        return data if any(data.values()) else None
+    return data or None
+
+
+class PreviewRenderer:
+    """Renders resume sections to HTML fragments and caches them by data hash.
+
+    The fragment cache is an LRU of ``CACHE_SIZE`` entries keyed by template,
+    section, fragment file version and data hash, so editing a fragment
+    template also invalidates what it rendered.
+    """
+
+    def __init__(self, template_dir=TEMPLATE_DIR, cache_size=CACHE_SIZE):
+        self.template_dir = Path(template_dir)
+        self.env = Environment(
+            loader=FileSystemLoader(str(self.template_dir)),
+            auto_reload=True,
+            cache_size=-1,
+            # Preview fragments render user text into the editor's DOM.
+            autoescape=True,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        self.cache_size = cache_size
+        self._fragments = OrderedDict()
+        # stylesheet file name -> (mtime, text)
+        self._stylesheets = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _fragment(self, template_id, section):
+        """The fragment template for ``section`` and its file version."""
+        template = self.env.select_template([
+            f'sections/{template_id}/{section}.html',
+            f'sections/{section}.html',
+        ])
+        return template, f'{template.filename}:{os.stat(template.filename).st_mtime_ns}'
+
+    def render_section(self, template_id, section, data, digest=None):
+        """Return the HTML fragment for ``section``, rendering only on a cache miss."""
+        template, version = self._fragment(template_id, section)
+        if digest is None:
+            digest = section_hash(data)
+        key = (template_id, section, version, digest)
+        with self._lock:
+            html = self._fragments.get(key)
+            if html is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+        if section == 'personal':
+            html = template.render(data)
+        else:
+            html = template.render(items=data)
+        html = Markup(html.strip())
+        with self._lock:
+            self._fragments[key] = html
+            while len(self._fragments) > self.cache_size:
+                self._fragments.popitem(last=False)
+        return html
+
+    def _stylesheet(self, name):
+        path = self.template_dir / name
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            cached = self._stylesheets.get(name)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        text = path.read_text(encoding='utf-8')
+        with self._lock:
+            self._stylesheets[name] = (mtime, text)
+        return text
+
+    def document(self, template_id, sections, title='Resume'):
+        """Full preview document around already rendered ``sections``."""
+        stylesheets = [css for css in map(self._stylesheet, (BASE_STYLESHEET, f'{template_id}.css')) if css]
+        return self.env.get_template('sections/_document.html').render(
+            title=title,
+            stylesheets=[Markup(css) for css in stylesheets],
+            sections=sections,
+        )
+
+    def render(self, template_id, content, known=None):
+        """Render a preview of ``content`` and diff it against ``known``.
+
+        ``known`` maps section name to the hash the client currently shows;
+        only sections whose hash differs are returned in ``changed``. Pass
+        None for a first render to also get the full ``html`` document.
+        """
+        if os.path.basename(template_id) != template_id:
+            raise ValueError(f"Invalid template ID: {template_id}")
+        if not (self.template_dir / f'{template_id}.html').exists():
+            raise FileNotFoundError(f"Template not found: {template_id}")
+        start = time.perf_counter()
+        sections = []
+        for section in SECTIONS:
+            data = _section_data(content, section)
+            if data is None:
+                continue
+            data_digest = section_hash(data)
+            # The client-facing hash also covers the template and fragment
+            # file, or a template switch or fragment edit would leave the
+            # client's stale fragment in place.
+            _, version = self._fragment(template_id, section)
+            digest = section_hash([template_id, version, data_digest])
+            if known is not None and known.get(section) == digest:
+                html = None
+            else:
+                html = self.render_section(template_id, section, data, data_digest)
+            sections.append({'name': section, 'hash': digest, 'html': html})
+
+        result = {
+            'template': template_id,
+            'order': [s['name'] for s in sections],
+            'hashes': {s['name']: s['hash'] for s in sections},
+            'changed': {s['name']: str(s['html']) for s in sections if s['html'] is not None},
+            'removed': [name for name in (known or {}) if name not in {s['name'] for s in sections}],
+        }
+        if known is None:
+            personal = content.get('personal')
+            name = personal.get('name') if isinstance(personal, dict) else None
+            result['html'] = self.document(template_id, sections, title=f'{name} - Resume' if name else 'Resume')
+        result['render_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return result
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'fragments': len(self._fragments),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def renderer():
+    """The process-wide preview renderer."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = PreviewRenderer()
+    return _renderer
+
+
+def render_preview(template_id, content, known=None):
+    return renderer().render(template_id, content, known)
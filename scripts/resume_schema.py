@@ -0,0 +1,238 @@
+"""Typed models for every structured (JSON) response we ask the LLM for.
+
+The output shapes differ per endpoint for compatibility with existing
+callers (``personal`` in generated resumes, ``personal_info`` in structured
+resumes, ``basic_info`` in profile extraction), but the shared pieces
+(education, experience, skills) are defined once here. The same models
+drive both sides of a structured call: :func:`skeleton` renders the compact
+JSON template the prompt shows, and :mod:`structured_output` validates the
+reply against the model.
+
+Fields are nullable and most default to empty, so a reply that leaves out
+data it does not have still validates; a wrong type or a missing required
+section does not.
+"""
+
+import functools
+import json
+import typing
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, create_model
+
+
+class Schema(BaseModel):
+    # Extra keys are kept; the models check what we rely on, not everything.
+    model_config = ConfigDict(extra='allow')
+
+
+# Structured resume: the schema of resume_parser, extraction and rewrites.
+
+class PersonalInfo(Schema):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    location: Optional[str] = None
+    summary: Optional[str] = None
+
+
+class Education(Schema):
+    degree: Optional[str] = None
+    institution: Optional[str] = None
+    field_of_study: Optional[str] = None
+    start_year: Optional[str] = None
+    end_year: Optional[str] = None
+
+
+class Experience(Schema):
+    company: Optional[str] = None
+    designation: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    description: Optional[str] = None
+
+
+class Skills(Schema):
+    technical_skills: List[str] = []
+    soft_skills: List[str] = []
+    languages: List[str] = []
+
+
+class StructuredResume(Schema):
+    personal_info: PersonalInfo = PersonalInfo()
+    education: List[Education] = []
+    experience: List[Experience] = []
+    skills: Skills = Skills()
+
+
+class ExtractedResume(StructuredResume):
+    """Extraction reply: skills come back as one flat list (see :mod:`skills_taxonomy`)."""
+    skills: Union[List[str], Skills] = []
+
+
+# Profile extraction (groq_client).
+
+class Certification(Schema):
+    name: Optional[str] = None
+    issuer: Optional[str] = None
+    year: Optional[str] = None
+
+
+class Project(Schema):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    technologies: List[str] = []
+
+
+class BasicInfo(Schema):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    country: Optional[str] = None
+    education: List[Education] = []
+
+
+class ProfessionalInfo(Schema):
+    current_designation: Optional[str] = None
+    skills: Union[List[str], Skills] = []
+    experience: List[Experience] = []
+    certifications: List[Certification] = []
+    projects: List[Project] = []
+    linkedin_url: Optional[str] = None
+    portfolio_url: Optional[str] = None
+
+
+class ProfileExtraction(Schema):
+    basic_info: BasicInfo
+    professional_info: ProfessionalInfo
+
+
+# Resume analysis (optimize_resume).
+
+class AnalysisSkills(Skills):
+    keyword_gaps: List[str] = []
+
+
+class AnalysisResume(StructuredResume):
+    skills: AnalysisSkills = AnalysisSkills()
+
+
+class ResumeAnalysis(Schema):
+    score: Optional[float] = Field(None, ge=0, le=100)
+    keyword_gaps: List[str] = []
+    suggestions: List[str]
+    structured_resume: Optional[AnalysisResume] = None
+
+
+# Generated resume (generate_resume_from_file): the resume builder's format.
+
+class GeneratedPersonal(Schema):
+    name: Optional[str]
+    title: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    location: Optional[str]
+    summary: Optional[str]
+
+
+class GeneratedExperience(Schema):
+    company: Optional[str]
+    position: Optional[str]
+    startDate: Optional[str]
+    endDate: Optional[str]
+    description: Optional[str]
+
+
+class GeneratedEducation(Schema):
+    school: Optional[str]
+    degree: Optional[str]
+    field: Optional[str]
+    startDate: Optional[str]
+    endDate: Optional[str]
+
+
+class GeneratedProject(Schema):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    startDate: Optional[str] = None
+    endDate: Optional[str] = None
+
+
+class GeneratedCertification(Schema):
+    name: Optional[str] = None
+    issuer: Optional[str] = None
+    date: Optional[str] = None
+
+
+class GeneratedAward(Schema):
+    award: Optional[str] = None
+    description: Optional[str] = None
+    date: Optional[str] = None
+
+
+class GeneratedResume(Schema):
+    personal: GeneratedPersonal
+    experience: List[GeneratedExperience]
+    education: List[GeneratedEducation]
+    skills: List[Union[str, Dict[str, Any]]]
+    projects: List[GeneratedProject] = []
+    certifications: List[GeneratedCertification] = []
+    awards: List[GeneratedAward] = []
+
+
+def template(annotation):
+    """The JSON template (as Python data) for a type or model."""
+    origin = typing.get_origin(annotation)
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if origin is Union:
+        # Nullability is left to the prompt's "use null when missing" rule;
+        # of several alternatives the first is the form the prompt asks for.
+        return template(args[0])
+    if origin in (list, List):
+        return [template(args[0])] if args else []
+    if origin in (dict, Dict) or annotation is Any:
+        return {}
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return {name: template(field.annotation) for name, field in annotation.model_fields.items()}
+    if annotation in (int, float):
+        return 'number'
+    if annotation is bool:
+        return 'boolean'
+    return 'string'
+
+
+def skeleton(model, include=None, overrides=None):
+    """Render ``model`` as the compact JSON template shown in prompts.
+
+    ``include`` limits the top-level keys; ``overrides`` replaces the
+    template of individual top-level keys (e.g. a hint string).
+    """
+    fields = {
+        name: template(field.annotation)
+        for name, field in model.model_fields.items()
+        if include is None or name in include
+    }
+    fields.update(overrides or {})
+    return json.dumps(fields)
+
+
+@functools.lru_cache(maxsize=None)
+def require(model, *names):
+    """``model`` with the named optional top-level fields made required (non-null)."""
+    fields = {}
+    for name in names:
+        annotation = model.model_fields[name].annotation
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if typing.get_origin(annotation) is Union and len(args) == 1:
+            annotation = args[0]
+        fields[name] = (annotation, Field(..., **_constraints(model.model_fields[name])))
+    return create_model(f"{model.__name__}With{''.join(n.title().replace('_', '') for n in names)}", __base__=model, **fields)
+
+
+def _constraints(field):
+    constraints = {}
+    for item in field.metadata:
+        for key in ('ge', 'le', 'gt', 'lt'):
+            if getattr(item, key, None) is not None:
+                constraints[key] = getattr(item, key)
+    return constraints
@@ -16,74 +16,89 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 try:
-    from groq import Groq
-except ImportError:
-    logger.error("groq package not installed. Please run: pip install groq")
+    import llm_client
+except ImportError as e:
+    logger.error(str(e))
     sys.exit(1)
 
-def extract_structured_fields(resume_text, groq_api_key):
-    """Use Groq LLM to extract structured fields from resume text."""
+import analysis_cache
+import json_repair
+import prompt_builder
+import resume_parser
+import resume_schema
+import skills_taxonomy
+import structured_output
+
+REWRITE_MODEL = "llama-3.1-8b-instant"
+
+# Rewrite modes: "staged" parses the raw resume then revises it (two calls),
+# "fused" does both in one call, "auto" revises a structured resume when one
+# is given or cached and falls back to "fused" otherwise.
+AUTO = 'auto'
+STAGED = 'staged'
+FUSED = 'fused'
+MODES = (AUTO, STAGED, FUSED)
+
+def extract_structured_fields(resume_text, groq_api_key, use_local_parser=True):
+    """Extract structured fields from resume text.
+
+    Sections the local rule-based parser reads confidently are taken from it;
+    the LLM is asked only for the rest, and not at all for a cleanly
+    formatted resume.
+    """
     logger.info("Starting structured field extraction from resume")
+    parsed = None
+    missing = list(resume_parser.SECTIONS)
+    if use_local_parser:
+        parsed = resume_parser.parse_resume(resume_text)
+        missing = resume_parser.low_confidence_sections(parsed)
+        logger.info(f"Local parse in {parsed['seconds'] * 1000:.1f}ms, confidence {parsed['confidence']}")
+        if not missing:
+            structured_data = parsed['resume']
+            analysis_cache.remember(resume_text, structured_data)
+            return structured_data
     
-    prompt = """
+    # Only the sections the local parser missed are requested and required.
+    schema = resume_schema.require(resume_schema.ExtractedResume, *missing)
+    prompt = f"""
 You are a helpful assistant that extracts structured information from a resume text. 
 
-Extract all available details and when extracting `skills`, carefully classify them into:
-- "technical_skills": programming languages, tools, frameworks, data science libraries, AI/ML tools, platforms, software
-- "soft_skills": communication, problem-solving, adaptability, leadership, critical thinking, teamwork, etc.
-- "languages": spoken or written languages like English, Hindi, Spanish, etc.
-
-Return all data in this exact JSON format:
-{
-  "personal_info": {
-    "name": "string or null",
-    "email": "string or null",
-    "phone": "string or null",
-    "location": "string or null",
-    "summary": "string or null"
-  },
-  "education": [
-    {
-      "degree": "string or null",
-      "institution": "string or null",
-      "field_of_study": "string or null",
-      "start_year": "string or null",
-      "end_year": "string or null"
-    }
-  ],
-  "experience": [
-    {
-      "company": "string or null",
-      "designation": "string or null",
-      "start_date": "string or null",
-      "end_date": "string or null",
-      "description": "string or null"
-    }
-  ],
-  "skills": {
-    "technical_skills": ["string"],
-    "soft_skills": ["string"],
-    "languages": ["string"]
-  }
-}
+Extract all available details. List every skill (technical, soft and spoken languages) in one `skills` array, as written.
+
+Return all data as a JSON object in this exact format:
+{resume_schema.skeleton(schema, include=missing)}
 Only include fields if data is clearly available. If a value is missing, use null or an empty string/array where appropriate.
 Do not add extra explanations or comments. Output only the raw JSON.
 """
+    only = ''
+    if parsed is not None:
+        only = f"Return only these top-level keys: {', '.join(missing)}.\n\n"
     try:
-        client = Groq(api_key=groq_api_key)
-        logger.info("Calling Groq API for structured field extraction")
-        completion = client.chat.completions.create(
-            messages=[
+        fitted = prompt_builder.build(
+            lambda fields: [
                 {"role": "system", "content": prompt},
-                {"role": "user", "content": f"Extract structured info from the following resume text:\n\n{resume_text}"}
+                {"role": "user", "content": f"{only}Extract structured info from the following resume text:\n\n{fields['resume_text']}"}
             ],
-            model="llama-3.1-8b-instant",
-            temperature=0.1
+            {'resume_text': resume_text},
+            model=REWRITE_MODEL,
+            max_output_tokens=2500,
         )
-        content = completion.choices[0].message.content
-        content = content.replace("```json", "").replace("```", "").strip()
-        structured_data = json.loads(content)
+        logger.info("Calling Groq API for structured field extraction")
+        structured_data = structured_output.complete(
+            fitted['messages'],
+            schema,
+            'extract_structured_fields',
+            model=REWRITE_MODEL,
+            api_key=groq_api_key,
+            temperature=0.1,
+            max_tokens=fitted['max_tokens']
+        )
+        if 'skills' in structured_data:
+            structured_data['skills'] = skills_taxonomy.normalize_skills(structured_data['skills'])
+        if parsed is not None:
+            structured_data = {**parsed['resume'], **{key: structured_data[key] for key in missing if key in structured_data}}
         logger.info("Successfully extracted structured fields")
+        analysis_cache.remember(resume_text, structured_data)
         return structured_data
     except Exception as e:
         logger.error(f"Failed to extract structured fields: {str(e)}")
@@ -108,49 +123,47 @@ def merge_suggestions_and_gaps(structured_data, suggestions, keyword_gaps):
     logger.info(f"Merged {len(suggestions)} suggestions and {len(keyword_gaps)} keyword gaps")
     return structured_data
 
-def main():
-    parser = argparse.ArgumentParser(description="Rewrite a resume using suggestions and keyword gaps.")
-    parser.add_argument('--resume_text', type=str, required=True, help='Original resume text')
-    parser.add_argument('--suggestions', type=str, required=True, help='Suggestions for improvement (as bullet points)')
-    parser.add_argument('--keyword_gaps', type=str, required=True, help='Comma-separated keyword gaps')
-    args = parser.parse_args()
-
-    logger.info("Starting resume rewrite process")
-    
-    load_dotenv()
-    groq_api_key = os.getenv('GROQ_API_KEY')
-    if not groq_api_key:
-        logger.error("GROQ_API_KEY not found in environment")
-        sys.exit(1)
+def build_revision_prompt(structured, suggestions, keyword_gaps):
+    """Build the revision messages, trimmed to fit the model's context."""
+    return _build_rewrite_prompt(
+        'Given the following structured resume data, suggestions, and keyword gaps, generate a revised resume as a JSON object with the same structure.',
+        'STRUCTURED RESUME DATA',
+        # Passed as data so trimming drops whole entries and stays valid JSON.
+        structured,
+        suggestions,
+        keyword_gaps,
+    )
 
-    # Step 1: Extract structured fields from the resume
-    try:
-        structured = extract_structured_fields(args.resume_text, groq_api_key)
-        logger.info("Successfully extracted structured fields from resume")
-    except Exception as e:
-        logger.error(f"Failed to extract structured fields: {str(e)}")
-        print(json.dumps({'error': f'Failed to extract structured fields: {str(e)}'}))
-        sys.exit(1)
+def build_fused_prompt(resume_text, suggestions, keyword_gaps):
+    """Build a single-call prompt that parses the raw resume and revises it."""
+    return _build_rewrite_prompt(
+        'Given the following raw resume text, suggestions, and keyword gaps, extract every detail of the resume (personal info, education, experience, skills split into technical, soft and spoken languages) and generate a revised resume as a JSON object with the structure below. Keep all facts from the original; do not invent employers, dates or degrees.',
+        'RESUME TEXT',
+        resume_text,
+        suggestions,
+        keyword_gaps,
+    )
 
-    # Step 2: Generate revised resume as structured JSON
-    prompt = f"""
+def _build_rewrite_prompt(task, source_heading, source, suggestions, keyword_gaps):
+    def render(fields):
+        prompt = f"""
 You are an expert resume writer and ATS optimization specialist.
 
 TASK:
-Given the following structured resume data, suggestions, and keyword gaps, generate a revised resume as a JSON object with the same structure. 
+{task}
 - Incorporate the suggestions and keyword gaps as bullet points in the appropriate sections (especially Skills).
 - Use active voice and concise language.
 - Output ONLY the revised resume as a JSON object, no extra text or markdown.
 - Suggestions and skills must be arrays of strings (bullet points).
 
-STRUCTURED RESUME DATA:
-{json.dumps(structured)}
+{source_heading}:
+{fields['source']}
 
 SUGGESTIONS (bullet points):
-{args.suggestions}
+{fields['suggestions']}
 
 KEYWORD GAPS (bullet points):
-{args.keyword_gaps}
+{fields['keyword_gaps']}
 
 IMPORTANT: You MUST return a single JSON object with the following structure:
 {{
@@ -168,45 +181,111 @@ IMPORTANT: You MUST return a single JSON object with the following structure:
 
 Do NOT return a plain array or any text outside the JSON object.
 """
-    try:
-        logger.info("Calling Groq API for resume revision")
-        client = Groq(api_key=groq_api_key)
-        completion = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": "You are an expert resume writer and ATS optimization specialist. Output only the revised resume as a JSON object."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=2500,
-            temperature=0.5,
-        )
-        content = completion.choices[0].message.content
-        content = content.replace("```json", "").replace("```", "").strip()
-        
-        # Parse and validate the JSON output
+        return [
+            {"role": "system", "content": "You are an expert resume writer and ATS optimization specialist. Output only the revised resume as a JSON object."},
+            {"role": "user", "content": prompt}
+        ]
+
+    return prompt_builder.build(
+        render,
+        {'source': source, 'suggestions': suggestions, 'keyword_gaps': keyword_gaps},
+        model=REWRITE_MODEL,
+        max_output_tokens=2500,
+        weights={'source': 4, 'suggestions': 2, 'keyword_gaps': 1},
+    )
+
+def rewrite_resume(suggestions, keyword_gaps, groq_api_key, resume_text=None, structured=None, mode=AUTO):
+    """Return the revised resume as a dict.
+
+    In ``auto`` mode an already-structured resume (passed in, cached from an
+    earlier analysis of ``resume_text``, or parsed locally with full
+    confidence) goes straight to the revision call; otherwise the raw text is parsed and revised in one fused call.
+    ``staged`` keeps the separate extraction call.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown rewrite mode: {mode}")
+    if structured is None and mode == AUTO:
+        structured = analysis_cache.lookup(resume_text)
+    if structured is None and mode == AUTO and resume_text:
+        parsed = resume_parser.parse_resume(resume_text)
+        if not resume_parser.low_confidence_sections(parsed):
+            structured = parsed['resume']
+    if structured is None and not resume_text:
+        raise ValueError('Either resume text or a structured resume is required.')
+
+    if structured is not None and mode != FUSED:
+        logger.info("Revising structured resume (no extraction call)")
+        fitted = build_revision_prompt(structured, suggestions, keyword_gaps)
+    elif mode == STAGED:
+        structured = extract_structured_fields(resume_text, groq_api_key)
+        fitted = build_revision_prompt(structured, suggestions, keyword_gaps)
+    else:
+        logger.info("Parsing and revising resume in one call")
+        fitted = build_fused_prompt(resume_text, suggestions, keyword_gaps)
+
+    logger.info("Calling Groq API for resume revision")
+    content = llm_client.complete(
+        model=REWRITE_MODEL,
+        messages=fitted['messages'],
+        api_key=groq_api_key,
+        max_tokens=fitted['max_tokens'],
+        temperature=0.5,
+    )
+    revised_resume = json_repair.loads(content, what='revised resume')
+    if isinstance(revised_resume.get('skills'), (list, dict)):
+        revised_resume['skills'] = skills_taxonomy.normalize_skills(revised_resume['skills'])
+    logger.info("Successfully generated revised resume")
+
+    # Ensure suggestions and keyword gaps are properly merged
+    return merge_suggestions_and_gaps(revised_resume, suggestions, keyword_gaps)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite a resume using suggestions and keyword gaps.")
+    parser.add_argument('--resume_text', type=str, help='Original resume text')
+    parser.add_argument('--structured_resume', type=str, help='Resume already structured as JSON, e.g. the structured_resume of an analysis; skips re-parsing the text')
+    parser.add_argument('--suggestions', type=str, required=True, help='Suggestions for improvement (as bullet points)')
+    parser.add_argument('--keyword_gaps', type=str, required=True, help='Comma-separated keyword gaps')
+    parser.add_argument('--mode', choices=MODES, default=AUTO, help='auto: reuse a structured resume when available, else one fused call; staged: extract then revise; fused: always one call')
+    args = parser.parse_args()
+
+    logger.info("Starting resume rewrite process")
+    
+    load_dotenv()
+    groq_api_key = os.getenv('GROQ_API_KEY')
+    if not groq_api_key:
+        logger.error("GROQ_API_KEY not found in environment")
+        sys.exit(1)
+
+    structured = None
+    if args.structured_resume:
         try:
-            revised_resume = json.loads(content)
-            logger.info("Successfully generated revised resume")
-            
-            # Ensure suggestions and keyword gaps are properly merged
-            revised_resume = merge_suggestions_and_gaps(
-                revised_resume,
-                args.suggestions,
-                args.keyword_gaps
-            )
-            
-            # Print the final structured JSON
-            print(json.dumps(revised_resume, indent=2))
-            
+            structured = json.loads(args.structured_resume)
         except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON output from LLM: {str(e)}")
-            print(json.dumps({'error': f'Invalid JSON output from LLM: {str(e)}'}))
+            print(json.dumps({'error': f'Invalid --structured_resume JSON: {str(e)}'}))
             sys.exit(1)
-            
+    if structured is None and not args.resume_text:
+        print(json.dumps({'error': 'Either --resume_text or --structured_resume must be provided.'}))
+        sys.exit(1)
+
+    try:
+        revised_resume = rewrite_resume(
+            args.suggestions,
+            args.keyword_gaps,
+            groq_api_key,
+            resume_text=args.resume_text,
+            structured=structured,
+            mode=args.mode,
+        )
+        # Print the final structured JSON
+        print(json.dumps(revised_resume, indent=2))
+    except json_repair.JSONRepairError as e:
+        logger.error(f"Invalid JSON output from LLM: {str(e)}")
+        print(json.dumps({'error': f'Invalid JSON output from LLM: {str(e)}'}))
+        sys.exit(1)
     except Exception as e:
         logger.error(f"Failed to rewrite resume: {str(e)}")
         print(json.dumps({'error': f'Failed to rewrite resume: {str(e)}'}))
         sys.exit(1)
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
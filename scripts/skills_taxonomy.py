@@ -0,0 +1,209 @@
+"""Skills taxonomy and a one-pass multi-pattern skill matcher.
+
+The taxonomy (``data/skills_taxonomy.json``) lists each skill once with its
+canonical name, category (``technical``, ``soft`` or ``language``) and
+aliases. Extra entries can be layered on with SKILLS_TAXONOMY_EXTRA, a
+path-separated list of JSON files in the same format; a later entry with the
+same canonical name replaces the earlier one.
+
+Every name and alias is compiled into an Aho-Corasick automaton, so
+:meth:`Taxonomy.find` reports all skills in a text in a single linear scan,
+whatever the size of the taxonomy. Matches must sit on word boundaries and
+the longest match wins. Entries marked ``ambiguous`` (``Go``, ``R``,
+``Swift``, ...) only match when written exactly as in the taxonomy, so
+ordinary words do not count as skills.
+"""
+
+import json
+import logging
+import os
+import re
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills_taxonomy.json')
+
+TECHNICAL = 'technical'
+SOFT = 'soft'
+LANGUAGE = 'language'
+# Category -> key in the resume schema's ``skills`` object.
+BUCKETS = {TECHNICAL: 'technical_skills', SOFT: 'soft_skills', LANGUAGE: 'languages'}
+
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', text.strip().lower())
+
+
+class Taxonomy:
+    def __init__(self, entries):
+        self.entries = {}
+        for entry in entries:
+            if entry.get('category') not in BUCKETS:
+                raise ValueError(f"Unknown skill category {entry.get('category')!r} for {entry.get('name')!r}")
+            self.entries[entry['name']] = entry
+        self._lookup = {}
+        for entry in self.entries.values():
+            for surface in [entry['name'], *entry.get('aliases', [])]:
+                self._lookup[_normalize(surface)] = entry
+        self._build_automaton()
+
+    def _build_automaton(self):
+        # Trie over lowercased surfaces: goto[state][char] -> state. ``_out``
+        # holds, per state, the (length, surface) of patterns ending there,
+        # including those reached through failure links.
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for surface in self._lookup:
+            state = 0
+            for char in surface:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(surface), surface))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _raw_matches(self, lowered):
+        state = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, surface in out[state]:
+                yield position + 1 - length, position + 1, surface
+
+    def find(self, text):
+        """Return non-overlapping ``(start, end, entry)`` skill matches in ``text``.
+
+        Whitespace runs in ``text`` must be single spaces for multi-word
+        aliases to match; :func:`extract` and :func:`canonicalize` take care
+        of that.
+        """
+        lowered = text.lower()
+        candidates = []
+        for start, end, surface in self._raw_matches(lowered):
+            if start > 0 and lowered[start - 1].isalnum():
+                continue
+            if end < len(lowered) and (lowered[end].isalnum() or lowered[end] in '+#'):
+                continue
+            entry = self._lookup[surface]
+            if entry.get('ambiguous') and text[start:end] not in [entry['name'], *entry.get('aliases', [])]:
+                continue
+            candidates.append((start, end, entry))
+        # Leftmost-longest, non-overlapping.
+        candidates.sort(key=lambda match: (match[0], -(match[1] - match[0])))
+        matches = []
+        last_end = -1
+        for start, end, entry in candidates:
+            if start >= last_end:
+                matches.append((start, end, entry))
+                last_end = end
+        return matches
+
+    def extract(self, text):
+        """Skills mentioned in ``text`` as ``{technical_skills, soft_skills, languages}`` canonical names."""
+        skills = {bucket: [] for bucket in BUCKETS.values()}
+        seen = set()
+        for _, _, entry in self.find(re.sub(r'[ \t ]+', ' ', text or '')):
+            if entry['name'] not in seen:
+                seen.add(entry['name'])
+                skills[BUCKETS[entry['category']]].append(entry['name'])
+        return skills
+
+    def canonicalize(self, text):
+        """Rewrite every skill mention in ``text`` to its canonical name (``k8s`` -> ``Kubernetes``)."""
+        text = re.sub(r'[ \t ]+', ' ', text or '')
+        parts = []
+        position = 0
+        for start, end, entry in self.find(text):
+            parts.append(text[position:start])
+            parts.append(entry['name'])
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
+
+    def lookup(self, skill):
+        """Return the taxonomy entry for an exact skill name or alias, or None."""
+        return self._lookup.get(_normalize(skill or ''))
+
+    def normalize_skills(self, skills):
+        """Normalize skills returned by a model into the schema's three buckets.
+
+        ``skills`` may be a flat list or a dict of lists. Known skills are
+        renamed to their canonical name and moved to their category's bucket;
+        unknown ones keep their bucket (technical for a flat list) with
+        whitespace tidied. Duplicates are dropped case-insensitively.
+        """
+        if isinstance(skills, dict):
+            items = [(bucket, item) for bucket, values in skills.items() if bucket in BUCKETS.values()
+                     for item in (values or [])]
+            extra = {key: value for key, value in skills.items() if key not in BUCKETS.values()}
+        else:
+            items = [(BUCKETS[TECHNICAL], item) for item in (skills or [])]
+            extra = {}
+        normalized = {bucket: [] for bucket in BUCKETS.values()}
+        seen = set()
+        for bucket, item in items:
+            if not isinstance(item, str) or not item.strip():
+                continue
+            entry = self.lookup(item)
+            if entry is not None:
+                name, bucket = entry['name'], BUCKETS[entry['category']]
+            else:
+                name = re.sub(r'\s+', ' ', item).strip(' .;,')
+            if name.lower() in seen:
+                continue
+            seen.add(name.lower())
+            normalized[bucket].append(name)
+        normalized.update(extra)
+        return normalized
+
+
+def load_entries(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+_taxonomy = None
+
+
+def taxonomy():
+    """The bundled taxonomy plus any SKILLS_TAXONOMY_EXTRA files, built once per process."""
+    global _taxonomy
+    if _taxonomy is None:
+        entries = load_entries(TAXONOMY_PATH)
+        for path in filter(None, os.getenv('SKILLS_TAXONOMY_EXTRA', '').split(os.pathsep)):
+            entries += load_entries(path)
+        _taxonomy = Taxonomy(entries)
+        logger.debug(f"Loaded skills taxonomy with {len(_taxonomy.entries)} skills")
+    return _taxonomy
+
+
+def extract(text):
+    return taxonomy().extract(text)
+
+
+def canonicalize(text):
+    return taxonomy().canonicalize(text)
+
+
+def normalize_skills(skills):
+    return taxonomy().normalize_skills(skills)
@@ -0,0 +1,156 @@
+"""Structured (JSON) completions validated against :mod:`resume_schema` models.
+
+Calls request the API's JSON mode, so the model can only emit a JSON
+object, then go through :mod:`json_repair` and one pydantic validation pass.
+A reply that still fails is retried once with the validation error spelled
+out; a reply cut off at ``max_tokens`` counts as invalid and is retried with
+twice the output budget. When JSON mode itself rejects a generation, the
+rejected text in the error is repaired locally before spending a retry on it.
+
+Outcomes are counted per call site, so the first-attempt validity rate
+shows which prompts and models produce broken output:
+
+- ``valid``: well-formed and matching the schema on the first reply;
+- ``repaired``: matched the schema after local JSON repair, no retry;
+- ``retried``: needed a second call;
+- ``failed``: still invalid after the retries.
+
+Only validated values reach the completion cache: an invalid cached reply
+is evicted, and the value of a successful retry is stored under the
+original call's key so repeat calls get it without a retry.
+
+Set STRUCTURED_JSON_MODE=0 to stop sending ``response_format`` (for models
+without JSON mode) and STRUCTURED_RETRIES to change the retry count.
+"""
+
+import json
+import logging
+import os
+import threading
+
+from pydantic import ValidationError
+
+import json_repair
+import llm_client
+import prompt_builder
+
+logger = logging.getLogger(__name__)
+
+JSON_MODE = os.getenv('STRUCTURED_JSON_MODE', '1') != '0'
+RETRIES = int(os.getenv('STRUCTURED_RETRIES', 1))
+OUTCOMES = ('valid', 'repaired', 'retried', 'failed')
+
+_counts = {}
+_lock = threading.Lock()
+
+
+class StructuredOutputError(ValueError):
+    """Raised when the model's reply is not valid for the schema after all retries."""
+
+
+# Re-raised unchanged from :func:`complete` when the request itself fails.
+APIError = llm_client.APIError
+
+
+class _Truncated(ValueError):
+    """The reply stopped before its JSON closed, usually at ``max_tokens``."""
+
+
+def _record(site, outcome):
+    with _lock:
+        counts = _counts.setdefault(site, dict.fromkeys(OUTCOMES, 0))
+        counts[outcome] += 1
+
+
+def stats():
+    """Per-site outcome counts and first-attempt validity rates."""
+    with _lock:
+        snapshot = {site: dict(counts) for site, counts in _counts.items()}
+    for counts in snapshot.values():
+        calls = sum(counts.values())
+        counts['calls'] = calls
+        counts['first_attempt_valid_rate'] = round((counts['valid'] + counts['repaired']) / calls, 3)
+    return snapshot
+
+
+def _failed_generation(error):
+    """The rejected text of a JSON-mode ``json_validate_failed`` error, if any."""
+    body = getattr(error, 'body', None)
+    if isinstance(body, dict):
+        body = body.get('error', body)
+        if isinstance(body, dict) and body.get('code') == 'json_validate_failed':
+            return body.get('failed_generation') or ''
+    return None
+
+
+def _validate(content, schema):
+    """Return ``(value, repaired)`` for a reply, raising ValueError if it is invalid.
+
+    A truncated reply is invalid even when the repaired value matches the
+    schema: most fields have defaults, so whole sections would go missing
+    without an error.
+    """
+    value, repairs = json_repair.parse(content)
+    if 'truncated' in repairs:
+        raise _Truncated('the reply was cut off before the JSON object was complete')
+    schema.model_validate(value)
+    return value, bool(set(repairs) - {'code_fence'})
+
+
+def _describe(error):
+    if isinstance(error, ValidationError):
+        problems = [f"{'.'.join(str(part) for part in e['loc']) or 'root'}: {e['msg']}" for e in error.errors()[:5]]
+        return '; '.join(problems)
+    return str(error)
+
+
+def _larger_budget(model, messages, max_tokens):
+    """Double ``max_tokens`` for a retry, within what the context leaves after the prompt."""
+    window = int(prompt_builder.context_window(model) * (1 - prompt_builder.SAFETY_MARGIN))
+    # Room for the retry's extra instruction message.
+    room = window - prompt_builder.count_message_tokens(messages) - 64
+    return max(max_tokens, min(max_tokens * 2, room))
+
+
+def complete(messages, schema, site, model=llm_client.DEFAULT_MODEL, api_key=None, cache=None, **overrides):
+    """Run a JSON completion and return the reply as a dict valid for ``schema``.
+
+    ``site`` names the call site in :func:`stats`. Other arguments are passed
+    to :func:`llm_client.complete`.
+    """
+    if JSON_MODE:
+        overrides.setdefault('response_format', {'type': 'json_object'})
+    store, key = llm_client.cache_entry(messages, model=model, cache=cache, **overrides)
+    attempt_messages = list(messages)
+    for attempt in range(RETRIES + 1):
+        try:
+            # The first attempt reads the cache; invalid replies are neither
+            # served from nor written to it.
+            content = llm_client.complete(
+                attempt_messages, model=model, api_key=api_key, cache=bool(store) and attempt == 0,
+                validate=lambda reply: _validate(reply, schema), **overrides
+            )
+        except llm_client.APIError as e:
+            content = _failed_generation(e)
+            if content is None:
+                raise
+            logger.info(f"{site}: JSON mode rejected the generation, repairing it locally")
+        try:
+            value, repaired = _validate(content, schema)
+        except ValueError as e:
+            # Covers JSONRepairError and pydantic's ValidationError.
+            problem = _describe(e)
+            if isinstance(e, _Truncated) and overrides.get('max_tokens'):
+                overrides['max_tokens'] = _larger_budget(model, messages, overrides['max_tokens'])
+            logger.warning(f"{site}: invalid structured output (attempt {attempt + 1}): {problem}")
+            attempt_messages = list(messages) + [{
+                "role": "user",
+                "content": f"Your previous reply was not valid: {problem}. Reply again with only the JSON object in the requested format.",
+            }]
+            continue
+        if attempt and store:
+            store.set(key, json.dumps(value, ensure_ascii=False))
+        _record(site, 'retried' if attempt else 'repaired' if repaired else 'valid')
+        return value
+    _record(site, 'failed')
+    raise StructuredOutputError(f"{site}: model output did not match the schema: {problem}")
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""Long-lived worker pool serving the script entry points.
+
+Instead of spawning ``python3 scripts/<name>.py`` per API request, start this
+once and send it JSON-lines requests, either on stdin/stdout or over a local
+socket:
+
+    {"id": 1, "method": "analyze_resume", "params": {"resume_text": "...", "job_description": "..."}}
+
+Each request gets exactly one response line carrying the same ``id``:
+
+    {"id": 1, "result": {...}}   or   {"id": 1, "error": "..."}
+
+``params`` may be an object (keyword arguments) or an array (positional
+arguments). Responses can arrive out of order when several requests are in
+flight, so callers must match them by ``id``.
+
+Usage:
+    python3 scripts/worker.py --stdio --workers 4 --max-requests 200
+    python3 scripts/worker.py --socket 127.0.0.1:8765 --workers 4
+    python3 scripts/worker.py --socket /tmp/portfolioai-worker.sock
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import socketserver
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stderr)]
+)
+logger = logging.getLogger(__name__)
+
+# method name -> (module, function, inject GROQ_API_KEY when not supplied)
+ENTRY_POINTS = {
+    'analyze_resume': ('optimize_resume', 'analyze_resume', True),
+    'generate_summary': ('generate_summary', 'generate_summary', False),
+    'generate_cover_letter_api': ('generate_cover_letter', 'generate_cover_letter_api', False),
+    'extract_structured_fields': ('rewrite_resume', 'extract_structured_fields', True),
+    'rewrite_resume': ('rewrite_resume', 'rewrite_resume', True),
+    'call_groq_api': ('generate_resume_from_file', 'call_groq_api', False),
+    'extract_text_from_url': ('groq_client', 'extract_text_from_url', False),
+}
+
+PRELOAD_MODULES = sorted({module for module, _, _ in ENTRY_POINTS.values()})
+
+
+def _init_worker():
+    """Import every entry-point module once so requests never pay for it."""
+    load_dotenv()
+    for module_name in PRELOAD_MODULES:
+        importlib.import_module(module_name)
+
+
+def _call(method, params):
+    """Run one entry point inside a pool process and wrap the outcome."""
+    module_name, func_name, needs_api_key = ENTRY_POINTS[method]
+    func = getattr(importlib.import_module(module_name), func_name)
+
+    if isinstance(params, list):
+        args, kwargs = params, {}
+    else:
+        args, kwargs = [], dict(params or {})
+        if needs_api_key and 'groq_api_key' not in kwargs:
+            kwargs['groq_api_key'] = os.getenv('GROQ_API_KEY')
+
+    try:
+        return {'result': func(*args, **kwargs)}
+    except SystemExit as e:
+        # Several scripts still sys.exit() on bad input; that must not take
+        # down the pool process mid-task.
+        return {'error': f'{method} exited with status {e.code}'}
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def _serve_requests(conn):
+    """Body of one pool process: warm up, then run entry points until told to stop."""
+    _init_worker()
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        outcome = _call(*request)
+        try:
+            conn.send(outcome)
+        except (TypeError, AttributeError, ValueError) as e:
+            # pickle failures surface as any of these
+            conn.send({'error': f'Result of {request[0]} could not be sent: {e}'})
+
+
+class _WorkerProcess:
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_serve_requests, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.requests = 0
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(5)
+        self.conn.close()
+
+
+class WorkerPool:
+    """Pool of warm processes, each recycled after ``max_requests`` calls.
+
+    A request running past ``timeout`` seconds gets an error reply and its
+    process is killed and replaced, so a hung call cannot hold a slot.
+    """
+
+    def __init__(self, workers, max_requests=None, timeout=None):
+        methods = multiprocessing.get_all_start_methods()
+        if 'forkserver' in methods:
+            self._ctx = multiprocessing.get_context('forkserver')
+            # Children fork from a server that already imported the heavy
+            # modules, so recycled workers come back warm.
+            self._ctx.set_forkserver_preload(PRELOAD_MODULES)
+        else:
+            self._ctx = multiprocessing.get_context('spawn')
+        self.workers = workers
+        self.max_requests = max_requests
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(_WorkerProcess(self._ctx))
+        # One dispatch thread per process; further requests queue here.
+        self._dispatch = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='worker-dispatch')
+        logger.info(f"Started {workers} workers (recycle after {max_requests or 'unlimited'} requests)")
+
+    def submit(self, request, respond):
+        """Dispatch a decoded request; ``respond`` is called with the reply dict.
+
+        Returns an event that is set once the reply has been sent.
+        """
+        replied = threading.Event()
+        request_id = request.get('id') if isinstance(request, dict) else None
+        method = request.get('method') if isinstance(request, dict) else None
+        if method not in ENTRY_POINTS:
+            respond({'id': request_id, 'error': f'Unknown method: {method}'})
+            replied.set()
+            return replied
+
+        def run():
+            try:
+                outcome = self._run(method, request.get('params'))
+            except Exception as e:
+                outcome = {'error': str(e)}
+            respond({'id': request_id, **outcome})
+            replied.set()
+
+        self._dispatch.submit(run)
+        return replied
+
+    def _run(self, method, params):
+        worker = self._idle.get()
+        try:
+            worker.conn.send((method, params))
+            if not worker.conn.poll(self.timeout):
+                raise TimeoutError(f'Request timed out after {self.timeout}s')
+            outcome = worker.conn.recv()
+        except (TimeoutError, EOFError, OSError) as e:
+            # Replace a hung or dead process; its late reply must not be read
+            # by the next request.
+            logger.warning(f"Replacing worker process after {method}: {e or type(e).__name__}")
+            worker.stop(kill=True)
+            worker = _WorkerProcess(self._ctx)
+            if isinstance(e, TimeoutError):
+                return {'error': str(e)}
+            return {'error': f'{method} worker process died'}
+        else:
+            worker.requests += 1
+            if self.max_requests and worker.requests >= self.max_requests:
+                worker.stop()
+                worker = _WorkerProcess(self._ctx)
+            return outcome
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        self._dispatch.shutdown(wait=True)
+        for _ in range(self.workers):
+            self._idle.get().stop()
+
+
+def _decode(line):
+    try:
+        return json.loads(line), None
+    except json.JSONDecodeError as e:
+        return None, {'id': None, 'error': f'Invalid JSON request: {str(e)}'}
+
+
+def _make_responder(stream):
+    lock = threading.Lock()
+
+    def respond(message):
+        with lock:
+            stream.write(json.dumps(message) + '\n')
+            stream.flush()
+
+    return respond
+
+
+def _claim_stdout():
+    """Keep the real stdout for protocol replies and point fd 1 at stderr.
+
+    Must run before the pool starts: the scripts log to stdout, and pool
+    processes inherit fd 1, so this keeps their output off the protocol stream.
+    """
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), 'w', buffering=1)
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    return protocol_out
+
+
+def serve_stdio(pool, protocol_out):
+    respond = _make_responder(protocol_out)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request, error = _decode(line)
+        if error:
+            respond(error)
+        else:
+            pool.submit(request, respond)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        respond = _make_responder(self.wfile_text)
+        pending = []
+        for raw in self.rfile:
+            line = raw.decode('utf-8')
+            if not line.strip():
+                continue
+            request, error = _decode(line)
+            if error:
+                respond(error)
+            else:
+                pending = [event for event in pending if not event.is_set()]
+                pending.append(self.server.pool.submit(request, respond))
+        # The client may half-close after its last request; keep the
+        # connection open until every reply has been written.
+        for event in pending:
+            event.wait()
+
+    def setup(self):
+        super().setup()
+        self.wfile_text = _SocketWriter(self.wfile)
+
+
+class _SocketWriter:
+    """Minimal text adapter over the handler's binary ``wfile``."""
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+
+    def write(self, text):
+        try:
+            self._wfile.write(text.encode('utf-8'))
+        except OSError:
+            # Client hung up before its reply was ready.
+            pass
+
+    def flush(self):
+        try:
+            self._wfile.flush()
+        except OSError:
+            pass
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def serve_socket(pool, address):
+    if ':' in address:
+        host, port = address.rsplit(':', 1)
+        server = _TCPServer((host, int(port)), _RequestHandler)
+    else:
+        if os.path.exists(address):
+            os.unlink(address)
+        server = _UnixServer(address, _RequestHandler)
+    server.pool = pool
+    logger.info(f"Worker listening on {address}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve script entry points from a pool of warm worker processes.")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--stdio', action='store_true', help='Read JSON-lines requests from stdin, reply on stdout')
+    mode.add_argument('--socket', type=str, help='HOST:PORT for TCP or a filesystem path for a Unix socket')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WORKER_POOL_SIZE', os.cpu_count() or 2)),
+                        help='Number of warm worker processes')
+    parser.add_argument('--max-requests', type=int, default=int(os.getenv('WORKER_MAX_REQUESTS', 500)),
+                        help='Recycle a worker after this many requests (0 disables recycling)')
+    parser.add_argument('--timeout', type=float, default=None, help='Per-request timeout in seconds')
+    args = parser.parse_args()
+
+    load_dotenv()
+    protocol_out = _claim_stdout() if args.stdio else None
+    pool = WorkerPool(args.workers, max_requests=args.max_requests or None, timeout=args.timeout)
+    try:
+        if args.stdio:
+            serve_stdio(pool, protocol_out)
+        else:
+            serve_socket(pool, args.socket)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.close()
+
+
+if __name__ == '__main__':
+    main()